@@ -19,8 +19,8 @@ from core import Path, Image
 from project_view import ProjectTable, NoteBox
 from work_orders import WorkOrderConstants
 from context import ContextHandler as handler
-from context import ProjectContextMenu
-from errors import JobInUseError, JobNotFoundError, MultipleJobError
+from context import ProjectContextMenu, NewDueDateDialog, AddNoteDialog
+from errors import JobNotFoundError, EditConflictError, BatchEditError
 
 
 __author__ = 'Brandon McCleary'
@@ -48,6 +48,9 @@ class ActiveProjects(object):
 	status : StatusBar
 		Application broadcast system.
 
+	save_queue : SaveQueue or None
+		Writes modified work orders to file. Required if `users` is given.
+
 	Attributes
 	----------
 	view : ActiveProjectView
@@ -57,9 +60,10 @@ class ActiveProjects(object):
 	work_orders.Project
 
 	"""
-	def __init__(self, users=None, status=None):
+	def __init__(self, users=None, status=None, save_queue=None):
 		self._users = users
 		self._status = status
+		self._save_queue = save_queue
 		self._selected_dwg_nums = None
 		self._temp_file = 'C:\\Users\\%s\\Desktop\\AP.txt' % getpass.getuser()
 		self._printer = Printer(self._temp_file)
@@ -81,6 +85,7 @@ class ActiveProjects(object):
 				active_projects=True
 			)
 			self.view.table.customContextMenuRequested.connect(self._show_menu)
+			self._save_queue.SAVED.connect(self._on_job_saved)
 
 	def _show_menu(self):
 		"""Display ``ProjectTable`` context menu."""
@@ -89,52 +94,96 @@ class ActiveProjects(object):
 			self._menu.popup(QtGui.QCursor.pos())
 
 	def _on_click_context(self, context):
-		"""Process context menu actions."""
+		"""Process context menu actions.
+
+		An action on a single job is saved with ``JobIO.update``, so the job 
+		lock is not required and a job that is open elsewhere may still be 
+		modified. An action on several jobs is saved with ``JobIO.edit_many``,
+		and the jobs that could not be locked, loaded, or saved are reported.
+
+		"""
 		context_action = str(self.view.table.sender().text())
+		selected = self._selected_dwg_nums
+		job_nums = self._selected_job_nums(selected)
 
-		# Attempt to acquire job ownership
-		try:
-			job_num = self._selected_job_num(self._selected_dwg_nums)
-			job, lock = JobIO.job_and_lock(job_num)
-		except (
-			MultipleJobError, JobInUseError, JobNotFoundError, IOError, 
-			EOFError
-		)as error:
-			ExceptionMessageBox(error).exec_()
-			return
-		
-		# Modify work order data
+		# User input is collected once, before the job is loaded.
 		if context_action == 'Delete':
-			handler.delete(
-				self._selected_dwg_nums,
-				job.projects
-			)
+			edit = lambda projects, dwg_nums: handler.delete(dwg_nums, projects)
 		elif context_action == 'Add Note':
-			handler.note(
-				self._selected_dwg_nums,
-				job.projects,
-				self._users.my_name
-			)
+			dialog = AddNoteDialog(selected)
+			if not dialog.exec_():
+				return
+			note, user = dialog.note, self._users.my_name
+			def edit(projects, dwg_nums):
+				for p in dwg_nums:
+					projects[p].notes.add(note, user)
 		elif context == 'Due Dates':
-			handler.due_date(
-				self._selected_dwg_nums,
-				job.projects,
-				context_action
-			)
+			if context_action == 'New':
+				dialog = NewDueDateDialog(selected)
+				if not dialog.exec_():
+					return
+				context_action = dialog.date
+			edit = lambda projects, dwg_nums: handler.due_date(dwg_nums, 
+				projects, context_action)
+		else:
+			return
 
-		# Attempt to save changes
+		edit_job = lambda job: edit(
+			job.projects, [p for p in selected if p in job.projects]
+		)
+		# Changes still queued from a previous action must be on file.
+		for job_num in job_nums:
+			self._save_queue.wait(job_num)
+		if len(job_nums) == 1:
+			try:
+				JobIO.update(job_nums[0], edit_job)
+			except (JobNotFoundError, EditConflictError, IOError, EOFError) \
+					as error:
+				ExceptionMessageBox(error).exec_()
+			else:
+				self._refresh_job(job_nums[0])
+			return
+
+		saved, errors = JobIO.edit_many(job_nums, edit_job)
+		for job_num in sorted(saved):
+			self._refresh_job(job_num)
+		if len(errors) > 0:
+			BatchEditError.show(errors)
+
+	def _on_job_saved(self, job_num):
+		"""Update view once queued changes are saved."""
+		self._refresh_job(job_num)
+
+	def _refresh_job(self, job_num):
+		"""Update a single job from a slot, reporting a failure to the 
+		user."""
 		try:
-			JobIO.save(job_num, job)
-		except IOError as error:
+			self.update_job(job_num)
+		except (IOError, EOFError) as error:
+			# Caught mid-write, such as during a compaction of the job.
 			ExceptionMessageBox(error).exec_()
 
-		# Release ownership and update view
-		lock.unlock()
-		self._status.show_save_msg(job_num)
-		self._on_click_refresh()
+	def update_job(self, job_num):
+		"""Update the data model and view rows of a single job.
+
+		Parameters
+		----------
+		job_num : str
+
+		Raises
+		------
+		IOError
+		EOFError
+
+		"""
+		projects = self._model.update_job(job_num)
+		if self.view.text:
+			self.view.table.set_table(self._model.filtered(self.view.text))
+		else:
+			self.view.table.update_rows(job_num, projects)
 
-	def _selected_job_num(self, dwg_nums):
-		"""Extract the job number(s) from a collection of drawing numbers.
+	def _selected_job_nums(self, dwg_nums):
+		"""Extract the job numbers from a collection of drawing numbers.
 
 		Parameters
 		----------
@@ -142,19 +191,12 @@ class ActiveProjects(object):
 
 		Returns
 		-------
-		str
-			The job number associated with the selected drawing numbers.
-
-		Raises
-		------
-		MultipleJobError
-			If multiple job numbers were extracted.
+		list
+			The sorted job numbers associated with the selected drawing 
+			numbers.
 
 		"""
-		job_num = {dwg_num[:6] for dwg_num in dwg_nums}
-		if len(job_num) != 1:
-			raise MultipleJobError()
-		return list(job_num)[0]
+		return sorted({dwg_num[:6] for dwg_num in dwg_nums})
 
 	def _on_edit_text(self):
 		"""Set ``ProjectTable`` per ``QLineEdit`` text."""
@@ -177,7 +219,7 @@ class ActiveProjects(object):
 		Parameters
 		----------
 		data : dict
-			``Projects`` ordered by their associated drawing numbers.
+			``ProjectSummaries`` ordered by their associated drawing numbers.
 
 		"""
 		self._write_data_file(data)
@@ -194,7 +236,7 @@ class ActiveProjects(object):
 		Parameters
 		----------
 		data : dict
-			``Projects`` ordered by their associated drawing numbers.
+			``ProjectSummaries`` ordered by their associated drawing numbers.
 
 		"""
 		job_num_list = []
@@ -232,8 +274,9 @@ class ActiveProjects(object):
 		self.view.notes.clear()
 		selected_projects = self.view.table.selected_dwg_nums
 		if len(selected_projects) == 1:
-			project = self._model.data[selected_projects[0]]
-			self.view.notes.set_notes(project.notes.data)
+			notes = self._model.notes(selected_projects[0])
+			if notes is not None:
+				self.view.notes.set_notes(notes.data)
 		else:
 			self.view.notes.clear()
 
@@ -242,6 +285,16 @@ class ActiveProjects(object):
 		self.view.search_le.clear()
 		self._model.refresh()
 		self.view.table.set_table(self._model.data)
+		self._show_load_errors()
+
+	def _show_load_errors(self):
+		"""Broadcast the jobs that could not be loaded during a refresh."""
+		errors = JobIO.load_errors()
+		if len(errors) > 0 and self._status is not None:
+			self._status.showMessage(
+				'Unable to load job(s): %s' % ', '.join(sorted(errors.keys())),
+				5000
+			)
 
 
 class ActiveProjectModel(object):
@@ -260,14 +313,63 @@ class ActiveProjectModel(object):
 
 	@property
 	def data(self):
-		"""dict: ``Projects`` ordered by their associated drawing numbers.
+		"""dict: ``ProjectSummaries`` ordered by their associated drawing 
+		numbers.
 
 		"""
 		return self._data
 
 	def refresh(self):
 		"""Update data model."""
-		self._data = JobIO.existing_projects()
+		self._data = JobIO.project_summaries()
+
+	def update_job(self, job_num):
+		"""Replace the data of a single job.
+
+		Parameters
+		----------
+		job_num : str
+
+		Returns
+		-------
+		dict
+			The job's ``ProjectSummaries`` organized by drawing number. Empty
+			if the job is no longer active.
+
+		Raises
+		------
+		IOError
+		EOFError
+
+		"""
+		projects = JobIO.job_summaries(job_num)
+		for dwg_num in [k for k in self._data if k[:6] == job_num]:
+			del self._data[dwg_num]
+		self._data.update(projects)
+		return projects
+
+	def notes(self, dwg_num):
+		"""Load the notes of a single project.
+
+		Parameters
+		----------
+		dwg_num : str
+
+		Returns
+		-------
+		NoteDict or None
+			``None`` if the project's job could not be loaded.
+
+		"""
+		try:
+			notes = JobIO.snapshot(dwg_num[:6]).projects[dwg_num].notes
+			# Stored notes are read on first access.
+			notes.data
+			return notes
+		except (IOError, EOFError, ValueError, KeyError, JobNotFoundError):
+			# The job was completed or the project was removed since the last
+			# refresh.
+			return
 
 	def filtered(self, value):
 		"""Get a data model subset per a given input.
@@ -359,6 +461,7 @@ class ActiveProjectView(QtGui.QWidget):
 if __name__ == '__main__':
 	app = QtGui.QApplication(sys.argv)
 	app.setStyle(QtGui.QStyleFactory.create('cleanlooks'))
+	JobIO.configure()
 	view = ActiveProjectsDialog()
 	view.exec_()
 	sys.exit(app.exec_())
\ No newline at end of file
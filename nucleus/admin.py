@@ -141,13 +141,10 @@ class AssignmentWork(QtCore.QObject):
 			)
 
 			# Get number of jobs to assign (processing steps)
-			job_numbers = job_dfs.keys()
-			self.STEPS.emit(len(job_numbers))
+			self.STEPS.emit(len(job_dfs))
 
 			# Create files for all unassigned jobs
-			for job_num in job_numbers:
-				self._assign_job(job_num, job_dfs[job_num])
-				self.UPDATE.emit('%s created successfully...' % job_num)
+			self._assign_jobs(job_dfs)
 
 		except (
 			ColumnError, EmptyModelError, IOError, JobNotFoundError, 
@@ -177,7 +174,7 @@ class AssignmentWork(QtCore.QObject):
 			All rows in `df` were removed.
 
 		"""
-		assigned = JobIO.active_job_nums()
+		assigned = JobIO.active_job_nums(refresh=True)
 		assigned_indices = [
 			index for index, row in df.iterrows()
 			if row['WC line alias'][:6] in assigned
@@ -203,30 +200,30 @@ class AssignmentWork(QtCore.QObject):
 			row['TWI Due Date']
 		)
 
-	def _assign_job(self, job_num, df):
-		"""Create and update new job files.
+	def _assign_jobs(self, job_dfs):
+		"""Create new job files.
 
 		Parameters
 		----------
-		job_num : str
-
-		df : DataFrame
-			Contains information corresponding to `job_num` only.
+		job_dfs : dict
+			``DataFrame`` objects that each contain information corresponding
+			to a single job number (key).
 
 		Raises
 		------
 		IOError
-		JobNotFoundError
-		JobInUseError
-		EOFError
 
 		"""
-		JobIO.init_files(job_num, None)
-		job, lock = JobIO.job_and_lock(job_num)
-		for index, row in df.iterrows():
-			self._transform_row_into_project(row, job)	
-		JobIO.save(job_num, job)
-		lock.unlock()
+		jobs = {}
+		for job_num, df in job_dfs.items():
+			jobs[job_num] = Job(job_num, None)
+			for index, row in df.iterrows():
+				self._transform_row_into_project(row, jobs[job_num])
+		JobIO.init_many(jobs, self._on_job_created)
+
+	def _on_job_created(self, job_num):
+		"""Report a single job file as created."""
+		self.UPDATE.emit('%s created successfully...' % job_num)
 
 
 class DateSelectionDialog(Dialog):
@@ -485,6 +482,7 @@ class AssignJobs(object):
 
 if __name__ == '__main__':
 	app = QtGui.QApplication(sys.argv)
+	JobIO.configure()
 	wcs = GetWorkCenterSource()
 	sys.exit(app.exec_())
 	
\ No newline at end of file
@@ -4,10 +4,11 @@ import errno
 import logging
 import os.path
 import getpass
-from datetime import datetime
+from datetime import datetime, date
 import pandas as pd
 from core import Path
 from job_io import JobIO
+from due_index import DueDateIndex
 from work_orders import WorkOrderConstants
 
 
@@ -315,14 +316,49 @@ class UserData(object):
 	OSError
 		If the system cannot find `my_folder`.
 
+	Notes
+	-----
+	Lookups are served from dictionaries built once from `df`, so a change to
+	the data source takes effect when ``AppData`` is reloaded.
+
+	The active user's projects are kept in a ``DueDateIndex``. Each call to 
+	``my_jobs_at_a_glance`` or ``projects_due`` reloads only the jobs whose 
+	signatures changed since the previous call, and ``job_at_a_glance`` 
+	updates the index when a job change is reported.
+
 	"""
 	def __init__(self, df):
 		self._df = df
 		self._my_username = getpass.getuser()
+		self._due_index = DueDateIndex()
+		self._due_signatures = None
+		self._index_users()
 		self._init_user_folder()
 		self._init_log_file()
 		self.log('logged in')
 
+	def _index_users(self):
+		"""Build the lookups of the user data source."""
+		self._names = {}
+		self._levels = {}
+		self._usernames = []
+		self._names_by_level = {}
+		self._emails_by_level = {}
+		self._emails_by_probe = {}
+		df = self._df
+		for username, name, level, email, probe in zip(df['Username'], 
+			df['Name'], df['Level'], df['Email'], df['Probe Sub']):
+			if pd.notnull(username):
+				self._usernames.append(username)
+				# The first registration of a username takes precedence.
+				self._names.setdefault(username, name)
+				self._levels.setdefault(username, level)
+			self._names_by_level.setdefault(level, []).append(name)
+			self._emails_by_level.setdefault(level, []).append(email)
+			self._emails_by_probe.setdefault(probe, []).append(email)
+		self._my_name = self._names.get(self._my_username)
+		self._my_level = self._levels.get(self._my_username)
+
 	def _init_user_folder(self):
 		"""Ensure the active user's folder exists.
 		
@@ -382,7 +418,7 @@ class UserData(object):
 		If ``None``, the active user is not registered.
 		
 		"""
-		return self.get_users_name(self.my_username)
+		return self._my_name
 
 	@property
 	def my_level(self):
@@ -391,11 +427,7 @@ class UserData(object):
 		If ``None``, the active user is not registered.
 		
 		"""
-		try:
-			level = self._df['Level'][self._df['Username'] == self._my_username]
-			return level.tolist()[0]
-		except IndexError:
-			return
+		return self._my_level
 
 	@property
 	def my_folder(self):
@@ -405,45 +437,38 @@ class UserData(object):
 	@property
 	def usernames(self):
 		"""list: The collection of registered usernames."""
-		drop_nans = self._df[self._df['Username'].notnull()]
-		return drop_nans['Username'].tolist()
+		return list(self._usernames)
 
 	@property
 	def technician_names(self):
 		"""list: The collection of given 'Technician' names."""
-		techs = self._df['Name'][self._df['Level'] == 'Technician'].tolist()
+		techs = self._names_by_level.get('Technician', [])[:]
 		techs.append('Brandon')
 		return techs
 
 	@property
 	def supervisor_email_addresses(self):
 		"""list: Email addresses for all users of 'Level' 'Supervisor'."""
-		return self._df['Email'][self._df['Level'] == 'Supervisor'].tolist()
+		return self._emails_by_level.get('Supervisor', [])[:]
 
 	@property
 	def my_projects(self):
-		"""dict: A collection of ``Projects`` owned by the active user and 
-		organized by drawing number.
+		"""dict: A collection of ``ProjectSummaries`` owned by the active user 
+		and organized by drawing number.
 
 		"""
-		my_projects = {}
 		if self.my_name is None:
-			my_projects
-
-		existing_projects = JobIO.existing_projects()
-		for project in existing_projects.keys():
-			if existing_projects[project].owner == self.my_name:
-				my_projects[project] = existing_projects[project]
-		return my_projects
+			return {}
+		return JobIO.owner_summaries(self.my_name)
 
 	@property
 	def my_job_data(self):
-		"""dict: ``lists`` of ``Projects`` owned by the active user and
+		"""dict: ``lists`` of ``ProjectSummaries`` owned by the active user and
 		organized by job number.
 		
 		Notes
 		-----
-		These ``Projects`` are no longer linked with their corresponding
+		These ``ProjectSummaries`` are no longer linked with their corresponding
 		drawing numbers.
 
 		"""
@@ -462,19 +487,115 @@ class UserData(object):
 		The number of ``Projects`` whose due dates fall within the key category.
 
 		"""
+		if not self._linked_with_all_jobs and self.my_level != 'Technician':
+			return None
+		self._refresh_due_index()
+		return self._due_index.glance(date.today().toordinal())
+
+	def projects_due(self, start=None, end=None):
+		"""Find the active user's projects that are due within a range of 
+		dates.
+
+		Parameters
+		----------
+		start : date or None, optional
+			The earliest due date, inclusive. If ``None``, the range is open.
+
+		end : date or None, optional
+			The latest due date, exclusive. If ``None``, the range is open.
+
+		Returns
+		-------
+		list
+			(due_date, dwg_num) tuples in due date order, where `due_date` is a
+			``date``. Completed projects are excluded.
+
+		"""
+		self._refresh_due_index()
+		return [
+			(date.fromordinal(ordinal), dwg_num)
+			for ordinal, job_num, dwg_num in self._due_index.due_between(
+				start and start.toordinal(), end and end.toordinal()
+			)
+		]
+
+	def _refresh_due_index(self):
+		"""Bring ``DueDateIndex`` up to date with the active jobs."""
+		# Signatures are taken first, so changes made while loading are 
+		# reloaded on the next call.
+		signatures = JobIO.job_signatures()
+		if self._due_signatures is None:
+			if self._linked_with_all_jobs:
+				skipped = self._due_index.rebuild(JobIO.project_summaries())
+			else:
+				skipped = self._due_index.rebuild(self.my_projects)
+			for job_num, error in sorted(skipped.items()):
+				self._warn('%s left out of due dates: %s' % (job_num, error))
+		else:
+			previous = self._due_signatures
+			for job_num in set(signatures) | set(previous):
+				if signatures.get(job_num) != previous.get(job_num):
+					try:
+						self.job_at_a_glance(job_num)
+					except (IOError, OSError, EOFError):
+						# Caught mid-write or unavailable; reloaded on the 
+						# next call.
+						signatures.pop(job_num, None)
+					except ValueError as error:
+						# Unreadable; left out until the job is saved again.
+						self._due_index.remove_job(job_num)
+						self._warn('%s left out of due dates: %s' % (job_num,
+							error))
+		self._due_signatures = signatures
+
+	def job_at_a_glance(self, job_num):
+		"""Get the due date information of a single job.
+
+		Parameters
+		----------
+		job_num : str
+
+		Returns
+		-------
+		dict or None
+			Per my_jobs_at_a_glance. ``None`` if the active user is not linked
+			with any of the job's projects.
+
+		Raises
+		------
+		IOError
+		OSError
+		EOFError
+		ValueError
+			If the job data or a due date cannot be parsed.
+
+		Notes
+		-----
+		The projects of `job_num` are replaced in ``DueDateIndex``.
+
+		"""
+		projects = JobIO.job_summaries(job_num)
+		if not self._linked_with_all_jobs:
+			projects = {
+				k: v for k, v in projects.items() if v.owner == self.my_name
+			}
+		self._due_index.update_job(job_num, projects)
+		if len(projects) == 0:
+			return None
+		return self._due_index.glance(date.today().toordinal(), 
+			[job_num])[job_num]
+
+	@property
+	def _linked_with_all_jobs(self):
+		"""bool: True if the active user is given a glance at all jobs."""
 		# LEAD was introduced to provide the drafting lead with a glance at
 		# all department projects, not just his/her own. LEAD is still 
 		# classified with a user level of 'Technician' so that he or she can be
 		# assigned projects, which is an option 'Supervisor' users do not have.
 		LEAD = 'Jaye'
 
-		if self.my_level == 'Supervisor' or self.my_name == LEAD:
-			# Supervisors and leads are linked with all jobs.
-			return JobIO.jobs_at_a_glance(
-				JobIO.sort_project_data(JobIO.existing_projects())
-			)
-		elif self.my_level == 'Technician':
-			return JobIO.jobs_at_a_glance(self.my_job_data)
+		# Supervisors and leads are linked with all jobs.
+		return self.my_level == 'Supervisor' or self.my_name == LEAD
 
 	def get_users_name(self, username):
 		"""Get the name associated with a given username.
@@ -490,15 +611,16 @@ class UserData(object):
 			is not a registered user.
 		
 		"""
-		try:
-			return self.df['Name'][self.df['Username'] == username].tolist()[0]
-		except IndexError:
-			return
+		return self._names.get(username)
 
 	def log(self, msg):
 		"""Send an informative message ``str`` to user log file."""
 		self._logger.info('%s ~ %s' % (self.my_username, msg))
 
+	def _warn(self, msg):
+		"""Send a warning message ``str`` to user log file."""
+		self._logger.warning('%s ~ %s' % (self.my_username, msg))
+
 	def probe_email_addresses(self, field):
 		"""Get the addresses of probe location email recipients.
 		
@@ -512,7 +634,7 @@ class UserData(object):
 			Email addresses in `field` section.
 		
 		"""
-		return self._df[self._df['Probe Sub'] == field]['Email'].tolist()
+		return self._emails_by_probe.get(field, [])[:]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module provides the archive that keeps the data of completed jobs.
+
+"""
+import os
+import zlib
+import sqlite3
+from datetime import date
+from contextlib import closing
+from collections import namedtuple
+import serialization
+from fileio import mutex_file
+
+
+__author__ = 'Brandon McCleary'
+
+
+ArchivedProject = namedtuple('ArchivedProject', [
+	'job_num', 'dwg_num', 'alias_num', 'owner', 'due_date', 'status',
+	'completed'
+])
+
+
+class JobArchive(object):
+	"""
+	Stores completed ``Job`` objects in an embedded SQLite database.
+
+	Each ``Job`` is kept whole, notes included, as a zlib-compressed
+	``serialization`` record. Its projects are indexed separately by job
+	number, drawing number, owner, and completion date, so historical queries
+	never decompress ``Job`` data.
+
+	Parameters
+	----------
+	path : str
+		Absolute path to the database file. The file and tables are created by
+		the first ``add``; until then, queries find nothing.
+
+	timeout : float, optional
+		Seconds to wait for another connection to release a write lock.
+
+	Attributes
+	----------
+	MUTEX_EXT : str
+		The extension of the mutex file held while the database is written.
+
+	MUTEX_TIMEOUT : float
+		Seconds to wait for another user to finish writing.
+
+	MUTEX_STALE : float
+		Seconds after which a mutex file left by a crash is taken over.
+
+	Notes
+	-----
+	Completion dates are stored in ISO format ('YYYY-MM-DD') so that they sort
+	and compare as text.
+
+	The database is shared by every user on a network share, where SQLite's
+	own file locks are not reliable, so every write is made while holding a
+	mutex file next to the database, per fileio.mutex_file. Reads are not
+	guarded, so lookups never wait for another user's write.
+
+	See Also
+	--------
+	storage.SQLiteJobStore
+	serialization
+
+	"""
+
+	SCHEMA = """
+		CREATE TABLE IF NOT EXISTS archived_jobs (
+			job_num TEXT PRIMARY KEY,
+			workspace TEXT,
+			completed TEXT NOT NULL,
+			completed_by TEXT,
+			data BLOB NOT NULL
+		);
+		CREATE INDEX IF NOT EXISTS archived_jobs_completed
+			ON archived_jobs (completed);
+		CREATE TABLE IF NOT EXISTS archived_projects (
+			job_num TEXT NOT NULL REFERENCES archived_jobs (job_num),
+			dwg_num TEXT NOT NULL,
+			alias_num TEXT,
+			owner TEXT,
+			due_date TEXT,
+			status TEXT,
+			PRIMARY KEY (job_num, dwg_num)
+		);
+		CREATE INDEX IF NOT EXISTS archived_projects_dwg_num
+			ON archived_projects (dwg_num);
+		CREATE INDEX IF NOT EXISTS archived_projects_owner
+			ON archived_projects (owner);
+	"""
+
+	MUTEX_EXT = '.writing'
+	MUTEX_TIMEOUT = 30.0
+	MUTEX_STALE = 120.0
+
+	def __init__(self, path, timeout=30.0):
+		self.path = path
+		self._timeout = timeout
+
+	def _write_mutex(self):
+		"""Hold the mutex file that serializes writes across users.
+
+		Raises
+		------
+		IOError
+			If another writer holds the mutex for longer than `MUTEX_TIMEOUT`.
+
+		"""
+		return mutex_file(self.path + self.MUTEX_EXT, self.MUTEX_TIMEOUT,
+			self.MUTEX_STALE, 'Archive is being written by another user')
+
+	def _connect(self):
+		"""Returns a new database connection."""
+		conn = sqlite3.connect(self.path, timeout=self._timeout)
+		# Keep byte strings consistent with serialized Job data.
+		conn.text_factory = str
+		return conn
+
+	def _query(self, sql, params=()):
+		"""Returns the rows of a read-only query. An archive that has not been
+		written has no rows, and its database file is not created."""
+		if not os.path.exists(self.path):
+			return []
+		with closing(self._connect()) as conn:
+			try:
+				return conn.execute(sql, params).fetchall()
+			except sqlite3.OperationalError:
+				# The first add may not have created the tables yet.
+				if conn.execute("SELECT 1 FROM sqlite_master WHERE name = "
+					"'archived_jobs'").fetchone() is not None:
+					raise
+				return []
+
+	def add(self, job_num, job, completed_by, completed=None):
+		"""Archive a completed ``Job``.
+
+		Parameters
+		----------
+		job_num : str
+
+		job : Job
+
+		completed_by : str
+			Username of the user who completed the job.
+
+		completed : date or None, optional
+			If ``None``, today's date is used.
+
+		Raises
+		------
+		IOError
+			Per ``_write_mutex``.
+
+		Notes
+		-----
+		A job number that is completed again replaces its archived data.
+
+		"""
+		if completed is None:
+			completed = date.today()
+		data = sqlite3.Binary(zlib.compress(serialization.dumps(job)))
+		project_rows = [
+			(job_num, dwg_num, p.alias_num, p.owner, p.due_date, p.status)
+			for dwg_num, p in job.projects.items()
+		]
+		with self._write_mutex(), closing(self._connect()) as conn:
+			conn.executescript(self.SCHEMA)
+			with conn:
+				conn.execute(
+					'INSERT OR REPLACE INTO archived_jobs VALUES (?, ?, ?, ?, ?)',
+					(job_num, job.workspace, completed.isoformat(),
+						completed_by, data)
+				)
+				conn.execute(
+					'DELETE FROM archived_projects WHERE job_num = ?',
+					(job_num,)
+				)
+				conn.executemany(
+					'INSERT INTO archived_projects VALUES (?, ?, ?, ?, ?, ?)',
+					project_rows
+				)
+
+	def exists(self, job_num):
+		"""Returns True if `job_num` is archived."""
+		return len(self._query(
+			'SELECT 1 FROM archived_jobs WHERE job_num = ?', (job_num,)
+		)) > 0
+
+	def get(self, job_num):
+		"""Returns an archived ``Job``.
+
+		Raises
+		------
+		KeyError
+			If `job_num` is not archived.
+
+		"""
+		rows = self._query(
+			'SELECT data FROM archived_jobs WHERE job_num = ?', (job_num,)
+		)
+		if not rows:
+			raise KeyError(job_num)
+		return serialization.loads(zlib.decompress(rows[0][0]))
+
+	def projects(self, job_num=None, dwg_num=None, owner=None, start=None,
+		end=None):
+		"""Find archived projects.
+
+		Parameters
+		----------
+		job_num : str or None, optional
+
+		dwg_num : str or None, optional
+
+		owner : str or None, optional
+
+		start : date or None, optional
+			The earliest completion date, inclusive.
+
+		end : date or None, optional
+			The latest completion date, inclusive.
+
+		Returns
+		-------
+		list
+			``ArchivedProject`` objects ordered by drawing number. Filters that
+			are ``None`` are ignored.
+
+		"""
+		where, params = self._where(job_num, dwg_num, owner, start, end)
+		return [ArchivedProject(*r) for r in self._query(
+			'SELECT p.job_num, p.dwg_num, p.alias_num, p.owner, '
+			'p.due_date, p.status, j.completed FROM archived_projects p '
+			'JOIN archived_jobs j ON j.job_num = p.job_num' + where +
+			' ORDER BY p.dwg_num', params
+		)]
+
+	def project_counts(self, start=None, end=None):
+		"""Count the archived projects of each owner.
+
+		Parameters
+		----------
+		start : date or None, optional
+			Per ``projects``.
+
+		end : date or None, optional
+			Per ``projects``.
+
+		Returns
+		-------
+		dict
+			Project counts organized by owner.
+
+		"""
+		where, params = self._where(start=start, end=end)
+		return dict(self._query(
+			'SELECT p.owner, COUNT(*) FROM archived_projects p '
+			'JOIN archived_jobs j ON j.job_num = p.job_num' + where +
+			' GROUP BY p.owner', params
+		))
+
+	def _where(self, job_num=None, dwg_num=None, owner=None, start=None,
+		end=None):
+		"""Build the WHERE clause of a project query.
+
+		Returns
+		-------
+		where : str
+			Empty if no filter is given.
+
+		params : tuple
+
+		"""
+		clauses = []
+		params = []
+		for clause, value in (
+			('p.job_num = ?', job_num),
+			('p.dwg_num = ?', dwg_num),
+			('p.owner = ?', owner),
+			('j.completed >= ?', start and start.isoformat()),
+			('j.completed <= ?', end and end.isoformat()),
+		):
+			if value is not None:
+				clauses.append(clause)
+				params.append(value)
+		if not clauses:
+			return '', ()
+		return ' WHERE ' + ' AND '.join(clauses), tuple(params)
+
+
+if __name__ == '__main__':
+	pass
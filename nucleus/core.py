@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import sys
-from os.path import dirname
+from os import environ
+from os.path import dirname, expanduser
 from os.path import join as osjoin
 from os.path import split as ossplit
 from sulzer import defaults
@@ -32,8 +33,14 @@ class Path():
     CORE = osjoin(DATA, 'core')
     IMG = osjoin(DATA, 'images')
     JOBS = osjoin(DATA, 'jobs')
+    JOBS_INDEX = osjoin(JOBS, 'index')
     TEMP = osjoin(DATA, 'temp')
     USERS = osjoin(DATA, 'users')
+    LOCK_METRICS = osjoin(DATA, 'lock_metrics')
+
+    # Per-user directories on the local disk
+    LOCAL = osjoin(environ.get('LOCALAPPDATA', expanduser('~')), 'Nucleus')
+    JOBS_MIRROR = osjoin(LOCAL, 'jobs')
 
     # Network directories
     VAULT = defaults.Path.VAULT
@@ -53,6 +60,11 @@ class Path():
     # Network files
     PART_LOC_XLSX = 'L:\\Division2\\PROJECTS FOLDER\\1-Work In Progress ' \
         'STORAGE\\BAL\\Shop Storage.xlsx'
+    # Used only when passed to job_io.JobIO.configure; see 
+    # storage.SQLiteJobStore.
+    JOBS_DB = osjoin(JOBS, 'jobs.db')
+    # Written only while holding its mutex; see archive.JobArchive.
+    ARCHIVE_DB = osjoin(DATA, 'archive.db')
 
 
 class Image():
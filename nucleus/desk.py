@@ -5,9 +5,12 @@ import os.path
 from PyQt4 import QtGui
 from pyqtauto.widgets import ExceptionMessageBox, Ask
 from job_folder import JobFolder, UserAgreement
+from save_queue import SaveQueue
+from watcher import JobWatcher
 from menu import ProjectWorkspace
-from errors import SecurityError
+from errors import SecurityError, JobNotFoundError
 from core import Image
+from job_io import JobIO
 from home import HomeWidget
 from context import JobContextMenu
 
@@ -31,6 +34,14 @@ class Desk(QtGui.QTabWidget):
 	context_response : callable
 		Called when the user selects a ``ScheduleTable`` context menu action.
 
+	Attributes
+	----------
+	save_queue : SaveQueue
+		Writes ``Job`` data to file without blocking the GUI.
+
+	watcher : JobWatcher
+		Reports jobs that were changed by any user.
+
 	See Also
 	--------
 	job_folder.JobFolder
@@ -43,6 +54,9 @@ class Desk(QtGui.QTabWidget):
 		self._status = status  
 		self._context_response = context_response
 		self._folders = {} # Will store active JobFolder objects
+		self._closing = {} # Closed JobFolder objects awaiting their final save
+		self.save_queue = SaveQueue()
+		self.watcher = JobWatcher(JobIO.job_directories())
 		self._user_agreement = UserAgreement(
 			self._app_data.agreements, 
 			self._app_data.users.my_username,
@@ -52,7 +66,10 @@ class Desk(QtGui.QTabWidget):
 		super(Desk, self).__init__()
 		self.setTabsClosable(True)
 		self.tabCloseRequested.connect(self._on_click_close)
+		self.save_queue.SAVED.connect(self._on_saved)
+		self.save_queue.FAILED.connect(self._on_save_failed)
 		self._set_home()
+		self.watcher.CHANGED.connect(self._on_job_changed)
 
 	@property
 	def cleared(self):
@@ -69,7 +86,8 @@ class Desk(QtGui.QTabWidget):
 		self.home = HomeWidget(
 			self._context_response, 
 			self._status, 
-			self._app_data.users
+			self._app_data.users,
+			self.save_queue
 		)
 		self.addTab(self.home, 'Home')
 		self.tabBar().setTabButton(0, QtGui.QTabBar.RightSide, None)
@@ -130,7 +148,7 @@ class Desk(QtGui.QTabWidget):
 		"""
 		self.setCurrentIndex(self.folder_index(folder_name))
  
-	def open_job_folder(self, job, lock):
+	def open_job_folder(self, job, lock=None):
 		"""Load and display ``JobFolder`` contents.
 
 		Parameters
@@ -138,32 +156,57 @@ class Desk(QtGui.QTabWidget):
 		job : Job
 			A collection of work orders.
 
-		lock : GateKeeper
-			Controls read and write access to `job` files.
+		lock : LeaseLock or None, optional
+			Controls read and write access to `job` files. If ``None``, the
+			``JobFolder`` is opened read-only.
 
 		"""
 		if self._has_workspace(job):
-			self._app_data.users.log('opened job %s' % job.job_num)
-			self._folders[job.job_num] = JobFolder(job, lock, self._app_data)
+			if lock is None:
+				self._app_data.users.log('viewed job %s' % job.job_num)
+				self._status.showMessage(
+					'%s opened read-only. Editing will lock the job.' % 
+					job.job_num, 5000
+				)
+			else:
+				self._app_data.users.log('opened job %s' % job.job_num)
+			self._folders[job.job_num] = JobFolder(job, lock, self._app_data, 
+				self.save_queue)
 			self._folders[job.job_num].view.agree_btn.clicked.connect(
 				lambda: self._show_agreement(job.job_num)
 			)
 			self.addTab(self._folders[job.job_num].view, job.job_num)
 			self.setCurrentIndex(self.count()-1)
-		else:
+		elif lock is not None:
 			lock.unlock()
 
+	def _on_job_changed(self, job_num):
+		"""Update the views of a job that was changed by any user."""
+		self.home.update_job(job_num)
+		folder = self._folders.get(job_num)
+		if folder is not None and folder.read_only:
+			try:
+				folder.refresh()
+			except (JobNotFoundError, IOError, EOFError):
+				# Completed, or caught mid-write; the folder keeps its data.
+				pass
+
 	def save(self):
-		"""Serialize ``Job`` data."""
+		"""Queue ``Job`` data for serialization."""
 		folder = self.active_folder
 		if folder != 'Home':
 			try:
-				self._folders[folder].save()
-			except (IOError, SecurityError) as error:
+				saved = self._folders[folder].save()
+			except SecurityError as error:
 				ExceptionMessageBox(error).exec_()
 			else:
-				self._app_data.users.log('saved job %s' % folder)
-				self._status.show_save_msg(folder)
+				if saved:
+					self._app_data.users.log('saved job %s' % folder)
+				else:
+					self._status.showMessage(
+						'%s is read-only. There is nothing to save.' % folder,
+						2000
+					)
 		else:
 			self._status.showMessage(
 				'Cannot save a job in this context.', 
@@ -196,17 +239,57 @@ class Desk(QtGui.QTabWidget):
 			return True
 
 	def _on_click_close(self, index):
-		"""Serialize ``Job`` data upon ``JobFolder`` close."""
+		"""Queue ``Job`` data for serialization upon ``JobFolder`` close.
+
+		The ``JobFolder`` is retained until its data is saved, and is reopened
+		if the save fails.
+
+		"""
 		folder = str(self.tabText(index))
 		try:
-			self._folders[folder].save(on_close=True)
-		except (IOError, SecurityError) as error:
+			saved = self._folders[folder].save(on_close=True)
+		except SecurityError as error:
 			if self._continue_close(error):
 				# Close without saving data.
 				self.close_folder(folder, index)
 		else:
+			if saved:
+				self._closing[folder] = self._folders[folder]
 			self.close_folder(folder, index)
-			self._status.show_save_msg(folder)
+
+	def _on_saved(self, job_num):
+		"""Broadcast a completed ``SaveQueue`` write."""
+		self._closing.pop(job_num, None)
+		self._status.show_save_msg(job_num)
+
+	def _on_save_failed(self, job_num, error, lock):
+		"""Handle a failed ``SaveQueue`` write.
+
+		Parameters
+		----------
+		job_num : str
+
+		error : Exception subclass
+
+		lock : LeaseLock or None
+			The job lock that was to be released after the write.
+
+		"""
+		folder = self._closing.pop(job_num, None)
+		if folder is None:
+			ExceptionMessageBox(error).exec_()
+			if lock is not None:
+				# Ownership was not tied to a JobFolder.
+				lock.unlock()
+		elif self._continue_close(error):
+			if lock is not None:
+				# The data is discarded; other users may lock the job.
+				lock.unlock()
+		else:
+			# Restore the closed JobFolder with its unsaved data.
+			self._folders[job_num] = folder
+			self.addTab(folder.view, job_num)
+			self.activate_folder(job_num)
 
 	def _continue_close(self, error):
 		"""Prompt user to close ``JobFolder`` upon error.
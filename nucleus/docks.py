@@ -419,7 +419,7 @@ class WeekendRoster(object):
 					# removed from the data file. Expired user folders will be 
 					# retained for statistical analysis.
 					continue
-				attendees.append(self._users.get_users_name(u))
+				attendees.append(name)
 		return attendees	
 
 	def _show_menu(self):
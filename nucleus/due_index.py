@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module provides an index of active projects ordered by due date.
+
+"""
+import bisect
+from work_orders import WorkOrderConstants
+
+
+__author__ = 'Brandon McCleary'
+
+
+class DueDateIndex(object):
+	"""
+	Orders the active projects of a set of jobs by due date.
+
+	Projects are kept in a sorted list of (ordinal, job_num, dwg_num) keys, so
+	a range of due dates is found by bisection and every query costs
+	O(log n + k) for the k projects it returns. Completed projects are not
+	indexed, but their jobs are still tracked so that a glance reports them.
+	A job with an active project whose due date cannot be parsed is left out.
+
+	See Also
+	--------
+	work_orders.due_ordinal
+
+	"""
+
+	def __init__(self):
+		self._keys = []
+		# {job_num: [(ordinal, job_num, dwg_num)]}
+		self._jobs = {}
+
+	def __len__(self):
+		return len(self._keys)
+
+	def __contains__(self, job_num):
+		return job_num in self._jobs
+
+	def job_nums(self):
+		"""Returns the ``set`` of indexed job numbers."""
+		return set(self._jobs)
+
+	def rebuild(self, summaries):
+		"""Replace the contents of the index.
+
+		Parameters
+		----------
+		summaries : dict
+			``ProjectSummary`` or ``Project`` objects organized by drawing
+			number.
+
+		Returns
+		-------
+		dict
+			The ``ValueError`` raised for each job that was left out because
+			the due date of one of its active projects cannot be parsed, 
+			organized by job number.
+
+		"""
+		by_job = {}
+		for dwg_num, summary in summaries.items():
+			by_job.setdefault(dwg_num[:6], {})[dwg_num] = summary
+		jobs = {}
+		skipped = {}
+		for job_num, projects in by_job.items():
+			try:
+				jobs[job_num] = _job_keys(job_num, projects)
+			except ValueError as error:
+				skipped[job_num] = error
+		self._jobs = jobs
+		self._keys = sorted(key for keys in jobs.values() for key in keys)
+		return skipped
+
+	def update_job(self, job_num, summaries):
+		"""Replace the projects of a single job.
+
+		Parameters
+		----------
+		job_num : str
+
+		summaries : dict
+			Per ``rebuild``. If empty, `job_num` is removed.
+
+		Raises
+		------
+		ValueError
+			If the due date of an active project cannot be parsed. The index
+			is unchanged.
+
+		"""
+		keys = _job_keys(job_num, summaries)
+		self.remove_job(job_num)
+		if summaries:
+			for key in keys:
+				bisect.insort(self._keys, key)
+			self._jobs[job_num] = keys
+
+	def remove_job(self, job_num):
+		"""Remove the projects of a single job, if it is indexed."""
+		for key in self._jobs.pop(job_num, []):
+			del self._keys[bisect.bisect_left(self._keys, key)]
+
+	def due_between(self, start=None, end=None):
+		"""Find the projects due within a range of dates.
+
+		Parameters
+		----------
+		start : int or None, optional
+			The earliest due date ordinal, inclusive. If ``None``, the range
+			is open.
+
+		end : int or None, optional
+			The latest due date ordinal, exclusive. If ``None``, the range is
+			open.
+
+		Returns
+		-------
+		list
+			(ordinal, job_num, dwg_num) tuples in due date order.
+
+		"""
+		lo = 0 if start is None else bisect.bisect_left(self._keys, (start,))
+		hi = len(self._keys) if end is None else \
+			bisect.bisect_left(self._keys, (end,))
+		return self._keys[lo:hi]
+
+	def next_due(self, start, count):
+		"""Find the first projects due on or after a date.
+
+		Parameters
+		----------
+		start : int
+			A due date ordinal.
+
+		count : int
+			The maximum number of projects returned.
+
+		Returns
+		-------
+		list
+			Per ``due_between``.
+
+		"""
+		lo = bisect.bisect_left(self._keys, (start,))
+		return self._keys[lo:lo + count]
+
+	def glance(self, today, job_nums=None):
+		"""Get the due date information of the indexed jobs.
+
+		Parameters
+		----------
+		today : int
+			The ordinal of the current date.
+
+		job_nums : iterable or None, optional
+			If given, only these indexed jobs are reported.
+
+		Returns
+		-------
+		dict
+			Dictionaries of project due date information organized by job 
+			number. Nested keys include 'expired' (past due), 'today' (due 
+			today), and 'approaching' (due within 2 days). Nested values are 
+			the number of active projects whose due dates fall within the key 
+			category.
+
+		"""
+		if job_nums is None:
+			jobs = self._jobs
+			keys = self.due_between(end=today + 3)
+		else:
+			jobs = {j: self._jobs[j] for j in job_nums if j in self._jobs}
+			keys = [k for j in jobs for k in jobs[j] if k[0] < today + 3]
+		glance = {
+			job_num: {'expired' : 0, 'today' : 0, 'approaching' : 0}
+			for job_num in jobs
+		}
+		for ordinal, job_num, dwg_num in keys:
+			delta = ordinal - today
+			if delta < 0:
+				glance[job_num]['expired'] += 1
+			elif delta == 0:
+				glance[job_num]['today'] += 1
+			else:
+				glance[job_num]['approaching'] += 1
+		return glance
+
+
+def _job_keys(job_num, summaries):
+	"""Returns the index keys of the active projects of a job.
+
+	Raises
+	------
+	ValueError
+		If the due date of an active project cannot be parsed.
+
+	"""
+	completed = WorkOrderConstants.STATUS_LIST[-1]
+	try:
+		return [
+			(s.due_ordinal, job_num, dwg_num)
+			for dwg_num, s in summaries.items() if s.status != completed
+		]
+	except TypeError:
+		# A missing due date.
+		raise ValueError('Invalid due date in job %s' % job_num)
+
+
+if __name__ == '__main__':
+	pass
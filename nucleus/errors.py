@@ -130,6 +130,21 @@ class SecurityError(Exception):
 		self.icon = 'critical'
 
 
+class ArchiveError(TryAgainBaseError):
+	def __init__(self):
+		super(ArchiveError, self).__init__(
+			'The job could not be archived, so it was not completed.'
+		)
+
+
+class EditConflictError(TryAgainBaseError):
+	def __init__(self):
+		super(EditConflictError, self).__init__(
+			'The job is being changed by other users, so your change was not '\
+				'saved.'
+		)
+
+
 class MultipleJobError(TryAgainBaseError):
 	def __init__(self):
 		super(MultipleJobError, self).__init__(
@@ -146,4 +161,16 @@ class MissingPDFError:
 			message.append(pdf)
 		OrphanMessageBox(cls.__name__, message, 'information').exec_()
 
+
+class BatchEditError:
+
+	@classmethod
+	def show(cls, errors):
+		message = ['The following jobs were not changed:']
+		for job_num in sorted(errors):
+			message.append('%s: %s' % (
+				job_num, getattr(errors[job_num], 'message', errors[job_num])
+			))
+		OrphanMessageBox(cls.__name__, message, 'information').exec_()
+
 		
\ No newline at end of file
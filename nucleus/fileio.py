@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module provides the low-level file operations shared by the job storage
+backends.
+
+"""
+import os
+import time
+import errno
+import socket
+import thread
+from contextlib import contextmanager
+try:
+	from os import scandir
+except ImportError:
+	try:
+		# Backport of os.scandir for Python 2.
+		from scandir import scandir
+	except ImportError:
+		scandir = None
+
+
+__author__ = 'Brandon McCleary'
+
+
+if os.name == 'nt':
+	import ctypes
+
+	def replace(src, dst):
+		"""Atomically move `src` over `dst`, replacing any existing file."""
+		# MOVEFILE_REPLACE_EXISTING | MOVEFILE_WRITE_THROUGH
+		if not ctypes.windll.kernel32.MoveFileExW(unicode(src), unicode(dst), 
+			0x1 | 0x8):
+			raise ctypes.WinError()
+else:
+	replace = os.rename
+
+
+def read_file(path):
+	"""Read a file in a single call.
+
+	Raises
+	------
+	IOError
+		If no such file or directory.
+
+	EOFError
+		If the file changed size while being read.
+
+	"""
+	with open(path, 'rb') as f:
+		data = f.read()
+		size = os.fstat(f.fileno()).st_size
+	if len(data) != size:
+		raise EOFError('Incomplete file: %s' % path)
+	return data
+
+
+def make_dirs(path):
+	"""Create a directory and its parents, unless it already exists.
+
+	Raises
+	------
+	OSError
+		If the directory cannot be created.
+
+	"""
+	try:
+		os.makedirs(path)
+	except OSError as error:
+		# Another process may have created it first.
+		if error.errno != errno.EEXIST:
+			raise
+
+
+def list_stats(directory):
+	"""Yields the (filename, (mtime, size)) of every file in a directory.
+
+	Raises
+	------
+	OSError
+		If the system cannot find the path specified.
+
+	"""
+	if scandir is not None:
+		for entry in scandir(directory):
+			try:
+				# Served from the directory listing on Windows.
+				st = entry.stat()
+			except OSError:
+				continue
+			yield entry.name, (st.st_mtime, st.st_size)
+	else:
+		for filename in os.listdir(directory):
+			try:
+				st = os.stat(os.path.join(directory, filename))
+			except OSError:
+				continue
+			yield filename, (st.st_mtime, st.st_size)
+
+
+def _unique_name(path, tag):
+	"""Returns a path next to `path` that no other thread, process, or 
+	computer uses."""
+	return '%s.%s-%s-%d-%d' % (path, tag, socket.gethostname(), os.getpid(),
+		thread.get_ident())
+
+
+def server_time(directory):
+	"""Returns the current time according to the clock of the file server 
+	that holds a directory.
+
+	The clocks of the computers sharing a network directory may disagree, so
+	the age of a shared file is measured against the modification time of a
+	probe file that was just created next to it.
+
+	Raises
+	------
+	OSError
+		If the probe file cannot be created.
+
+	"""
+	probe = _unique_name(os.path.join(directory, 'clock'), 'probe')
+	os.close(os.open(probe, os.O_CREAT | os.O_TRUNC | os.O_WRONLY))
+	try:
+		return os.stat(probe).st_mtime
+	finally:
+		try:
+			os.remove(probe)
+		except OSError:
+			pass
+
+
+def file_age(path, mtime=None):
+	"""Returns the seconds since a file was last modified, per 
+	``server_time``.
+
+	Parameters
+	----------
+	path : str
+
+	mtime : float or None, optional
+		The modification time of `path`, if already known.
+
+	Raises
+	------
+	OSError
+		If no such file or directory.
+
+	"""
+	if mtime is None:
+		mtime = os.stat(path).st_mtime
+	return server_time(os.path.dirname(path)) - mtime
+
+
+@contextmanager
+def mutex_file(path, timeout, stale, reason='File is in use'):
+	"""Hold a mutex file that is shared with other processes and machines.
+
+	Parameters
+	----------
+	path : str
+		Absolute path to the mutex file. It exists only while held.
+
+	timeout : float
+		Seconds to wait for another holder to release the mutex.
+
+	stale : float
+		Seconds after which a mutex left by a holder that crashed is taken 
+		over, per ``file_age``.
+
+	reason : str, optional
+		The message of the error raised on a timeout.
+
+	Raises
+	------
+	IOError
+		If another holder keeps the mutex for longer than `timeout`.
+
+	Notes
+	-----
+	A stale mutex is renamed to a name unique to the waiter before it is 
+	removed, so when several waiters find it stale, only one of them clears
+	it. A waiter that renamed a mutex created after its check puts it back.
+
+	"""
+	deadline = time.time() + timeout
+	while True:
+		try:
+			os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+			break
+		except OSError as error:
+			# Windows reports EACCES for a file that is pending deletion.
+			if error.errno not in (errno.EEXIST, errno.EACCES):
+				raise
+		try:
+			mtime = os.stat(path).st_mtime
+			if file_age(path, mtime) > stale:
+				_take_over(path, mtime)
+				continue
+		except OSError:
+			# Released in the meantime.
+			continue
+		if time.time() > deadline:
+			raise IOError(errno.EBUSY, reason, path)
+		time.sleep(0.05)
+	try:
+		yield
+	finally:
+		try:
+			os.remove(path)
+		except OSError:
+			pass
+
+
+def _take_over(path, mtime):
+	"""Remove a stale mutex file last modified at `mtime`.
+
+	Raises
+	------
+	OSError
+		If the mutex was released or taken over in the meantime.
+
+	"""
+	taken = _unique_name(path, 'stale')
+	os.rename(path, taken)
+	if os.stat(taken).st_mtime == mtime:
+		os.remove(taken)
+	else:
+		# Another waiter cleared the stale mutex and a new holder created 
+		# this one; put it back.
+		os.rename(taken, path)
+
+
+if __name__ == '__main__':
+	pass
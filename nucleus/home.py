@@ -29,15 +29,19 @@ class HomeWidget(QtGui.QToolBox):
 	users : UserData
 		Data model.
 
+	save_queue : SaveQueue
+		Writes ``Job`` data to file.
+
 	Attributes
 	----------
 	schedule : ScheduleWidget
 
 	"""
-	def __init__(self, context_response, status, users):
+	def __init__(self, context_response, status, users, save_queue):
 		self._context_response = context_response
 		self._status = status
 		self._users = users
+		self._save_queue = save_queue
 		# Build GUI
 		super(HomeWidget, self).__init__()
 		setters.set_uniform_margins(self, 40)
@@ -55,7 +59,8 @@ class HomeWidget(QtGui.QToolBox):
 		self.addItem(self.schedule, 'Schedule at a Glance')
 		if self._users.my_level == 'Supervisor':
 			# For supervisors only
-			self._active_proj = ActiveProjects(self._users, self._status)
+			self._active_proj = ActiveProjects(self._users, self._status, 
+				self._save_queue)
 			self.addItem(self._active_proj.view, 'Active Projects')
 
 		# Set view data
@@ -67,11 +72,32 @@ class HomeWidget(QtGui.QToolBox):
 		Parameters
 		----------
 		job_dict : dict
-			Per job_io.JobIO.jobs_at_a_glance.
+			Per due_index.DueDateIndex.glance.
 
 		"""
 		self.schedule.set_view(job_dict)
 
+	def update_job(self, job_num):
+		"""Update the rows of a single job that was created, saved, or 
+		completed.
+
+		Parameters
+		----------
+		job_num : str
+
+		"""
+		try:
+			if self._users.my_level is not None:
+				self.schedule.update_job(job_num, 
+					self._users.job_at_a_glance(job_num))
+			active_proj = getattr(self, '_active_proj', None)
+			if active_proj is not None:
+				active_proj.update_job(job_num)
+		except (IOError, OSError, EOFError, ValueError):
+			# The job is being saved or completed, or its data is unreadable;
+			# it is reported again once its files change.
+			pass
+
 
 class ScheduleWidget(QtGui.QWidget):
 	"""
@@ -123,7 +149,7 @@ class ScheduleWidget(QtGui.QWidget):
 		Parameters
 		----------
 		job_dict : dict
-			Per job_io.JobIO.jobs_at_a_glance.
+			Per due_index.DueDateIndex.glance.
 
 		"""
 		if len(job_dict) == 0:
@@ -132,6 +158,24 @@ class ScheduleWidget(QtGui.QWidget):
 			self._intro_lb.hide()
 		self._table.set_table(job_dict)
 
+	def update_job(self, job_num, glance):
+		"""Update the row of a single job.
+
+		Parameters
+		----------
+		job_num : str
+
+		glance : dict or None
+			Per due_index.DueDateIndex.glance, the due date information of
+			`job_num`. If ``None``, the row is removed.
+
+		"""
+		self._table.update_row(job_num, glance)
+		if self._table.rowCount() == 0:
+			self._intro_lb.show()
+		else:
+			self._intro_lb.hide()
+
 	def _show_menu(self):
 		"""Display the ``ScheduleTable`` context menu."""
 		JobContextMenu(
@@ -193,7 +237,7 @@ class ScheduleTable(Table):
 		Parameters
 		----------
 		job_dict : dict
-			Per job_io.JobIO.jobs_at_a_glance.
+			Per due_index.DueDateIndex.glance.
 
 		"""
 		self.setSortingEnabled(False)
@@ -211,6 +255,38 @@ class ScheduleTable(Table):
 				)
 		self.setSortingEnabled(True)
 
+	def update_row(self, job_num, glance):
+		"""Replace, add, or remove the row of a single job.
+
+		Parameters
+		----------
+		job_num : str
+
+		glance : dict or None
+			Per due_index.DueDateIndex.glance, the due date information of
+			`job_num`. If ``None``, the row is removed.
+
+		"""
+		self.setSortingEnabled(False)
+		row = self._row(job_num)
+		if glance is None:
+			if row is not None:
+				self.removeRow(row)
+		else:
+			if row is None:
+				row = self.rowCount()
+				self.insertRow(row)
+			self._set_row(row, job_num, glance['expired'], glance['today'],
+				glance['approaching'])
+		self.setSortingEnabled(True)
+
+	def _row(self, job_num):
+		"""Returns the row index of a job, or ``None`` if it is not listed."""
+		col = self.HEADERS.index('Job')
+		for row in range(self.rowCount()):
+			if str(self.item(row, col).text()) == job_num:
+				return row
+
 	def _set_row(self, row, job_num, expired, today, approaching):
 		"""Set the ``Table`` row.
 
@@ -263,8 +339,10 @@ class ScheduleTable(Table):
 				Image.ZERO,
 				flat=True
 			)
+			self.takeItem(row, col)
 			self.setCellWidget(row, col, btn)
 		else:
+			self.removeCellWidget(row, col)
 			self.setItem(row, col, TableItem(str(date_var)))
 
 
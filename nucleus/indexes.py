@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module provides in-memory indexes that answer common ``Job`` queries
+without rescanning the jobs directory or deserializing ``Job`` files.
+
+"""
+import os
+import re
+import time
+import errno
+import threading
+from fileio import scandir, list_stats
+
+
+__author__ = 'Brandon McCleary'
+
+
+def shard_name(job_num, size):
+	"""Get the name of the bucket that holds a job, such as '124000-124499'.
+
+	Parameters
+	----------
+	job_num : str
+
+	size : int
+		The number of job numbers per bucket.
+
+	Returns
+	-------
+	str
+
+	"""
+	start = int(job_num) // size * size
+	return '%06d-%06d' % (start, start + size - 1)
+
+
+class JobDirectoryIndex(object):
+	"""
+	Caches the job numbers found in a directory of job files.
+
+	The set of job numbers is kept for `ttl` seconds. Once it expires, the
+	directory is only rescanned if its modification time has changed.
+
+	Parameters
+	----------
+	root : str
+		Absolute path to the directory containing the job files.
+
+	ext : str
+		The extension of a job file, such as '.nuke'.
+
+	ttl : float, optional
+		Seconds that a scan is trusted without touching the directory.
+
+	Notes
+	-----
+	File names are matched exactly against a 6-digit job number followed by
+	`ext`, so lock files, temp files, and other job files are never mistaken
+	for one another.
+
+	"""
+
+	# Matches the file names of the directory; group 1 is the job number.
+	PATTERN = r'^(\d{6})%s$'
+
+	def __init__(self, root, ext, ttl=5.0):
+		self.root = root
+		self.ttl = ttl
+		self._pattern = re.compile(self.PATTERN % re.escape(ext))
+		self._lock = threading.Lock()
+		self._job_nums = frozenset()
+		self._mtime = None
+		self._checked = None
+
+	def __contains__(self, job_num):
+		return job_num in self.job_nums()
+
+	def job_nums(self, refresh=False):
+		"""Get every job number in the directory.
+
+		Parameters
+		----------
+		refresh : bool, optional
+			If True, the directory is rescanned.
+
+		Returns
+		-------
+		frozenset
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		with self._lock:
+			now = time.time()
+			if refresh or self._checked is None:
+				self._scan(now)
+			elif now - self._checked > self.ttl:
+				if os.stat(self.root).st_mtime != self._mtime:
+					self._scan(now)
+				else:
+					self._checked = now
+			return self._job_nums
+
+	def stats(self):
+		"""Rescan the directory and get the modification time and size of
+		every job file.
+
+		Returns
+		-------
+		dict or None
+			(mtime, size) tuples organized by job number. ``None`` if
+			``scandir`` is not available, in which case each file must be
+			stat'ed separately.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		if scandir is None:
+			return None
+		with self._lock:
+			return self._scan(time.time())
+
+	def _scan(self, now):
+		"""Rebuild the index from a directory listing.
+
+		Returns
+		-------
+		dict or None
+			Per ``stats``.
+
+		"""
+		mtime = os.stat(self.root).st_mtime
+		if scandir is None:
+			stats = None
+			job_nums = set()
+			for name in os.listdir(self.root):
+				match = self._pattern.match(name)
+				if match:
+					job_nums.add(match.group(1))
+		else:
+			stats = {}
+			for name, stat in list_stats(self.root):
+				match = self._pattern.match(name)
+				if match:
+					stats[match.group(1)] = stat
+			job_nums = stats.keys()
+		self._job_nums = frozenset(job_nums)
+		self._mtime = mtime
+		self._checked = now
+		return stats
+
+	def add(self, job_num):
+		"""Record a job file created by this process."""
+		with self._lock:
+			self._job_nums = self._job_nums | {job_num}
+
+	def discard(self, job_num):
+		"""Record a job file removed by this process."""
+		with self._lock:
+			self._job_nums = self._job_nums - {job_num}
+
+	def invalidate(self):
+		"""Force the next query to rescan the directory."""
+		with self._lock:
+			self._checked = None
+
+
+class _ShardListing(JobDirectoryIndex):
+	"""Caches the bucket names found in a directory."""
+
+	PATTERN = r'^(\d{6}-\d{6})%s$'
+
+
+class ShardedDirectoryIndex(object):
+	"""
+	Caches the job numbers found in the bucket subdirectories of a directory.
+
+	Each bucket is indexed separately, per ``JobDirectoryIndex``, so a lookup
+	of a single job only ever lists the bucket that would hold it.
+
+	Parameters
+	----------
+	root : str
+		Absolute path to the directory containing the buckets.
+
+	ext : str
+		The extension of a job file, such as '.nuke'.
+
+	size : int
+		The number of job numbers per bucket, per shard_name.
+
+	ttl : float, optional
+		Seconds that a scan is trusted without touching a directory.
+
+	"""
+	def __init__(self, root, ext, size, ttl=5.0):
+		self.root = root
+		self.ext = ext
+		self.size = size
+		self.ttl = ttl
+		self._lock = threading.Lock()
+		self._listing = _ShardListing(root, '', ttl)
+		# {shard name: JobDirectoryIndex}
+		self._shards = {}
+
+	def __contains__(self, job_num):
+		try:
+			return job_num in self._shard(shard_name(job_num, self.size))
+		except OSError as error:
+			if error.errno != errno.ENOENT:
+				raise
+			# The bucket has not been created yet.
+			return False
+
+	def _shard(self, name):
+		"""Returns the index of a single bucket."""
+		with self._lock:
+			if name not in self._shards:
+				self._shards[name] = JobDirectoryIndex(
+					os.path.join(self.root, name), self.ext, self.ttl
+				)
+			return self._shards[name]
+
+	def shard_names(self, refresh=False):
+		"""Get the name of every bucket in the directory.
+
+		Parameters
+		----------
+		refresh : bool, optional
+			If True, the directory is rescanned.
+
+		Returns
+		-------
+		frozenset
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		return self._listing.job_nums(refresh)
+
+	def job_nums(self, refresh=False):
+		"""Get every job number in the buckets of the directory.
+
+		Parameters
+		----------
+		refresh : bool, optional
+			If True, every bucket is rescanned.
+
+		Returns
+		-------
+		frozenset
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		job_nums = set()
+		for name in self.shard_names(refresh):
+			job_nums.update(self._shard(name).job_nums(refresh))
+		return frozenset(job_nums)
+
+	def stats(self):
+		"""Rescan every bucket and get the modification time and size of every
+		job file.
+
+		Returns
+		-------
+		dict or None
+			Per JobDirectoryIndex.stats.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		stats = {}
+		for name in self.shard_names(refresh=True):
+			shard_stats = self._shard(name).stats()
+			if shard_stats is None:
+				return None
+			stats.update(shard_stats)
+		return stats
+
+	def add(self, job_num):
+		"""Record a job file created by this process."""
+		self._listing.add(shard_name(job_num, self.size))
+		self._shard(shard_name(job_num, self.size)).add(job_num)
+
+	def discard(self, job_num):
+		"""Record a job file removed by this process."""
+		self._shard(shard_name(job_num, self.size)).discard(job_num)
+
+	def invalidate(self):
+		"""Force the next query to rescan every directory."""
+		self._listing.invalidate()
+		with self._lock:
+			for index in self._shards.values():
+				index.invalidate()
+
+
+if __name__ == '__main__':
+	pass
@@ -15,7 +15,7 @@ from core import Image, Path
 from context import ProjectContextMenu
 from context import ContextHandler as handler
 from job_io import JobIO
-from errors import SecurityError
+from errors import SecurityError, JobInUseError
 from work_orders import WorkOrderConstants
 
 
@@ -30,22 +30,28 @@ class JobFolder(object):
 	job : Job
 		A collection of work orders.
 
-	lock : GateKeeper
-		Controls read and write access to `job` applicaton files.
+	lock : LeaseLock or None
+		Controls read and write access to `job` applicaton files. If ``None``,
+		`job` is a read-only snapshot and the lock is acquired on the first 
+		edit.
 
 	app_data : AppData
 		Core application data model.
 
+	save_queue : SaveQueue
+		Writes `job` to file.
+
 	Attributes
 	----------
 	view : JobFolderView
 
 	"""
-	def __init__(self, job, lock, app_data):
+	def __init__(self, job, lock, app_data, save_queue):
 		self._job = job
 		self._job_num = self._job.job_num
 		self._projects = self._job.projects
 		self._lock = lock
+		self._save_queue = save_queue
 		self._naming_convention = app_data.naming_convention
 		self._templates = app_data.templates
 		self._users = app_data.users
@@ -87,6 +93,84 @@ class JobFolder(object):
 		# Set view
 		self._update_projects()
 
+	@property
+	def read_only(self):
+		"""bool: True if the job lock has not been acquired."""
+		return self._lock is None
+
+	def _set_job(self, job):
+		"""Replace the displayed ``Job``.
+
+		The workspace that was validated on this computer when the folder was
+		opened is kept, since the stored job may have none (admin auto-add) or
+		one created by another user. It is saved with the first edit.
+
+		"""
+		job.workspace = self._job.workspace
+		self._job = job
+		self._projects = self._job.projects
+		self._update_projects()
+
+	def refresh(self):
+		"""Reload a read-only ``Job`` from file.
+
+		Raises
+		------
+		JobNotFoundError
+		IOError
+		EOFError
+
+		"""
+		if self.read_only:
+			self._set_job(JobIO.snapshot(self._job_num))
+
+	def acquire(self):
+		"""Acquire the job lock of a read-only ``JobFolder``.
+
+		The ``Job`` is reloaded once the lock is held, so that changes are made
+		to the latest data.
+
+		Returns
+		-------
+		True
+			If the displayed ``Job`` is unchanged and may be edited.
+
+		Raises
+		------
+		JobInUseError
+		IOError
+		EOFError
+
+		"""
+		if not self.read_only:
+			return True
+		lock = JobIO.lock_job(self._job_num)
+		try:
+			job = JobIO.get(self._job_num)
+		except (IOError, EOFError):
+			lock.unlock()
+			raise
+		current = JobIO.same_job(job, self._job)
+		self._lock = lock
+		self._set_job(job)
+		return current
+
+	def _writable(self):
+		"""Returns True if the ``Job`` may be edited, acquiring the job lock 
+		if necessary."""
+		try:
+			if self.acquire():
+				return True
+			OrphanMessageBox(
+				'Info',
+				['%s was changed by another user and has been reloaded. Try '
+				'again.' % self._job_num],
+				'information'
+			).exec_()
+		except (JobInUseError, IOError, EOFError) as error:
+			ExceptionMessageBox(error).exec_()
+		return False
+
 	def _update_projects(self):
 		"""Set ``ProjectTable`` with current project data."""
 		self.view.table.set_table(self._projects)
@@ -103,7 +187,11 @@ class JobFolder(object):
 		self._selected_dwg_nums = self.view.table.selected_dwg_nums
 		if len(self._selected_dwg_nums) == 1:
 			project = self._projects[self._selected_dwg_nums[0]]
-			self.view.notes.set_notes(project.notes.data)
+			try:
+				# Stored notes are read on first access.
+				self.view.notes.set_notes(project.notes.data)
+			except (IOError, EOFError, ValueError) as error:
+				ExceptionMessageBox(error).exec_()
 		else:
 			self.view.notes.clear()
 
@@ -129,6 +217,8 @@ class JobFolder(object):
 		"""
 		# Selected action text
 		context_action = str(self.view.table.sender().text())
+		if not self._writable():
+			return
 		if context == 'Alias':
 			handler.alias_num(self._selected_dwg_nums, self._projects, 
 				context_action)
@@ -163,32 +253,36 @@ class JobFolder(object):
 		self._update_projects()
 
 	def save(self, on_close=False):
-		"""Save ``Job`` data to file.
+		"""Queue ``Job`` data to be saved to file.
 
 		Parameters
 		----------
 		on_close : bool, optional
 			Defines whether this ``JobFolder`` will close after save. If so,
-			the job lock will be released.
+			the job lock will be released once the data is saved.
 
 		Returns
 		-------
-		True
-			If ``Job`` data was saved to file.
+		bool
+			True if ``Job`` data was queued, False if the ``JobFolder`` is 
+			read-only and there is nothing to save.
 
 		Raises
 		------
 		SecurityError
 			If user does not have rights to save ``Job``.
-		IOError
-			If no such file or directory.
+
+		Notes
+		-----
+		Write errors are reported by ``SaveQueue.FAILED``.
 
 		"""
+		if self.read_only:
+			return False
 		if self._lock.lock_is_acquired:
-			if JobIO.save(self._job_num, self._job):
-				if on_close:
-					self._lock.unlock()
-				return True
+			self._save_queue.put(self._job_num, self._job, 
+				self._lock if on_close else None)
+			return True
 		else:
 			raise SecurityError()
 
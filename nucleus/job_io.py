@@ -1,41 +1,150 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import os
+import time
 import shutil
+import sqlite3
 import getpass
-import cPickle as pickle
-from datetime import datetime
-from gatekeeper.gatekeeper import GateKeeper
+from datetime import date
 from core import Path
 from work_orders import Job, WorkOrderConstants
-from errors import JobNotFoundError, JobInUseError
+import serialization
+from storage import FileJobStore, parallel_map
+from mirror import LocalMirror
+from fileio import make_dirs
+from archive import JobArchive
+from leases import LeaseManager
+import lock_metrics
+from errors import (JobNotFoundError, JobInUseError, ArchiveError, 
+	EditConflictError)
 
 
 __author__ = 'Brandon McCleary'
 
 
+def default_store(mirrored=True):
+	"""Returns the ``FileJobStore`` that holds the active job data.
+
+	Every ``Job`` is kept in its own file, which any number of sessions may
+	share. Job files are read through a mirror on the local disk; call 
+	``start_mirror`` on the store to keep it up to date in the background.
+
+	The SQLite backend in `Path.JOBS_DB` is only safe while a single session 
+	writes to it (see storage.SQLiteJobStore), so it is never chosen here. It
+	is used only when passed to ``JobIO.configure``.
+
+	Parameters
+	----------
+	mirrored : bool, optional
+		If False, job files are read directly from `Path.JOBS`, such as while
+		they are migrated or resharded.
+
+	"""
+	mirror = None
+	if mirrored:
+		try:
+			mirror = LocalMirror(Path.JOBS, Path.JOBS_MIRROR)
+		except OSError:
+			# The local disk is unavailable; read from the network.
+			pass
+	return FileJobStore(Path.JOBS, Path.JOBS_INDEX, mirror=mirror)
+
+
 class JobIO:
 	"""
 	I/O methods designed to support the manipulation of Job objects.
 
+	Attributes
+	----------
+	store : JobStore or None
+		The backend that persists ``Job`` objects. ``None`` until 
+		``configure`` is called.
+
+	leases : LeaseManager or None
+		Renews the job locks held by this session and records their metrics 
+		in `Path.LOCK_METRICS`. ``None`` until ``configure`` is called.
+
+	WORKERS : int
+		The maximum number of concurrent file operations in batch methods.
+
+	UPDATE_ATTEMPTS : int
+		The number of times ``update`` retries an edit that conflicts with 
+		another user's save.
+
 	See Also
 	--------
 	work_orders.Job
 	work_orders.Project
 	work_orders.WorkOrderConstants
-	gatekeeper.GateKeeper
+	storage.JobStore
+	archive.JobArchive
+	leases.LeaseLock
 	errors.JobNotFoundError
 	errors.JobInUseError
+	errors.ArchiveError
+	errors.EditConflictError
 
 	"""
 
+	store = None
+
+	leases = None
+
+	WORKERS = 8
+
+	UPDATE_ATTEMPTS = 5
+
+	@staticmethod
+	def configure(store=None):
+		"""Connect to the job data and start the thread that keeps its local
+		mirror up to date.
+
+		Called once at startup, so that importing this module never touches
+		the network or starts a thread. Does nothing once configured.
+
+		Parameters
+		----------
+		store : JobStore or None, optional
+			The backend that persists ``Job`` objects. If ``None``, per 
+			``default_store``.
+
+		Raises
+		------
+		IOError, OSError
+			If the job data is unavailable.
+
+		"""
+		if JobIO.store is None:
+			JobIO.store = default_store() if store is None else store
+			JobIO.store.start_mirror()
+		if JobIO.leases is None:
+			JobIO.leases = LeaseManager(
+				metrics=lock_metrics.LockMetrics(Path.LOCK_METRICS, 
+					getpass.getuser())
+			)
+
+	@staticmethod
+	def set_store(store):
+		"""Replace the backend that persists ``Job`` objects.
+
+		Parameters
+		----------
+		store : JobStore
+
+		"""
+		JobIO.store = store
+
 	@staticmethod
-	def job_exists(job_num):
+	def job_exists(job_num, refresh=False):
 		"""Returns True if job files were found.
 
 		Parameters
 		----------
 		job_num : str
+
+		refresh : bool, optional
+			If True, cached knowledge of the stored jobs is discarded first.
+			Use where a stale answer could overwrite a job.
 		
 		Raises
 		------
@@ -43,12 +152,9 @@ class JobIO:
 			If the system cannot find the path specified.
 
 		"""
-		try:
-			for f in os.listdir(Path.JOBS):
-				if job_num in f:
-					return True
-		except OSError:
-			raise
+		if refresh:
+			JobIO.store.refresh()
+		return JobIO.store.exists(job_num)
 
 	@staticmethod
 	def init_files(job_num, workspace):
@@ -73,9 +179,7 @@ class JobIO:
 		
 		"""
 		try:
-			# Create empty lockfile
-			with open(os.path.join(Path.JOBS, '%s.lock' % job_num), 'wb') as f:
-				pass
+			JobIO._create_lockfile(job_num)
 			# Save new Job to file
 			JobIO.save(job_num, Job(job_num, workspace))
 		except IOError:
@@ -83,6 +187,114 @@ class JobIO:
 		else:
 			return True
 
+	@staticmethod
+	def init_many(jobs, progress=None):
+		"""Create application files for a set of new jobs in one pass.
+
+		Parameters
+		----------
+		jobs : dict
+			Complete ``Job`` objects organized by job number.
+
+		progress : callable or None, optional
+			Called with each job number as its job is written. May be called
+			from worker threads.
+
+		Returns
+		-------
+		True
+			If files were created successfully.
+
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		Notes
+		-----
+		Each ``Job`` is written once, with all of its projects, before any
+		user can open it, so no lock is acquired.
+
+		"""
+		parallel_map(JobIO._create_lockfile, jobs.keys(), JobIO.WORKERS)
+		return JobIO.store.save_many(jobs, progress)
+
+	@staticmethod
+	def _create_lockfile(job_num):
+		"""Create an empty lockfile."""
+		make_dirs(JobIO.store.job_dir(job_num))
+		with open(JobIO.lock_path(job_num), 'wb') as f:
+			pass
+
+	@staticmethod
+	def lock_path(job_num):
+		"""Returns the absolute path to a job's lockfile."""
+		return os.path.join(JobIO.store.job_dir(job_num), '%s.lock' % job_num)
+
+	@staticmethod
+	def job_directories():
+		"""Get every directory that holds active job data.
+
+		Returns
+		-------
+		list
+			Absolute directory paths.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		return JobIO.store.directories()
+
+	@staticmethod
+	def reshard(shard_size):
+		"""Move the files of every active job into buckets of job numbers.
+
+		Parameters
+		----------
+		shard_size : int or None
+			The number of job numbers per bucket, such as 500 for 
+			'124000-124499'. If ``None``, every job file is kept in 
+			`Path.JOBS`.
+
+		Returns
+		-------
+		moved : list
+			The job numbers whose files were moved.
+
+		errors : dict
+			The exception raised for each job whose files could not all be
+			moved, organized by job number.
+
+		Notes
+		-----
+		Intended to be run once, while no user has the application open.
+
+		"""
+		return JobIO.store.reshard(shard_size)
+
+	@staticmethod
+	def migrate():
+		"""Convert every active job to the current ``serialization`` format.
+
+		Returns
+		-------
+		converted : list
+			The job numbers whose files were converted.
+
+		errors : dict
+			The exception raised for each job that could not be converted,
+			organized by job number.
+
+		Notes
+		-----
+		Intended to be run once, while no user has the application open.
+
+		"""
+		return JobIO.store.migrate()
+
 	@staticmethod
 	def save(job_num, job):
 		"""Serialize a Job object.
@@ -104,13 +316,29 @@ class JobIO:
 			If no such file or directory.
 
 		"""
-		try:
-			with open(os.path.join(Path.JOBS, '%s.nuke' % job_num), 'wb') as f:
-				pickle.dump(job, f)
-		except IOError:
-			raise
-		else:
-			return True
+		return JobIO.store.save(job_num, job)
+
+	@staticmethod
+	def save_many(jobs):
+		"""Serialize a set of Job objects in one pass.
+
+		Parameters
+		----------
+		jobs : dict
+			Job objects organized by job number.
+
+		Returns
+		-------
+		True
+			If save was successful.
+
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		"""
+		return JobIO.store.save_many(jobs)
 
 	@staticmethod
 	def get(job_num):
@@ -129,13 +357,183 @@ class JobIO:
 			If file is empty.
 
 		"""
+		return JobIO.store.get(job_num)
+
+	@staticmethod
+	def update(job_num, edit):
+		"""Apply a single edit to a job without acquiring its lock.
+
+		The job is read along with its version stamp, edited, and saved only if
+		no other user saved it in the meantime. On a conflict, the edit is
+		applied again to the latest data.
+
+		Parameters
+		----------
+		job_num : str
+
+		edit : callable
+			Called with the ``Job`` to modify it in place. May be called more
+			than once, so it must not prompt the user.
+
+		Returns
+		-------
+		Job
+			The job as saved.
+
+		Raises
+		------
+		EditConflictError
+			If every attempt conflicted with another save.
+
+		JobInUseError
+			If the store does not merge saves and the job is locked, per 
+			``_save_unlocked``.
+
+		IOError
+		EOFError
+
+		Notes
+		-----
+		With a store that merges saves, such as ``FileJobStore``, saves made by
+		the holder of the job lock are journaled against the data they loaded,
+		so they do not discard edits made through ``update``.
+
+		"""
+		for attempt in range(JobIO.UPDATE_ATTEMPTS):
+			job, stamp = JobIO.store.get_versioned(job_num)
+			edit(job)
+			if JobIO._save_unlocked(job_num, job, stamp):
+				JobIO.store.flush(job_num)
+				return job
+		raise EditConflictError()
+
+	@staticmethod
+	def _save_unlocked(job_num, job, stamp):
+		"""Save a job per ``JobStore.save_if`` without holding its lock.
+
+		A store that does not merge saves, such as ``SQLiteJobStore``, writes
+		whole jobs, so the next save by the holder of the job lock would 
+		discard the edit. There, the job is only saved while its lock is free,
+		even if the lock has expired, and no user can acquire the lock during
+		the save.
+
+		Raises
+		------
+		JobInUseError
+		IOError
+		EOFError
+
+		"""
+		if JobIO.store.MERGES_SAVES:
+			return JobIO.store.save_if(job_num, job, stamp)
+		path = JobIO.lock_path(job_num)
+		with JobIO.leases.guard(path):
+			lock = JobIO.leases.check(path)
+			if lock is not None:
+				raise JobInUseError(lock.holder)
+			return JobIO.store.save_if(job_num, job, stamp)
+
+	@staticmethod
+	def edit_many(job_nums, edit):
+		"""Apply the same edit to a set of jobs, each under its job lock.
+
+		Locks are acquired in job number order, so that users editing 
+		overlapping sets of jobs contend for the same lock first. The locked 
+		jobs are loaded and saved in one parallel pass each, and every lock 
+		acquired is released before returning. A job that this session already 
+		holds, such as one open in a ``JobFolder``, is reported as in use and 
+		its lock is left to its holder.
+
+		Parameters
+		----------
+		job_nums : iterable
+
+		edit : callable
+			Called with each ``Job`` to modify it in place. A job for which 
+			`edit` raises is not saved.
+
+		Returns
+		-------
+		saved : dict
+			The Job objects that were saved, organized by job number.
+
+		errors : dict
+			The exception raised for each job that was not saved, organized by 
+			job number.
+
+		"""
+		errors = {}
+		locks = {}
+		for job_num in sorted(set(job_nums)):
+			try:
+				if not JobIO.job_exists(job_num):
+					raise JobNotFoundError()
+				locks[job_num] = JobIO.lock_job(job_num)
+			except (JobNotFoundError, JobInUseError, IOError) as error:
+				errors[job_num] = error
+		saved = {}
 		try:
-			with open(os.path.join(Path.JOBS, '%s.nuke' % job_num), 'rb') as f:
-				job = pickle.load(f)
-		except (IOError, EOFError):
-			raise
-		else:
-			return job
+			jobs = JobIO.get_many(locks.keys())
+			errors.update(JobIO.store.load_errors)
+			for job_num, job in jobs.items():
+				try:
+					edit(job)
+				except Exception as error:
+					errors[job_num] = error
+					del jobs[job_num]
+			for job_num, error in parallel_map(JobIO._save_quietly, 
+				jobs.items(), JobIO.WORKERS):
+				if error is None:
+					saved[job_num] = jobs[job_num]
+				else:
+					errors[job_num] = error
+			for job_num in saved:
+				JobIO.store.flush(job_num)
+		finally:
+			for lock in locks.values():
+				lock.unlock()
+		return saved, errors
+
+	@staticmethod
+	def _save_quietly(item):
+		"""Returns (job_num, error) where `error` is ``None`` if the job was 
+		saved."""
+		job_num, job = item
+		try:
+			JobIO.store.save(job_num, job)
+		except (IOError, OSError, sqlite3.Error) as error:
+			return job_num, error
+		return job_num, None
+
+	@staticmethod
+	def get_many(job_nums):
+		"""Retrieve a set of serialized Job objects in one pass.
+
+		Parameters
+		----------
+		job_nums : iterable
+
+		Returns
+		-------
+		dict
+			Job objects organized by job number. Jobs that could not be loaded
+			are excluded and reported by ``load_errors``.
+
+		"""
+		return JobIO.store.get_many(job_nums)
+
+	@staticmethod
+	def flush(job_num):
+		"""Wait for background writes to a job to finish.
+
+		Call before releasing ownership of a saved job.
+
+		Parameters
+		----------
+		job_num : str
+
+		"""
+		JobIO.store.flush(job_num)
 
 	@staticmethod
 	def job_and_lock(job_num):
@@ -149,7 +547,7 @@ class JobIO:
 		-------
 		job : Job
 
-		lock : GateKeeper
+		lock : LeaseLock
 			Restricts job access to a single active user. Modifications to the 
 			job must be made only while the active user has ownership.
 
@@ -166,64 +564,150 @@ class JobIO:
 
 		"""
 		if JobIO.job_exists(job_num):
-			lock = GateKeeper(
-				getpass.getuser(),
-				os.path.join(Path.JOBS, '%s.lock' % job_num)
-			)
-			# Lockfile ownership check
-			if lock.lock() or lock.lock_is_acquired:
-				job = JobIO.get(job_num)
-				return job, lock
-			else:
-				raise JobInUseError(lock.owner)
+			lock = JobIO.lock_job(job_num)
+			return JobIO.get(job_num), lock
 		else:
 			raise JobNotFoundError()
 
 	@staticmethod
-	def active_job_nums():
-		"""Returns a set of all active job numbers.
+	def snapshot(job_num):
+		"""Retrieve a job for viewing without acquiring its lock.
+
+		Parameters
+		----------
+		job_num : str
+
+		Returns
+		-------
+		Job
+			A consistent copy of the stored job. It must not be saved; use 
+			``lock_job`` before making changes.
 
 		Raises
 		------
-		OSError
-			If the system cannot find the path specified.
-		
+		JobNotFoundError
+		IOError
+		EOFError
+
 		"""
-		return {f[:6] for f in os.listdir(Path.JOBS)}
+		if not JobIO.job_exists(job_num):
+			raise JobNotFoundError()
+		return JobIO.store.snapshot(job_num)
 
 	@staticmethod
-	def active_job_temp_files():
-		"""Copy active job files and paste into temp directory.
+	def lock_job(job_num):
+		"""Acquire the lock of a job.
+
+		Parameters
+		----------
+		job_num : str
 
 		Returns
 		-------
-		temp_filename_list : list
-			The filenames of all active job temp files.
+		LeaseLock
+			Per job_and_lock.
+
+		Raises
+		------
+		JobInUseError
+		IOError
 
 		Notes
 		-----
-		The temp file extensions assume the active username so that there are no 
-		conflicts when multiple users call this function. If a new temp file has 
-		the same signature as an existing temp file, the existing temp file is 
-		overridden.
-
-		"""
-		temp_filename_list = []
-		user = getpass.getuser()
-		for job in JobIO.active_job_nums():
-			original = job + '.nuke'
-			temp_file = job + '.%s' % user
-			temp_filename_list.append(temp_file)
-			try:
-				shutil.copy(
-					os.path.join(Path.JOBS, original), 
-					os.path.join(Path.TEMP, temp_file)
-				)
-			except OSError:
-				# Ignore issues raised for poor network connectivity and 
-				# race conditions that arise from jobs being completed.
-				pass
-		return temp_filename_list
+		A lock left by a user whose session ended without releasing it expires 
+		once it is no longer renewed, and is then acquired normally.
+
+		"""
+		lock = JobIO.leases.lease(getpass.getuser(), JobIO.lock_path(job_num))
+		if lock.lock():
+			return lock
+		raise JobInUseError(lock.owner)
+
+	@staticmethod
+	def lock_status():
+		"""Report every held job lock in one pass.
+
+		Returns
+		-------
+		dict
+			``LockStatus`` objects, holding the user, computer, and age of each 
+			lock, organized by job number.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		return JobIO.leases.status(JobIO.job_directories())
+
+	@staticmethod
+	def reap_locks():
+		"""Release every expired job lock.
+
+		Returns
+		-------
+		list
+			The job numbers whose locks were released.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		return JobIO.leases.reap(JobIO.job_directories())
+
+	@staticmethod
+	def lock_report(since=None):
+		"""Summarize job lock contention, acquire latency, and hold duration 
+		for the most affected jobs and users.
+
+		Parameters
+		----------
+		since : datetime or None, optional
+			If given, earlier lock events are ignored.
+
+		Returns
+		-------
+		list
+			Lines of text.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		if since is not None:
+			since = time.mktime(since.timetuple())
+		return lock_metrics.report(Path.LOCK_METRICS, since)
+
+	@staticmethod
+	def same_job(job, other):
+		"""Returns True if two Job objects hold the same projects and note 
+		counts. Workspaces are not compared."""
+		return serialization.encode_job(job, notes=False)[::2] == \
+			serialization.encode_job(other, notes=False)[::2]
+
+	@staticmethod
+	def active_job_nums(refresh=False):
+		"""Returns a set of all active job numbers.
+
+		Parameters
+		----------
+		refresh : bool, optional
+			If True, cached knowledge of the stored jobs is discarded first.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+		
+		"""
+		if refresh:
+			JobIO.store.refresh()
+		return JobIO.store.job_nums()
 
 	@staticmethod
 	def clear_temp_files(file_list):
@@ -238,30 +722,98 @@ class JobIO:
 		[os.remove(os.path.join(Path.TEMP, temp_file)) for temp_file in file_list]
 
 	@staticmethod
-	def existing_projects():
-		"""Retrieve the projects from all active jobs.
-		
+	def job_summaries(job_num):
+		"""Retrieve the project summaries of a single job.
+
+		Parameters
+		----------
+		job_num : str
+
 		Returns
 		-------
-		existing_projects : dict
-			Project objects organized by their associated drawing numbers.
+		dict
+			``ProjectSummary`` objects organized by their associated drawing 
+			numbers. Empty if `job_num` is not an active job.
+
+		Raises
+		------
+		IOError
+		EOFError
 
 		"""
-		existing_projects = {}
-		active_job_temp_files = JobIO.active_job_temp_files()
-		for filename in active_job_temp_files:
-			try:
-				with open(os.path.join(Path.TEMP, filename), 'rb') as job:
-					temp_job = pickle.load(job)
-					temp_proj = temp_job.projects
-					for project in temp_proj.keys():
-						existing_projects[project] = temp_proj[project]
-			except OSError:
-				# Ignore issues raised for poor network connectivity and 
-				# race conditions that arise from jobs being completed.
-				pass
-		JobIO.clear_temp_files(active_job_temp_files)
-		return existing_projects
+		return JobIO.store.job_summaries(job_num)
+
+	@staticmethod
+	def job_signatures():
+		"""Get a value for every active job that changes whenever the job is
+		saved.
+
+		Returns
+		-------
+		dict
+			Signatures organized by job number.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		return JobIO.store.signatures()
+
+	@staticmethod
+	def project_summaries():
+		"""Retrieve the project summaries from all active jobs.
+
+		Returns
+		-------
+		dict
+			``ProjectSummary`` objects organized by their associated drawing 
+			numbers.
+
+		Notes
+		-----
+		Summaries are served from the index maintained by ``save``, so no
+		``Job`` objects are loaded. Use ``get`` or ``get_many`` when project 
+		notes are required.
+
+		"""
+		return JobIO.store.summaries()
+
+	@staticmethod
+	def owner_summaries(owner):
+		"""Retrieve the project summaries assigned to a single owner.
+
+		Parameters
+		----------
+		owner : str
+
+		Returns
+		-------
+		dict
+			``ProjectSummary`` objects organized by their associated drawing 
+			numbers.
+
+		Notes
+		-----
+		Only the jobs listed for `owner` by the owner index are read. Jobs 
+		that could not be loaded are reported by ``load_errors``.
+
+		"""
+		return JobIO.store.owner_summaries(owner)
+
+	@staticmethod
+	def load_errors():
+		"""Report the jobs that could not be loaded by ``project_summaries``,
+		``owner_summaries``, or ``get_many``.
+
+		Returns
+		-------
+		dict
+			The exception raised for each job, organized by job number.
+
+		"""
+		return dict(JobIO.store.load_errors)
 
 	@staticmethod
 	def sort_project_data(project_dict):
@@ -296,53 +848,6 @@ class JobIO:
 		else:
 			return job_dict
 
-	@staticmethod
-	def jobs_at_a_glance(job_dict):
-		"""Get a summarized report of active job data.
-
-		Parameters
-		----------
-		job_dict : dict
-			See JobIO.sort_project_data.
-
-		Returns
-		-------
-		jobs : dict
-			A dictionary of dictionaries comprised of project due date 
-			information and organized by job number. Nested keys include
-			'expired' (past due), 'today' (due today), and 'approaching' (due
-			within 2 days). Nested values are the integer number of Project
-			objects whose due dates fall within the key category.
-
-		"""
-		jobs = {}
-		completed = WorkOrderConstants.STATUS_LIST[-1]
-
-		# Get a reference for today's date to check against project due dates.
-		now = datetime.strptime(datetime.now().strftime('%m/%d/%Y'), '%m/%d/%Y')
-
-		for job in job_dict.keys():
-			expired = 0
-			today = 0
-			approaching = 0
-			for project in job_dict[job]:
-				if project.status != completed:  # Ignore completed projects
-					due_date = datetime.strptime(project.due_date, '%m/%d/%Y')
-					delta = (due_date - now).days
-					if delta < 0:
-						expired += 1
-					elif delta == 0:
-						today += 1		
-					elif delta < 3:
-						approaching +=1
-
-			jobs[job] = {
-				'expired' : expired,
-				'today' : today,
-				'approaching' : approaching
-			}
-		return jobs
-
 	@staticmethod
 	def drawing_nums_from_job(job):
 		"""Return the list of drawing numbers in a Job object."""
@@ -359,31 +864,86 @@ class JobIO:
 		return text.count('-') == 3
 
 	@staticmethod
-	def clear_job_files(job_num):
+	def archive_job(job_num, job):
+		"""Keep the data of a job that is being completed.
+
+		Call before ``clear_job_files``.
+
+		Parameters
+		----------
+		job_num : str
+
+		job : Job
+
+		Raises
+		------
+		ArchiveError
+			If the job could not be archived.
+
+		"""
+		try:
+			JobArchive(Path.ARCHIVE_DB).add(job_num, job, getpass.getuser())
+		except (IOError, OSError, EOFError, ValueError, sqlite3.Error):
+			# Unreadable notes or an unavailable archive.
+			raise ArchiveError()
+
+	@staticmethod
+	def archived_job(job_num):
+		"""Returns a completed Job object.
+
+		Raises
+		------
+		KeyError
+			If `job_num` was never archived.
+
+		"""
+		return JobArchive(Path.ARCHIVE_DB).get(job_num)
+
+	@staticmethod
+	def archived_projects(**filters):
+		"""Find the projects of completed jobs.
+
+		Parameters
+		----------
+		filters
+			Per archive.JobArchive.projects.
+
+		Returns
+		-------
+		list
+			``ArchivedProject`` objects ordered by drawing number.
+
+		"""
+		return JobArchive(Path.ARCHIVE_DB).projects(**filters)
+
+	@staticmethod
+	def clear_job_files(job_num, lock):
 		"""Delete the files associated with a job number.
 
 		Parameters
 		----------
 		job_num : str
 
+		lock : LeaseLock
+			The held lock of the job, which is released by removing its 
+			lockfile.
+
 		Returns
 		-------
 		True
-			If 2 job files (.nuke, .lock) were deleted.
+			If both the job data and its lockfile were deleted.
 
 		Raises
 		------
+		IOError
+			Per leases.LeaseLock.remove.
+
 		OSError
 			If the system cannot find the path specified.
 
 		"""
-		file_count = 2
-		for f in os.listdir(Path.JOBS):
-			if job_num in f:
-				os.remove(os.path.join(Path.JOBS, f))
-				file_count -= 1
-				if file_count == 0:
-					return True
+		lock.remove()
+		return JobIO.store.delete(job_num)
 
 	@staticmethod
 	def job_due_date(job):
@@ -401,17 +961,13 @@ class JobIO:
 		
 		"""
 		NOT_FOUND_MSG = 'not found'
-		format = WorkOrderConstants.DATE_FORMAT
-		proj_dates = []
 		try:
-			for proj in job.projects.keys():
-				proj_dates.append(datetime.strptime(job.projects[proj].due_date, 
-					format))
-		except (AttributeError, ValueError):
-			# proj_dates is an empty list.
+			latest = max(p.due_ordinal for p in job.projects.values())
+		except (AttributeError, TypeError, ValueError):
+			# No projects, or a due date could not be parsed.
 			return NOT_FOUND_MSG
-		else:
-			return datetime.strftime(max(proj_dates), format)
+		return date.fromordinal(latest).strftime(
+			WorkOrderConstants.DATE_FORMAT)
 
 	@staticmethod
 	def move(src, dst_dir):
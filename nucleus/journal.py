@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module provides the append-only mutation journal that lets a saved ``Job``
+be updated without rewriting its entire file.
+
+Each journal entry mirrors a single ``context.ContextHandler`` mutation:
+
+	('workspace', workspace)
+	('put', dwg_num, project)            New, copied, or replaced project
+	('delete', dwg_num)
+	('rename', old_dwg_num, new_dwg_num)  Drawing number change
+	('set', dwg_num, attribute, value)    Alias, owner, due date, or status
+	('note', dwg_num, signature, note)
+
+Entries are written with ``serialization.frame`` and appended to a per-job
+file, so each record carries its own length and a record torn by a crash is
+detected and ignored.
+
+"""
+import serialization
+
+
+__author__ = 'Brandon McCleary'
+
+
+# The Project attributes, in serialization.encode_project order.
+FIELDS = ('alias_num', 'owner', 'due_date', 'status')
+
+
+def diff(old, new, job):
+	"""Get the journal entries that transform one ``Job`` payload into another.
+
+	Parameters
+	----------
+	old : tuple
+		Per serialization.encode_job without notes, the state of the job on 
+		file.
+
+	new : tuple
+		Per serialization.encode_job without notes, the modified job.
+
+	job : Job
+		The modified job, which supplies added notes and projects.
+
+	Returns
+	-------
+	entries : list
+
+	Notes
+	-----
+	Notes are append-only, so added notes are found by comparing note counts.
+	Stored notes are not loaded unless a project must be written in full.
+
+	"""
+	entries = []
+	if old[1] != new[1]:
+		entries.append(('workspace', new[1]))
+
+	old_projects = dict(old[2])
+	new_projects = dict(new[2])
+	removed = [k for k in old_projects if k not in new_projects]
+	added = [k for k in new_projects if k not in old_projects]
+
+	# A project whose drawing number changed keeps its alias and its stored,
+	# unloaded note history. Projects created in memory always have loaded
+	# notes.
+	renamed = {}
+	for k in added:
+		if job.projects[k].notes.loaded:
+			continue
+		for r in removed:
+			if r not in renamed and (old_projects[r][0], old_projects[r][4]) \
+				== (new_projects[k][0], new_projects[k][4]):
+				renamed[r] = k
+				entries.append(('rename', r, k))
+				break
+
+	for r in removed:
+		if r not in renamed:
+			entries.append(('delete', r))
+	for k in added:
+		if k not in renamed.values():
+			entries.append(
+				('put', k, serialization.encode_project(job.projects[k]))
+			)
+
+	# Compare persisting projects against their previous state.
+	pairs = [(k, old_projects[k]) for k in new_projects if k in old_projects]
+	pairs += [(k, old_projects[r]) for r, k in renamed.items()]
+	for k, o in pairs:
+		n = new_projects[k]
+		for i, attr in enumerate(FIELDS):
+			if o[i] != n[i]:
+				entries.append(('set', k, attr, n[i]))
+		if n[4] > o[4]:
+			for signature, note in job.projects[k].notes.tail(n[4] - o[4]):
+				entries.append(('note', k, signature, note))
+		elif n[4] < o[4]:
+			entries.append(
+				('put', k, serialization.encode_project(job.projects[k]))
+			)
+	return entries
+
+
+def apply(job, entry):
+	"""Apply a journal entry to a ``Job``.
+
+	Parameters
+	----------
+	job : Job
+
+	entry : tuple
+
+	Notes
+	-----
+	Entries that refer to a project missing from `job` are ignored.
+
+	"""
+	op = entry[0]
+	if op == 'workspace':
+		job.workspace = entry[1]
+	elif op == 'put':
+		job.projects[entry[1]] = serialization.decode_project(entry[2])
+	elif op == 'delete':
+		job.projects.pop(entry[1], None)
+	elif entry[1] not in job.projects:
+		return
+	elif op == 'rename':
+		job.projects[entry[2]] = job.projects.pop(entry[1])
+	elif op == 'set':
+		setattr(job.projects[entry[1]], entry[2], entry[3])
+	elif op == 'note':
+		job.projects[entry[1]].notes.append(entry[2], entry[3])
+
+
+def dumps(entries):
+	"""Serialize journal entries for a single append."""
+	return ''.join(serialization.frame(e) for e in entries)
+
+
+def loads(data):
+	"""Deserialize the complete journal entries found in `data`.
+
+	Returns
+	-------
+	entries : list
+		Reading stops at the first incomplete or unreadable record.
+
+	"""
+	entries = []
+	offset = 0
+	while offset < len(data):
+		length = serialization.frame_length(data, offset)
+		try:
+			version, entry = serialization.unframe(data[offset:offset + length])
+		except (EOFError, ValueError):
+			break
+		entries.append(entry)
+		offset += length
+	return entries
+
+
+if __name__ == '__main__':
+	pass
@@ -0,0 +1,490 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module provides job locks that expire unless their holder keeps renewing
+them.
+
+"""
+import os
+import time
+import errno
+import socket
+import threading
+from collections import namedtuple
+import lock_metrics
+from fileio import (replace, read_file, mutex_file, list_stats, server_time,
+	file_age)
+
+
+__author__ = 'Brandon McCleary'
+
+
+LockStatus = namedtuple('LockStatus', ['holder', 'host', 'age', 'stale',
+	'path'])
+
+
+class LeaseManager(object):
+	"""
+	Renews the leases held by this process and reports the leases of all
+	users.
+
+	A lease is recorded in a job's lockfile as the holder's username and
+	computer name. The modification time of the lockfile is the time of the
+	last renewal, so a lease left by a computer that crashed or lost its
+	network connection expires once `ttl` seconds pass without a renewal, and
+	is taken over by the next user who locks the job. An empty lockfile is
+	not held. A job is held by at most one lease of this process, so a lease
+	that is still renewed is never released by another ``LeaseLock`` of the
+	same user. Ages are measured by the clock of the file server, per 
+	``fileio.file_age``, since the clocks of users' computers may disagree.
+
+	Parameters
+	----------
+	ttl : float, optional
+		Seconds a lease remains valid without being renewed.
+
+	interval : float or None, optional
+		Seconds between renewals. If ``None``, a third of `ttl` is used so
+		that a lease survives two failed renewals.
+
+	metrics : LockMetrics or None, optional
+		Records the acquire latency, hold duration, and contention of every
+		lease.
+
+	Attributes
+	----------
+	EXT : str
+		The extension of lockfiles.
+
+	GUARD_EXT : str
+		The extension of the mutex file held while a lockfile is changed.
+
+	GUARD_TIMEOUT : float
+		Seconds to wait for another user to finish changing a lockfile.
+
+	GUARD_STALE : float
+		Seconds after which a mutex file left by a crash is removed.
+
+	See Also
+	--------
+	fileio.mutex_file
+	job_io.JobIO.lock_job
+
+	"""
+
+	EXT = '.lock'
+	GUARD_EXT = '.acquiring'
+	GUARD_TIMEOUT = 5.0
+	GUARD_STALE = 30.0
+
+	def __init__(self, ttl=300.0, interval=None, metrics=None):
+		self.ttl = ttl
+		self.interval = ttl / 3.0 if interval is None else interval
+		self.metrics = metrics
+		self._lock = threading.Lock()
+		self._held = {}
+		self._worker = None
+
+	def lease(self, user, path):
+		"""Returns an unlocked ``LeaseLock``.
+
+		Parameters
+		----------
+		user : str
+
+		path : str
+			Absolute path to the lockfile.
+
+		"""
+		return LeaseLock(user, path, self)
+
+	def is_stale(self, path, mtime=None):
+		"""Returns True if the lease recorded in a lockfile has expired.
+
+		Parameters
+		----------
+		path : str
+			Absolute path to the lockfile.
+
+		mtime : float or None, optional
+			The modification time of `path`, if already known.
+
+		Raises
+		------
+		OSError
+			If no such file or directory.
+
+		"""
+		return file_age(path, mtime) > self.ttl
+
+	def check(self, path):
+		"""Report the holder of a single lockfile.
+
+		Parameters
+		----------
+		path : str
+			Absolute path to the lockfile.
+
+		Returns
+		-------
+		LockStatus or None
+			``None`` if the lockfile is missing or empty.
+
+		Raises
+		------
+		IOError
+			If the lockfile cannot be read.
+
+		EOFError
+			If the lockfile changed while being read.
+
+		"""
+		try:
+			data = read_file(path)
+			mtime = os.stat(path).st_mtime
+			age = file_age(path, mtime)
+		except (IOError, OSError) as error:
+			if error.errno == errno.ENOENT:
+				return None
+			raise IOError(error.errno, error.strerror, path)
+		holder, host = _parse(data)
+		if not holder:
+			return None
+		return LockStatus(holder, host, age, age > self.ttl, path)
+
+	def guard(self, path):
+		"""Hold the mutex that serializes changes to a lockfile.
+
+		Raises
+		------
+		IOError
+			If another user holds the mutex for longer than `GUARD_TIMEOUT`.
+
+		"""
+		return mutex_file(path + self.GUARD_EXT, self.GUARD_TIMEOUT,
+			self.GUARD_STALE, 'Job is being locked by another user')
+
+	def _record(self, kind, job_num, seconds):
+		if self.metrics is not None:
+			self.metrics.record(kind, job_num, seconds)
+
+	def holder(self, path):
+		"""Returns the ``LeaseLock`` of this process that holds a lockfile, 
+		or ``None``.
+
+		Parameters
+		----------
+		path : str
+			Absolute path to the lockfile.
+
+		"""
+		with self._lock:
+			lease = self._held.get(path)
+		if lease is not None and lease.lock_is_acquired:
+			return lease
+		return None
+
+	def _hold(self, lease):
+		"""Renew `lease` until it is released."""
+		with self._lock:
+			self._held[lease.path] = lease
+			if self._worker is None:
+				self._worker = threading.Thread(target=self._run)
+				self._worker.daemon = True
+				self._worker.start()
+
+	def _release(self, lease):
+		with self._lock:
+			if self._held.get(lease.path) is lease:
+				del self._held[lease.path]
+
+	def renew_all(self):
+		"""Renew every lease held by this process.
+
+		Returns
+		-------
+		list
+			The leases that were lost to another user and are no longer
+			renewed.
+
+		"""
+		with self._lock:
+			held = list(self._held.values())
+		lost = [lease for lease in held if not lease.renew()]
+		for lease in lost:
+			self._release(lease)
+		return lost
+
+	def _run(self):
+		"""Worker thread."""
+		while True:
+			time.sleep(self.interval)
+			self.renew_all()
+
+	def status(self, directories):
+		"""Report the holder and age of every held lock in a set of
+		directories.
+
+		Each directory is listed once. Only the lockfiles that the listing
+		shows to be held are read.
+
+		Parameters
+		----------
+		directories : iterable
+			Absolute paths to the directories that contain lockfiles.
+
+		Returns
+		-------
+		dict
+			``LockStatus`` objects organized by job number.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified, or a directory 
+			that holds a lockfile is not writable.
+
+		"""
+		held = []
+		for directory in directories:
+			listed = [
+				(filename, mtime)
+				for filename, (mtime, size) in list_stats(directory)
+				if size > 0 and filename.endswith(self.EXT)
+			]
+			if not listed:
+				continue
+			now = server_time(directory)
+			for filename, mtime in listed:
+				held.append((
+					filename[:-len(self.EXT)],
+					os.path.join(directory, filename),
+					now - mtime
+				))
+		status = {}
+		for job_num, path, age in held:
+			try:
+				holder, host = _parse(read_file(path))
+			except (IOError, EOFError):
+				# Released or removed in the meantime.
+				continue
+			if holder:
+				status[job_num] = LockStatus(holder, host, age,
+					age > self.ttl, path)
+		return status
+
+	def reap(self, directories):
+		"""Release every expired lease in a set of directories.
+
+		Parameters
+		----------
+		directories : iterable
+			Per ``status``.
+
+		Returns
+		-------
+		list
+			The job numbers whose leases were released.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		reaped = []
+		for job_num, lock in sorted(self.status(directories).items()):
+			if not lock.stale:
+				continue
+			try:
+				with self.guard(lock.path):
+					# The holder may have renewed since the listing.
+					if self.is_stale(lock.path):
+						_write(lock.path, '')
+						reaped.append(job_num)
+			except (IOError, OSError):
+				continue
+		return reaped
+
+
+class LeaseLock(object):
+	"""
+	Restricts a job to a single active user for as long as the lease is
+	renewed.
+
+	Parameters
+	----------
+	user : str
+
+	path : str
+		Absolute path to the lockfile.
+
+	manager : LeaseManager
+
+	Attributes
+	----------
+	owner : str or None
+		The user who holds the lease, as of the last call to ``lock``.
+
+	lock_is_acquired : bool
+		True while this lock holds the lease. Becomes False if the lease
+		expired and was taken over by another user.
+
+	"""
+
+	def __init__(self, user, path, manager):
+		self.user = user
+		self.path = path
+		self.manager = manager
+		self.owner = None
+		self.lock_is_acquired = False
+		self.job_num = os.path.basename(path)[:-len(manager.EXT)]
+		self._record = _format(user, socket.gethostname())
+		self._acquired = None
+
+	def lock(self):
+		"""Acquire the lease.
+
+		A lease recorded by the same user on the same computer, such as one 
+		left by a crash, is acquired again. A lease that this process still 
+		renews, such as that of an open ``JobFolder``, is not shared.
+
+		Returns
+		-------
+		bool
+			True if the lease was acquired. Otherwise, `owner` is the user who
+			holds it.
+
+		Raises
+		------
+		IOError
+			If the lockfile cannot be read or written.
+
+		"""
+		start = time.time()
+		with self.manager.guard(self.path):
+			holder = self.manager.holder(self.path)
+			if holder not in (None, self):
+				# Held by another lease of this process.
+				self.owner = holder.user
+				self.manager._record(lock_metrics.CONTENDED, self.job_num,
+					time.time() - start)
+				return False
+			try:
+				data = read_file(self.path)
+				mtime = os.stat(self.path).st_mtime
+			except (IOError, OSError) as error:
+				if error.errno != errno.ENOENT:
+					raise
+				data, mtime = '', None
+			held = data and data != self._record
+			try:
+				expired = held and self.manager.is_stale(self.path, mtime)
+			except OSError as error:
+				raise IOError(error.errno, error.strerror, self.path)
+			if held and not expired:
+				self.owner = _parse(data)[0]
+				self.manager._record(lock_metrics.CONTENDED, self.job_num,
+					time.time() - start)
+				return False
+			_write(self.path, self._record)
+			self._acquired = time.time()
+			self.owner = self.user
+			self.lock_is_acquired = True
+			self.manager._hold(self)
+		self.manager._record(
+			lock_metrics.TAKEN_OVER if held else lock_metrics.ACQUIRED,
+			self.job_num, self._acquired - start
+		)
+		return True
+
+	def renew(self):
+		"""Extend the lease.
+
+		Returns
+		-------
+		bool
+			False if the lease is no longer held. A renewal that fails because
+			of poor network connectivity is retried on the next heartbeat.
+
+		"""
+		if not self.lock_is_acquired:
+			return False
+		try:
+			with self.manager.guard(self.path):
+				if read_file(self.path) != self._record:
+					# Expired and taken over by another user.
+					return self._lose()
+				os.utime(self.path, None)
+		except (IOError, OSError, EOFError) as error:
+			if getattr(error, 'errno', None) == errno.ENOENT:
+				# The job was completed or deleted.
+				return self._lose()
+		return True
+
+	def _lose(self):
+		"""Record the loss of the lease. Returns False."""
+		self.lock_is_acquired = False
+		self.manager._record(lock_metrics.LOST, self.job_num,
+			time.time() - self._acquired)
+		return False
+
+	def remove(self):
+		"""Release the lease by removing the lockfile, such as when the job is
+		completed.
+
+		Raises
+		------
+		IOError
+			If another user is changing the lockfile.
+
+		OSError
+			If the lockfile cannot be removed.
+
+		"""
+		self.manager._release(self)
+		with self.manager.guard(self.path):
+			os.remove(self.path)
+		if self.lock_is_acquired:
+			self.lock_is_acquired = False
+			self.manager._record(lock_metrics.RELEASED, self.job_num,
+				time.time() - self._acquired)
+
+	def unlock(self):
+		"""Release the lease. A lease that cannot be released expires."""
+		self.manager._release(self)
+		if not self.lock_is_acquired:
+			return
+		self.lock_is_acquired = False
+		self.manager._record(lock_metrics.RELEASED, self.job_num,
+			time.time() - self._acquired)
+		try:
+			with self.manager.guard(self.path):
+				if read_file(self.path) == self._record:
+					_write(self.path, '')
+		except (IOError, OSError, EOFError):
+			pass
+
+
+def _format(user, host):
+	"""Returns the lockfile contents of a lease."""
+	return '%s\t%s' % (user, host)
+
+
+def _parse(data):
+	"""Returns the (holder, host) recorded in a lockfile."""
+	holder, _, host = data.partition('\t')
+	return holder.strip(), host.strip()
+
+
+def _write(path, data):
+	"""Replace the contents of a lockfile in a single step, so that the lease
+	is never seen partially written."""
+	temp = path + '.tmp'
+	with open(temp, 'wb') as f:
+		f.write(data)
+	replace(temp, path)
+
+
+if __name__ == '__main__':
+	pass
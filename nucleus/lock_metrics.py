@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module records how job locks are acquired, contended, and held, and
+summarizes the records of all users.
+
+"""
+import os
+import time
+import struct
+import threading
+from collections import namedtuple, defaultdict
+from fileio import read_file, make_dirs, list_stats
+
+
+__author__ = 'Brandon McCleary'
+
+
+# Event kinds
+ACQUIRED = 1
+CONTENDED = 2
+TAKEN_OVER = 3
+RELEASED = 4
+LOST = 5
+
+# Timestamp, kind, job number, seconds
+_RECORD = struct.Struct('<dB6sf')
+
+
+LockSummary = namedtuple('LockSummary', [
+	'acquired', 'contended', 'taken_over', 'lost', 'acquire_mean',
+	'acquire_max', 'hold_mean', 'hold_max'
+])
+
+
+class LockMetrics(object):
+	"""
+	Appends the lock events of a single user to a metrics file.
+
+	Parameters
+	----------
+	directory : str
+		Absolute path to the directory shared by the metrics files of all
+		users.
+
+	user : str
+
+	Attributes
+	----------
+	EXT : str
+		The extension of metrics files.
+
+	Notes
+	-----
+	Each event is a fixed 19-byte record, so files from every user can be
+	read and summarized without parsing text. Seconds are the acquire latency
+	for ``ACQUIRED``, ``CONTENDED``, and ``TAKEN_OVER`` events and the hold
+	duration for ``RELEASED`` and ``LOST`` events.
+
+	"""
+
+	EXT = '.locks'
+
+	def __init__(self, directory, user):
+		self.directory = directory
+		self.path = os.path.join(directory, user + self.EXT)
+		self._lock = threading.Lock()
+
+	def record(self, kind, job_num, seconds):
+		"""Append a lock event.
+
+		Metrics are not essential, so a failed write is ignored.
+
+		Parameters
+		----------
+		kind : int
+
+		job_num : str
+
+		seconds : float
+
+		"""
+		data = _RECORD.pack(time.time(), kind, job_num, seconds)
+		try:
+			with self._lock:
+				make_dirs(self.directory)
+				with open(self.path, 'ab') as f:
+					f.write(data)
+		except (IOError, OSError):
+			pass
+
+
+def read_events(path):
+	"""Yields the (timestamp, kind, job_num, seconds) of every event in a
+	metrics file.
+
+	Raises
+	------
+	IOError
+		If no such file or directory.
+
+	"""
+	data = read_file(path)
+	# A record still being appended by another session is skipped.
+	for offset in range(0, len(data) - _RECORD.size + 1, _RECORD.size):
+		timestamp, kind, job_num, seconds = _RECORD.unpack_from(data, offset)
+		yield timestamp, kind, job_num.rstrip('\0'), seconds
+
+
+def summarize(directory, since=None):
+	"""Summarize the lock events of every user.
+
+	Parameters
+	----------
+	directory : str
+		Per ``LockMetrics``.
+
+	since : float or None, optional
+		If given, events recorded before this timestamp are ignored.
+
+	Returns
+	-------
+	jobs : dict
+		``LockSummary`` objects organized by job number.
+
+	users : dict
+		``LockSummary`` objects organized by username.
+
+	Raises
+	------
+	OSError
+		If the system cannot find the path specified.
+
+	"""
+	by_job = defaultdict(_Tally)
+	by_user = defaultdict(_Tally)
+	for filename, _ in list_stats(directory):
+		if not filename.endswith(LockMetrics.EXT):
+			continue
+		user = filename[:-len(LockMetrics.EXT)]
+		try:
+			events = list(read_events(os.path.join(directory, filename)))
+		except (IOError, EOFError):
+			continue
+		for timestamp, kind, job_num, seconds in events:
+			if since is None or timestamp >= since:
+				by_job[job_num].add(kind, seconds)
+				by_user[user].add(kind, seconds)
+	return (
+		{k: v.summary() for k, v in by_job.items()},
+		{k: v.summary() for k, v in by_user.items()}
+	)
+
+
+def report(directory, since=None, top=10):
+	"""Describe lock contention for the jobs and users most affected.
+
+	Parameters
+	----------
+	directory : str
+		Per ``LockMetrics``.
+
+	since : float or None, optional
+		Per ``summarize``.
+
+	top : int, optional
+		The number of jobs and users listed.
+
+	Returns
+	-------
+	list
+		Lines of text.
+
+	Raises
+	------
+	OSError
+		If the system cannot find the path specified.
+
+	"""
+	jobs, users = summarize(directory, since)
+	lines = []
+	for title, summaries in (('Job', jobs), ('User', users)):
+		lines.append(
+			'%-10s %8s %9s %10s %5s %11s %11s %9s %9s' % (title, 'Acquired',
+			'Contended', 'Taken Over', 'Lost', 'Wait Mean', 'Wait Max',
+			'Hold Mean', 'Hold Max')
+		)
+		ranked = sorted(summaries.items(),
+			key=lambda item: (-item[1].contended, -item[1].acquire_max))
+		for name, s in ranked[:top]:
+			lines.append(
+				'%-10s %8d %9d %10d %5d %10.2fs %10.2fs %8.0fm %8.0fm' % (name,
+				s.acquired, s.contended, s.taken_over, s.lost, s.acquire_mean,
+				s.acquire_max, s.hold_mean / 60, s.hold_max / 60)
+			)
+		lines.append('')
+	return lines
+
+
+class _Tally(object):
+	"""Accumulates the events of a single job or user."""
+
+	def __init__(self):
+		self.counts = defaultdict(int)
+		self.waits = []
+		self.holds = []
+
+	def add(self, kind, seconds):
+		self.counts[kind] += 1
+		if kind in (ACQUIRED, CONTENDED, TAKEN_OVER):
+			self.waits.append(seconds)
+		else:
+			self.holds.append(seconds)
+
+	def summary(self):
+		return LockSummary(
+			self.counts[ACQUIRED] + self.counts[TAKEN_OVER],
+			self.counts[CONTENDED],
+			self.counts[TAKEN_OVER],
+			self.counts[LOST],
+			_mean(self.waits),
+			max(self.waits or [0.0]),
+			_mean(self.holds),
+			max(self.holds or [0.0])
+		)
+
+
+def _mean(values):
+	return sum(values) / len(values) if values else 0.0
+
+
+if __name__ == '__main__':
+	pass
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module provides the command line tools that maintain the active job 
+data. Run 'migrate', 'reshard', and 'sqlite' while no user has the 
+application open:
+
+	python maintenance.py migrate
+		Convert legacy job files to the current format.
+
+	python maintenance.py reshard 500
+		Move job files into buckets of 500 job numbers, such as 
+		'124000-124499'. Use 'none' to move them back into `Path.JOBS`.
+
+	python maintenance.py sqlite
+		Copy every job into `Path.JOBS_DB`. Sessions keep using the job files
+		unless they pass an ``SQLiteJobStore`` to ``JobIO.configure``, which 
+		is only safe while a single session writes to it.
+
+	python maintenance.py locks --days 30
+		Report job lock contention, acquire latency, and hold duration over
+		the last 30 days, or since metrics were first recorded.
+
+	python maintenance.py reap
+		List the held job locks and release the ones that expired, such as 
+		those left by a session that crashed.
+
+	python maintenance.py archive --owner Jaye --start 2020-01-01
+		List the projects of completed jobs, filtered by job, drawing 
+		number, owner, or completion date. With --job, the notes of the 
+		archived job are listed as well.
+
+"""
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta
+from core import Path
+from job_io import JobIO, default_store
+from storage import SQLiteJobStore, copy_jobs
+
+
+__author__ = 'Brandon McCleary'
+
+
+def migrate(args):
+	"""Convert legacy job files to the current format."""
+	converted, errors = JobIO.migrate()
+	print('%d jobs converted.' % len(converted))
+	return errors
+
+
+def reshard(args):
+	"""Move job files into buckets of a new size."""
+	size = None if args.size.lower() == 'none' else int(args.size)
+	moved, errors = JobIO.reshard(size)
+	print('%d jobs moved.' % len(moved))
+	return errors
+
+
+def sqlite(args):
+	"""Copy every job file into a new SQLite database."""
+	if os.path.exists(Path.JOBS_DB):
+		return {'': IOError('%s already exists.' % Path.JOBS_DB)}
+	copied = copy_jobs(JobIO.store, SQLiteJobStore(Path.JOBS_DB))
+	print('%d jobs copied.' % len(copied))
+	return {}
+
+
+def locks(args):
+	"""Report job lock contention."""
+	since = None
+	if args.days is not None:
+		since = datetime.now() - timedelta(days=args.days)
+	for line in JobIO.lock_report(since):
+		print(line)
+	return {}
+
+
+def reap(args):
+	"""List held job locks and release the expired ones."""
+	for job_num, lock in sorted(JobIO.lock_status().items()):
+		print('%s %-12s %-15s %6.0fm%s' % (job_num, lock.holder, lock.host,
+			lock.age / 60, ' expired' if lock.stale else ''))
+	print('%d expired locks released.' % len(JobIO.reap_locks()))
+	return {}
+
+
+def archive(args):
+	"""List the projects of completed jobs."""
+	for p in JobIO.archived_projects(job_num=args.job, dwg_num=args.dwg,
+		owner=args.owner, start=args.start, end=args.end):
+		print('%s %-16s %-12s %-10s %-12s %s' % (p.dwg_num, p.alias_num,
+			p.owner, p.due_date, p.status, p.completed))
+	if args.job is None:
+		return {}
+	try:
+		job = JobIO.archived_job(args.job)
+	except KeyError:
+		return {args.job: KeyError('Not archived.')}
+	for dwg_num, project in sorted(job.projects.items()):
+		for key, note in sorted(project.notes.data.items()):
+			print('%s %s: %s' % (dwg_num, key, note))
+	return {}
+
+
+def _date(text):
+	"""Parse a 'YYYY-MM-DD' argument."""
+	return datetime.strptime(text, '%Y-%m-%d').date()
+
+
+def main(argv=None):
+	"""Run a maintenance command. Returns the exit status."""
+	parser = argparse.ArgumentParser(description='Nucleus job data tools.')
+	commands = parser.add_subparsers()
+	commands.add_parser('migrate', help=migrate.__doc__).set_defaults(
+		func=migrate)
+	command = commands.add_parser('reshard', help=reshard.__doc__)
+	command.add_argument('size', help="job numbers per bucket, or 'none'")
+	command.set_defaults(func=reshard)
+	commands.add_parser('sqlite', help=sqlite.__doc__).set_defaults(
+		func=sqlite)
+	command = commands.add_parser('locks', help=locks.__doc__)
+	command.add_argument('--days', type=float, help='days of metrics to use')
+	command.set_defaults(func=locks)
+	commands.add_parser('reap', help=reap.__doc__).set_defaults(func=reap)
+	command = commands.add_parser('archive', help=archive.__doc__)
+	command.add_argument('--job')
+	command.add_argument('--dwg')
+	command.add_argument('--owner')
+	command.add_argument('--start', type=_date, 
+		help='earliest completion date, YYYY-MM-DD')
+	command.add_argument('--end', type=_date, 
+		help='latest completion date, YYYY-MM-DD')
+	command.set_defaults(func=archive)
+	args = parser.parse_args(argv)
+
+	JobIO.configure(store=default_store(mirrored=False))
+	errors = args.func(args)
+	for job_num, error in sorted(errors.items()):
+		print('%s: %s' % (job_num, error))
+	return 1 if errors else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
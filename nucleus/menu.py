@@ -12,7 +12,7 @@ from work_orders import WorkOrderConstants
 from core import Image, Path
 from job_io import JobIO
 from errors import (JobNumberError, ExistingJobError, WorkspaceError, 
-	JobInUseError)
+	JobInUseError, ArchiveError)
 
 
 __author__ = 'Brandon McCleary'
@@ -128,7 +128,7 @@ class NewJobRequest(object):
 		"""
 		if len(self._job_num) != 6:
 			raise JobNumberError()
-		elif JobIO.job_exists(self._job_num):
+		elif JobIO.job_exists(self._job_num, refresh=True):
 			raise ExistingJobError()
 
 
@@ -275,7 +275,7 @@ class CompleteJobRequest(object):
 
 	job : Job or None, optional
 		
-	lock : GateKeeper, optional
+	lock : LeaseLock, optional
 		Controls read and write access to job applicaton files.
 
 	Attributes
@@ -309,6 +309,7 @@ class CompleteJobRequest(object):
 		EOFError
 		ProjectsFolderRootError
 		DestinationError
+		ArchiveError
 
 		"""
 		self._verify_job()
@@ -397,15 +398,26 @@ class CompleteJobRequest(object):
 		return msg
 
 	def _close(self, msg):
-		"""Remove job files and send confirmation email.
+		"""Archive the job, remove job files, and send confirmation email.
 
 		Parameters
 		----------
 		msg : list
 			Document control message.
+
+		Raises
+		------
+		ArchiveError
+			If the job could not be archived. Job files are left in place.
 		
 		"""
-		if JobIO.clear_job_files(self._job_num):
+		try:
+			JobIO.archive_job(self._job_num, self._job)
+		except ArchiveError:
+			if not self._retain_ownership:
+				self._lock.unlock()
+			raise
+		if JobIO.clear_job_files(self._job_num, self._lock):
 			msg.append('Yes')
 			send_email(self._to, [], '%s Completed' % self._job_num, 
 				'<br>'.join(msg), True)
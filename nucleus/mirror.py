@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module provides a local, read-through copy of the network jobs directory.
+
+"""
+import os
+import re
+import time
+import marshal
+import hashlib
+import threading
+from fileio import replace, read_file, make_dirs, list_stats
+
+
+__author__ = 'Brandon McCleary'
+
+
+class LocalMirror(object):
+	"""
+	Serves reads of network files from copies kept on the local disk.
+
+	A local copy is used only while the modification time and size of the
+	network file match those recorded when the copy was made, and while the
+	copy's content still matches its recorded SHA-1 digest. Otherwise the
+	network file is read and the copy is replaced.
+
+	Parameters
+	----------
+	root : str
+		Absolute path to the network directory that is mirrored. Files outside
+		of `root` are always read from the network.
+
+	local : str
+		Absolute path to the local directory that stores the copies.
+
+	Attributes
+	----------
+	MANIFEST : str
+		The name of the file in `local` that records the (mtime, size, digest)
+		of every copy.
+
+	Notes
+	-----
+	Writes are made to the network first and then recorded with ``write``, so
+	the network directory always remains the source of truth. Each network
+	file is stat'ed before it is read; if it changes in between, the copy is
+	recorded with the older stat and is fetched again on the next read.
+
+	"""
+
+	MANIFEST = 'manifest'
+
+	def __init__(self, root, local):
+		self.root = os.path.normpath(root)
+		self.local = local
+		self._lock = threading.Lock()
+		# {name: (mtime, size, digest)}
+		self._manifest = {}
+		self._dirty = False
+		self._worker = None
+		if not os.path.isdir(self.local):
+			os.makedirs(self.local)
+		self._load_manifest()
+
+	def _name(self, path):
+		"""Returns the path of a network file relative to `root`, or ``None``
+		if it is not mirrored.
+
+		"""
+		name = os.path.relpath(os.path.normpath(path), self.root)
+		if name.startswith(os.pardir) or os.path.isabs(name):
+			return None
+		return name
+
+	def _local_path(self, name):
+		"""Returns the absolute path to the local copy of a network file."""
+		return os.path.join(self.local, name)
+
+	def _load_manifest(self):
+		"""Restore the manifest saved by a previous session."""
+		try:
+			self._manifest = marshal.loads(
+				read_file(os.path.join(self.local, self.MANIFEST))
+			)
+		except (IOError, EOFError, ValueError, TypeError):
+			# Missing or corrupt; every copy is validated against the network.
+			self._manifest = {}
+
+	def save(self):
+		"""Write the manifest to the local disk if it has changed."""
+		with self._lock:
+			if not self._dirty:
+				return
+			data = marshal.dumps(self._manifest, 2)
+			self._dirty = False
+		path = os.path.join(self.local, self.MANIFEST)
+		temp = path + '.tmp'
+		with open(temp, 'wb') as f:
+			f.write(data)
+		replace(temp, path)
+
+	def read(self, path):
+		"""Read a network file, from its local copy where it is current.
+
+		Parameters
+		----------
+		path : str
+			Absolute path to the network file.
+
+		Returns
+		-------
+		str
+
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		EOFError
+			If the network file changed size while being read.
+
+		"""
+		name = self._name(path)
+		if name is None:
+			return read_file(path)
+		stat = self._stat(path)
+		with self._lock:
+			entry = self._manifest.get(name)
+		if entry is not None and entry[:2] == stat:
+			try:
+				data = read_file(self._local_path(name))
+			except (IOError, EOFError):
+				data = None
+			if data is not None and _digest(data) == entry[2]:
+				return data
+		data = read_file(path)
+		if len(data) == stat[1]:
+			self._store(name, stat, data)
+		return data
+
+	def write(self, path, data):
+		"""Record the contents of a network file that was just written.
+
+		Parameters
+		----------
+		path : str
+			Absolute path to the network file.
+
+		data : str
+			The contents written to `path`.
+
+		"""
+		name = self._name(path)
+		if name is None:
+			return
+		try:
+			stat = self._stat(path)
+		except IOError:
+			self.discard(path)
+		else:
+			self._store(name, stat, data)
+
+	def touch(self, path):
+		"""Record a new modification time for a network file whose contents
+		were not changed.
+
+		Parameters
+		----------
+		path : str
+			Absolute path to the network file.
+
+		"""
+		name = self._name(path)
+		if name is None:
+			return
+		try:
+			stat = self._stat(path)
+		except IOError:
+			self.discard(path)
+			return
+		with self._lock:
+			entry = self._manifest.get(name)
+			if entry is not None and entry[1] == stat[1]:
+				self._manifest[name] = stat + entry[2:]
+				self._dirty = True
+
+	def discard(self, path):
+		"""Forget the local copy of a network file that changed or was removed.
+
+		Parameters
+		----------
+		path : str
+			Absolute path to the network file.
+
+		"""
+		name = self._name(path)
+		if name is None:
+			return
+		with self._lock:
+			if self._manifest.pop(name, None) is not None:
+				self._dirty = True
+
+	def sync(self, directory, pattern):
+		"""Bring the local copies of a network directory up to date.
+
+		Parameters
+		----------
+		directory : str
+			Absolute path to a network directory within `root`.
+
+		pattern : str
+			A regular expression that the names of mirrored files match.
+
+		Returns
+		-------
+		list
+			The names, relative to `root`, of the files that were fetched.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		match = re.compile(pattern).match
+		stats = {}
+		for filename, stat in list_stats(directory):
+			if match(filename):
+				stats[self._name(os.path.join(directory, filename))] = stat
+		subdir = self._name(directory)
+		if subdir == os.curdir:
+			subdir = ''
+		with self._lock:
+			removed = [
+				name for name in self._manifest
+				if os.path.dirname(name) == subdir
+				and match(os.path.basename(name)) and name not in stats
+			]
+			for name in removed:
+				del self._manifest[name]
+			if removed:
+				self._dirty = True
+			changed = [
+				name for name, stat in stats.items()
+				if self._manifest.get(name, (None, None))[:2] != stat
+			]
+		fetched = []
+		for name in changed:
+			path = os.path.join(self.root, name)
+			try:
+				data = read_file(path)
+			except (IOError, EOFError):
+				# Removed or being written; validated again on the next read.
+				continue
+			if len(data) == stats[name][1]:
+				self._store(name, stats[name], data)
+				fetched.append(name)
+		return fetched
+
+	def start(self, directories, pattern, interval=60.0):
+		"""Sync a set of network directories on a background thread.
+
+		Parameters
+		----------
+		directories : callable
+			Returns the absolute paths to the network directories within `root`
+			that are synced on each pass.
+
+		pattern : str
+			Per ``sync``.
+
+		interval : float, optional
+			Seconds between passes.
+
+		"""
+		if self._worker is not None:
+			return
+		self._worker = threading.Thread(
+			target=self._run, args=(directories, pattern, interval)
+		)
+		self._worker.daemon = True
+		self._worker.start()
+
+	def _run(self, directories, pattern, interval):
+		"""Worker thread."""
+		while True:
+			try:
+				for directory in directories():
+					self.sync(directory, pattern)
+				self.save()
+			except (OSError, IOError):
+				# Poor network connectivity or a full local disk. Try again on
+				# the next pass.
+				pass
+			time.sleep(interval)
+
+	def _store(self, name, stat, data):
+		"""Replace the local copy of a network file."""
+		local = self._local_path(name)
+		# Concurrent fetches of the same file stage separate temp files.
+		temp = '%s.%d' % (local, threading.current_thread().ident)
+		try:
+			make_dirs(os.path.dirname(local))
+			with open(temp, 'wb') as f:
+				f.write(data)
+			replace(temp, local)
+		except (OSError, IOError):
+			# The network file is still served; only the copy is lost.
+			self.discard(os.path.join(self.root, name))
+			return
+		with self._lock:
+			self._manifest[name] = stat + (_digest(data),)
+			self._dirty = True
+
+	def _stat(self, path):
+		"""Returns the (mtime, size) of a network file.
+
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		"""
+		try:
+			st = os.stat(path)
+		except OSError as error:
+			# Match the error raised by opening a missing file.
+			raise IOError(error.errno, error.strerror, path)
+		return (st.st_mtime, st.st_size)
+
+
+def _digest(data):
+	"""Returns the SHA-1 digest of a file's contents."""
+	return hashlib.sha1(data).hexdigest()
+
+
+if __name__ == '__main__':
+	pass
@@ -10,7 +10,6 @@ from pywinscript import win
 from pyqtauto import setters
 from sulzer.extract import ProjectsFolderRootError, DestinationError
 from pyqtauto.widgets import ExceptionMessageBox, StatusBar, OrphanMessageBox
-from gatekeeper.gatekeeper import GateKeeper
 from docks import WeekendSignUp, PartLocator, WeekendRoster
 from job_folder import JobFolder
 from work_orders import Job
@@ -22,7 +21,8 @@ from menu import MenuView, NewJobRequest, CompleteJobRequest, AboutDialog
 from admin import GetWorkCenterSource
 from active_projects import ActiveProjectsDialog
 from errors import (WorkspaceError, JobNumberError, ExistingJobError, 
-	UnknownError, JobNotFoundError, JobInUseError, StartUpError, PasswordError)
+	UnknownError, JobNotFoundError, JobInUseError, StartUpError, PasswordError,
+	ArchiveError)
 
 
 __author__ = 'Brandon McCleary'
@@ -83,6 +83,7 @@ class EnterNucleusApp(QtGui.QSplashScreen):
 		"""
 		for i in range(attempts):
 			try:
+				JobIO.configure()
 				data = AppData(Path.DATA_XLSX)
 			except (IOError, EOFError, OSError):
 				if (i+1) == attempts:
@@ -204,7 +205,7 @@ class Nucleus(QtGui.QMainWindow):
 		try:
 			if len(job_num) != 6:
 				raise JobNumberError()
-			self.load_job(job_num)
+			self.load_job(job_num, read_only=True)
 		except (
 			JobNumberError, OSError, JobNotFoundError, 
 			JobInUseError, IOError, EOFError
@@ -220,8 +221,14 @@ class Nucleus(QtGui.QMainWindow):
 		try:
 			job_num = self.desk.active_folder
 			job_folder = self.desk.job_folder(job_num)
-			job, lock = job_folder.job_and_lock()
-			if self.process_complete_job_request(job_num, job, lock):
+			if job_folder.read_only:
+				# The request acquires the job lock.
+				completed = self.process_complete_job_request(job_num)
+			else:
+				job, lock = job_folder.job_and_lock()
+				completed = self.process_complete_job_request(job_num, job, 
+					lock)
+			if completed:
 				self.desk.close_folder(job_num)
 
 		except KeyError:
@@ -240,7 +247,7 @@ class Nucleus(QtGui.QMainWindow):
 		job : Job or None
 			A collection of work orders requesting completion.
 
-		lock : GateKeeper or None
+		lock : LeaseLock or None
 			Controls read and write access to `job` applicaton files.
 
 		Returns
@@ -251,6 +258,8 @@ class Nucleus(QtGui.QMainWindow):
 		"""
 		self.app_data.users.log(
 			'initiating a complete job request for %s' % job_num)
+		# Queued saves must not recreate the job files after they are removed.
+		self.desk.save_queue.wait(job_num)
 		request = CompleteJobRequest(job_num, 
 			self.app_data.users.supervisor_email_addresses, job, lock)
 		try:
@@ -259,7 +268,7 @@ class Nucleus(QtGui.QMainWindow):
 					'%s complete job request was not approved' % job_num)
 				return
 		except (JobInUseError, IOError, EOFError, ProjectsFolderRootError, 
-				DestinationError) as error:
+				DestinationError, ArchiveError) as error:
 			self.app_data.users.log(error)
 			ExceptionMessageBox(error).exec_()
 		else:
@@ -316,7 +325,7 @@ class Nucleus(QtGui.QMainWindow):
 		else:
 			self.desk.refresh_home()
 
-	def load_job(self, job_num):
+	def load_job(self, job_num, read_only=False):
 		"""Send a ``Job`` to `desk` and open for viewing.
 
 		Parameters
@@ -324,6 +333,10 @@ class Nucleus(QtGui.QMainWindow):
 		job_num : str
 			The 6-digit job number.
 
+		read_only : bool, optional
+			If True, the job is opened without acquiring its lock, which is
+			acquired on the first edit instead.
+
 		Raises
 		------
 		JobNotFoundError
@@ -332,8 +345,13 @@ class Nucleus(QtGui.QMainWindow):
 		EOFError
 
 		"""
-		job, lock = JobIO.job_and_lock(job_num)
-		self.desk.open_job_folder(job, lock)
+		# A job that was just closed is reopened with its saved data.
+		self.desk.save_queue.wait(job_num)
+		if read_only:
+			self.desk.open_job_folder(JobIO.snapshot(job_num))
+		else:
+			job, lock = JobIO.job_and_lock(job_num)
+			self.desk.open_job_folder(job, lock)
 
 	def closeEvent(self, event):
 		"""Verify that `desk` does not have open ``JobFolders`` before closing 
@@ -345,6 +363,10 @@ class Nucleus(QtGui.QMainWindow):
 			Window close.
 
 		"""
+		self.desk.save_queue.wait()
+		# Deliver the results of queued saves; a failed save reopens its
+		# JobFolder.
+		QtGui.QApplication.processEvents()
 		if self.desk.cleared:
 			self.app_data.users.log('logged out')
 			event.accept()
@@ -126,6 +126,32 @@ class ProjectTable(Table):
             self.set_row(i, keys[i], projects[keys[i]])
         self.setSortingEnabled(True)
 
+    def update_rows(self, job_num, projects):
+        """Replace the rows of a single job.
+
+        Parameters
+        ----------
+        job_num : str
+
+        projects : dict
+            The job's ``Projects`` organized by drawing number.
+
+        Notes
+        -----
+        See set_table.
+
+        """
+        self.setSortingEnabled(False)
+        col = self.HEADERS.index('Drawing No.')
+        for row in reversed(range(self.rowCount())):
+            if str(self.item(row, col).text())[:6] == job_num:
+                self.removeRow(row)
+        for dwg_num, project in projects.items():
+            row = self.rowCount()
+            self.insertRow(row)
+            self.set_row(row, dwg_num, project)
+        self.setSortingEnabled(True)
+
     def set_row(self, row, dwg_num, project):
         """Set a ``Table`` row.
 
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import copy
+import threading
+from collections import OrderedDict
+from PyQt4 import QtCore
+from job_io import JobIO
+
+
+__author__ = 'Brandon McCleary'
+
+
+class SaveQueue(QtCore.QObject):
+	"""
+	Serializes ``Job`` objects on a worker thread so that slow network writes
+	never block the GUI.
+
+	Jobs are saved in the order they are queued. A job that is queued again
+	before its previous save has started is only written once, with its most
+	recent data.
+
+	Attributes
+	----------
+	SAVED : pyqtSignal
+		Emitted after a queued ``Job`` has been written. The job number is sent
+		with the emission.
+
+	FAILED : pyqtSignal
+		Emitted when a queued ``Job`` could not be written, whatever the error.
+		The job number, the error, and the job lock that is still held (or 
+		``None``) are sent with the emission.
+
+	See Also
+	--------
+	job_io.JobIO
+	leases.LeaseLock
+
+	"""
+
+	SAVED = QtCore.pyqtSignal(object)
+	FAILED = QtCore.pyqtSignal(object, object, object)
+
+	def __init__(self):
+		super(SaveQueue, self).__init__()
+		# {job_num: [job, lock]}
+		self._pending = OrderedDict()
+		self._active = None
+		self._condition = threading.Condition()
+		self._worker = threading.Thread(target=self._run)
+		self._worker.daemon = True
+		self._worker.start()
+
+	def put(self, job_num, job, lock=None):
+		"""Queue a ``Job`` to be saved.
+
+		Parameters
+		----------
+		job_num : str
+
+		job : Job
+			A copy is queued, so `job` may continue to be modified.
+
+		lock : LeaseLock or None, optional
+			Released once `job` has been written and flushed. If the write
+			fails, `lock` remains held.
+
+		"""
+		job = copy.deepcopy(job)
+		with self._condition:
+			if job_num in self._pending:
+				request = self._pending[job_num]
+				request[0] = job
+				if lock is not None:
+					request[1] = lock
+			else:
+				self._pending[job_num] = [job, lock]
+			self._condition.notify_all()
+
+	def is_pending(self, job_num):
+		"""Returns True if `job_num` is queued or being written."""
+		with self._condition:
+			return job_num in self._pending or job_num == self._active
+
+	def wait(self, job_num=None):
+		"""Block until a queued ``Job`` has been written.
+
+		Parameters
+		----------
+		job_num : str or None, optional
+			If ``None``, wait until the queue is empty.
+
+		"""
+		with self._condition:
+			if job_num is None:
+				while self._pending or self._active is not None:
+					self._condition.wait()
+			else:
+				while job_num in self._pending or job_num == self._active:
+					self._condition.wait()
+
+	def _run(self):
+		"""Worker thread."""
+		while True:
+			with self._condition:
+				while not self._pending:
+					self._condition.wait()
+				job_num, (job, lock) = self._pending.popitem(last=False)
+				self._active = job_num
+			try:
+				JobIO.save(job_num, job)
+				JobIO.flush(job_num)
+			except Exception as error:
+				# Any failure is reported so that the worker keeps running and
+				# the job remains open.
+				self.FAILED.emit(job_num, error, lock)
+			else:
+				# Ownership is released only once the data is on file.
+				if lock is not None:
+					lock.unlock()
+				self.SAVED.emit(job_num)
+			finally:
+				with self._condition:
+					self._active = None
+					self._condition.notify_all()
+
+
+if __name__ == '__main__':
+	pass
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module provides the versioned binary format used to store ``Job``,
+``Project``, and ``NoteDict`` objects.
+
+Serialized data begins with a fixed header made up of the 'NUKE' signature,
+the schema version, and the payload length. The payload is a ``marshal`` dump
+of plain tuples, so stored data is not tied to the import paths of the classes
+in ``work_orders``. Job files written by earlier releases with ``pickle`` are
+still accepted by ``loads``.
+
+Schema history:
+
+	1	Project notes are stored inline.
+	2	Project notes may be replaced by their count and stored separately.
+
+"""
+import struct
+import marshal
+import cPickle as pickle
+from work_orders import Job, Project, NoteDict
+
+
+__author__ = 'Brandon McCleary'
+
+
+MAGIC = 'NUKE'
+VERSION = 2
+
+# Signature, schema version, payload length
+_HEADER = struct.Struct('<4sHI')
+
+# Final opcode of every pickle protocol supported by cPickle.
+_PICKLE_STOP = '.'
+
+
+def encode_notes(notes):
+	"""Returns the payload of a ``NoteDict``."""
+	return tuple(notes.data.items())
+
+
+def decode_notes(payload):
+	"""Returns the ``NoteDict`` of a payload."""
+	return NoteDict.from_items(payload)
+
+
+def encode_project(project, notes=True):
+	"""Returns the payload of a ``Project``.
+
+	Parameters
+	----------
+	project : Project
+
+	notes : bool, optional
+		If False, the notes are replaced by their count and are not loaded.
+
+	"""
+	return (
+		project.alias_num,
+		project.owner,
+		project.due_date,
+		project.status,
+		encode_notes(project.notes) if notes else len(project.notes)
+	)
+
+
+def decode_project(payload, loader=None):
+	"""Returns the ``Project`` of a payload.
+
+	Parameters
+	----------
+	payload : tuple
+
+	loader : callable or None, optional
+		Returns the notes of a payload that only holds their count.
+
+	"""
+	project = Project.__new__(Project)
+	project.alias_num, project.owner, project.due_date, project.status, \
+		notes = payload
+	if isinstance(notes, tuple):
+		project.notes = decode_notes(notes)
+	else:
+		project.notes = NoteDict.from_loader(loader, notes)
+	return project
+
+
+def encode_job(job, notes=True):
+	"""Returns the payload of a ``Job``.
+
+	Parameters
+	----------
+	job : Job
+
+	notes : bool, optional
+		Per encode_project.
+
+	"""
+	return (
+		job.job_num,
+		job.workspace,
+		tuple(
+			(k, encode_project(v, notes)) for k, v in job.projects.items()
+		)
+	)
+
+
+def decode_job(payload, loader=None):
+	"""Returns the ``Job`` of a payload.
+
+	Parameters
+	----------
+	payload : tuple
+
+	loader : callable or None, optional
+		Called with a drawing number, returns the notes of a project payload 
+		that only holds their count.
+
+	"""
+	job_num, workspace, projects = payload
+	job = Job(job_num, workspace)
+	for dwg_num, project in projects:
+		job.projects[dwg_num] = decode_project(project, 
+			_bind(loader, dwg_num))
+	return job
+
+
+def _bind(loader, dwg_num):
+	"""Returns a note loader for a single project."""
+	if loader is None:
+		return None
+	return lambda: loader(dwg_num)
+
+
+def frame(payload):
+	"""Serialize a payload behind the versioned header.
+
+	Parameters
+	----------
+	payload : tuple
+		Built from ``str``, ``unicode``, ``int``, ``None``, ``tuple``, and
+		``list`` objects only.
+
+	Returns
+	-------
+	str
+
+	"""
+	body = marshal.dumps(payload, 2)
+	return _HEADER.pack(MAGIC, VERSION, len(body)) + body
+
+
+def frame_length(data, offset=0):
+	"""Returns the length of the framed record starting at `offset`.
+
+	If the header is incomplete, the length of the remaining data is returned.
+
+	"""
+	if len(data) - offset < _HEADER.size:
+		return len(data) - offset
+	return _HEADER.size + _HEADER.unpack_from(data, offset)[2]
+
+
+def unframe(data):
+	"""Validate and deserialize data created by ``frame``.
+
+	Parameters
+	----------
+	data : str
+
+	Returns
+	-------
+	version : int
+		The schema version `data` was written with.
+
+	payload : tuple
+
+	Raises
+	------
+	EOFError
+		If `data` is empty or incomplete.
+
+	ValueError
+		If `data` is not framed or was written by a newer schema version.
+
+	"""
+	if len(data) < _HEADER.size:
+		raise EOFError('Incomplete header')
+	magic, version, length = _HEADER.unpack_from(data)
+	if magic != MAGIC:
+		raise ValueError('Unrecognized format')
+	if version > VERSION:
+		raise ValueError('Unsupported schema version %d' % version)
+	if len(data) - _HEADER.size != length:
+		raise EOFError('Incomplete payload')
+	return version, marshal.loads(data[_HEADER.size:])
+
+
+def is_current(data):
+	"""Returns True if `data` was written with the current schema version."""
+	try:
+		return _HEADER.unpack_from(data)[:2] == (MAGIC, VERSION)
+	except struct.error:
+		return False
+
+
+def dumps(job):
+	"""Serialize a ``Job``.
+
+	Returns
+	-------
+	str
+
+	"""
+	return frame(encode_job(job))
+
+
+def loads(data, loader=None):
+	"""Deserialize a ``Job`` from the current format or a legacy pickle.
+
+	Parameters
+	----------
+	data : str
+
+	loader : callable or None, optional
+		Per decode_job.
+
+	Returns
+	-------
+	Job
+
+	Raises
+	------
+	EOFError
+		If `data` is empty or incomplete.
+
+	ValueError
+		If `data` was written by a newer schema version.
+
+	UnpicklingError
+		If legacy `data` is corrupt.
+
+	"""
+	if data[:len(MAGIC)] != MAGIC:
+		if not data.endswith(_PICKLE_STOP):
+			raise EOFError('Incomplete pickle')
+		return pickle.loads(data)
+	version, payload = unframe(data)
+	return decode_job(payload, loader)
+
+
+if __name__ == '__main__':
+	pass
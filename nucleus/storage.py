@@ -0,0 +1,1629 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This module provides the storage backends that persist ``Job`` objects for the
+``Nucleus`` application.
+
+"""
+import os
+import re
+import errno
+import sqlite3
+import getpass
+import weakref
+import threading
+import cPickle as pickle
+import journal
+import serialization
+from indexes import JobDirectoryIndex, ShardedDirectoryIndex, shard_name
+from fileio import replace, read_file, make_dirs, mutex_file
+from contextlib import closing
+from multiprocessing.pool import ThreadPool
+from work_orders import Job, Project, NoteDict, ProjectSummary
+
+
+__author__ = 'Brandon McCleary'
+
+
+def parallel_map(func, items, workers):
+	"""Call `func` on every item through a bounded thread pool.
+
+	Parameters
+	----------
+	func : callable
+
+	items : list
+
+	workers : int
+		The maximum number of concurrent calls.
+
+	Returns
+	-------
+	list
+		The results of `func`, in the order of `items`.
+
+	"""
+	if len(items) == 0:
+		return []
+	pool = ThreadPool(min(workers, len(items)))
+	try:
+		return pool.map(func, items)
+	finally:
+		pool.close()
+		pool.join()
+
+
+class JobStore(object):
+	"""
+	Interface to a collection of serialized ``Job`` objects.
+
+	Subclasses are responsible for how and where ``Job`` data is kept; callers
+	should only interact with ``Job`` data through ``job_io.JobIO``.
+
+	Attributes
+	----------
+	load_errors : dict
+		Exceptions raised while loading individual jobs during the most recent
+		call to ``summaries`` or ``get_many``, organized by job number.
+
+	MERGES_SAVES : bool
+		True if ``save`` only writes the changes made since a job was loaded,
+		so that it keeps edits saved by ``save_if`` in the meantime. Otherwise
+		the whole job is written and those edits are lost.
+
+	See Also
+	--------
+	storage.FileJobStore
+	storage.SQLiteJobStore
+	job_io.JobIO
+
+	"""
+
+	load_errors = {}
+
+	MERGES_SAVES = False
+
+	def exists(self, job_num):
+		"""Returns True if `job_num` is stored."""
+		raise NotImplementedError
+
+	def refresh(self):
+		"""Discard cached knowledge of which jobs are stored."""
+		pass
+
+	def start_mirror(self, interval=60.0):
+		"""Keep local copies of the stored jobs up to date in the background,
+		if the backend keeps any."""
+		pass
+
+	def job_nums(self):
+		"""Returns a set of all stored job numbers."""
+		raise NotImplementedError
+
+	def save(self, job_num, job):
+		"""Serialize a ``Job`` object."""
+		raise NotImplementedError
+
+	def get(self, job_num):
+		"""Returns a serialized ``Job`` object."""
+		raise NotImplementedError
+
+	def snapshot(self, job_num):
+		"""Returns a consistent, read-only copy of a serialized ``Job`` object
+		without the job's lock being held. Saving the copy is not supported."""
+		return self.get(job_num)
+
+	def get_versioned(self, job_num):
+		"""Returns a consistent copy of a serialized ``Job`` object and its
+		version stamp, for use with ``save_if``."""
+		raise NotImplementedError
+
+	def save_if(self, job_num, job, stamp):
+		"""Serialize a ``Job`` object only if the stored job still has the 
+		version stamp returned by ``get_versioned``. Returns True if the job
+		was saved."""
+		raise NotImplementedError
+
+	def save_many(self, jobs, progress=None):
+		"""Serialize ``Job`` objects organized by job number. `progress`, if 
+		given, is called with each job number as its job is written."""
+		for job_num, job in jobs.items():
+			self.save(job_num, job)
+			if progress is not None:
+				progress(job_num)
+		return True
+
+	def get_many(self, job_nums):
+		"""Returns serialized ``Job`` objects organized by job number.
+
+		Jobs that cannot be loaded are excluded and reported in `load_errors`.
+
+		"""
+		jobs = {}
+		self.load_errors = {}
+		for job_num in job_nums:
+			try:
+				jobs[job_num] = self.get(job_num)
+			except (IOError, EOFError) as error:
+				self.load_errors[job_num] = error
+		return jobs
+
+	def delete(self, job_num):
+		"""Remove a stored ``Job``. Returns True if `job_num` was removed."""
+		raise NotImplementedError
+
+	def flush(self, job_num):
+		"""Wait for background work on a stored ``Job`` to finish."""
+		pass
+
+	def summaries(self):
+		"""Returns every stored ``ProjectSummary`` organized by drawing number.
+		"""
+		raise NotImplementedError
+
+	def job_summaries(self, job_num):
+		"""Returns the ``ProjectSummary`` objects of a single job organized by
+		drawing number. An empty ``dict`` is returned if `job_num` is not 
+		stored."""
+		raise NotImplementedError
+
+	def owner_summaries(self, owner):
+		"""Returns the ``ProjectSummary`` objects of every project assigned to
+		`owner`, organized by drawing number."""
+		return {
+			k: v for k, v in self.summaries().items() if v.owner == owner
+		}
+
+	def signatures(self):
+		"""Returns a value for every stored job, organized by job number, that
+		changes whenever the job is saved."""
+		raise NotImplementedError
+
+	def job_dir(self, job_num):
+		"""Returns the absolute path to the directory that holds the lockfile
+		of a job."""
+		raise NotImplementedError
+
+	def directories(self):
+		"""Returns the absolute paths to every directory that holds job data.
+		"""
+		raise NotImplementedError
+
+	def migrate(self):
+		"""Convert stored jobs to the current format. Returns (converted, 
+		errors) per ``FileJobStore.migrate``. Backends without legacy data 
+		have nothing to convert."""
+		return [], {}
+
+	def reshard(self, shard_size):
+		"""Move stored jobs into buckets of `shard_size` job numbers. Returns
+		(moved, errors) per ``FileJobStore.reshard``. Backends that do not 
+		keep a file per job have nothing to move."""
+		return [], {}
+
+
+class FileJobStore(JobStore):
+	"""
+	Stores each ``Job`` as a separate '.nuke' file.
+
+	Job files are written in the ``serialization`` format. Legacy pickled job
+	files are still read and can be converted in bulk with ``migrate``.
+
+	A compact summary index is maintained alongside the job files. Each job has
+	its own '.sum' file, which is replaced atomically whenever the job is saved,
+	so read-only views never need to deserialize full ``Job`` objects.
+
+	The summary index is extended by an owner index in its `OWNERS` 
+	subdirectory, which holds an empty file named for each job in a 
+	subdirectory for each owner of one of its projects. ``owner_summaries`` 
+	reads only the summaries of the jobs listed for an owner.
+
+	Saving a ``Job`` object that was loaded with ``get`` appends only the 
+	changes made to that object since it was loaded or last saved to a 
+	'.journal' file, per ``journal``. Each loaded object and its copies keep
+	their own baseline, so saving one never reverts changes saved through 
+	another. Reads replay the journal over the job file. Once a journal holds
+	`COMPACT_AT` entries, the next ``save`` folds it into the job file on a 
+	background thread.
+
+	Project notes are kept in a separate '.notes' file, so the job file stays
+	small however many notes accumulate. A job's notes are read on first access
+	to the ``NoteDict.data`` of one of its projects, which raises ``EOFError``
+	if another user replaced the '.notes' file since the job was loaded.
+
+	Job files may be kept directly in `root` or in buckets of `root` named for
+	the range of job numbers they hold, such as '124000-124499'. The bucket
+	size is recorded in the `LAYOUT` file of `root` by ``reshard``.
+
+	Parameters
+	----------
+	root : str
+		Absolute path to the directory containing the '.nuke' files.
+
+	index : str or None, optional
+		Absolute path to the directory containing the '.sum' files. If ``None``,
+		an 'index' subdirectory of `root` is used.
+
+	workers : int, optional
+		The maximum number of job files that are read concurrently.
+
+	mirror : LocalMirror or None, optional
+		Serves reads from local copies of the job files. Writes are always made
+		to `root` first.
+
+	Attributes
+	----------
+	directory : JobDirectoryIndex or ShardedDirectoryIndex
+		Answers ``exists`` and ``job_nums`` without listing `root` on every 
+		call.
+
+	shard_size : int or None
+		The number of job numbers per bucket. If ``None``, job files are kept
+		directly in `root`.
+
+	mirror : LocalMirror or None
+
+	Notes
+	-----
+	Summaries are cached per job along with the modification time and size of
+	the '.sum' file they were loaded from. Only files that have changed since 
+	the previous call are reloaded. Network latency, not CPU, dominates each 
+	load, so changed files are loaded through a thread pool.
+
+	``save`` and compactions assume that the ``LeaseLock`` lock of the job is
+	held; call ``flush`` before releasing it. ``save_if`` appends to the 
+	journal without the lock, but never compacts it, since a compaction 
+	replaces the '.notes' file that other sessions may not have read yet.
+
+	Every write is made while holding a short-lived mutex file, created
+	exclusively next to the job file, so that ``save_if`` can compare and write
+	a job without the ``LeaseLock`` lock. The version stamp of a job is the 
+	(mtime, size) of its job file and journal, which every save changes.
+
+	"""
+
+	EXT = '.nuke'
+	MERGES_SAVES = True
+	SUMMARY_EXT = '.sum'
+	JOURNAL_EXT = '.journal'
+	NOTES_EXT = '.notes'
+	LOCK_EXT = '.lock'
+	MUTEX_EXT = '.writing'
+
+	# Records the bucket size of a sharded `root`.
+	LAYOUT = 'layout'
+
+	# The owner index subdirectory of `index`, and the file that marks it as
+	# complete.
+	OWNERS = 'owners'
+	OWNERS_BUILT = 'built'
+
+	# Journal entries that trigger a background compaction.
+	COMPACT_AT = 50
+
+	# Reads of a job that ``snapshot`` makes before giving up.
+	SNAPSHOT_ATTEMPTS = 3
+
+	# Seconds to wait for another writer's mutex, and the age at which a mutex
+	# left behind by a crashed writer is broken.
+	MUTEX_TIMEOUT = 10.0
+	MUTEX_STALE = 60.0
+
+	# Raised for files that are unreadable or caught mid-write.
+	_READ_ERRORS = (
+		OSError, IOError, EOFError, ValueError, pickle.UnpicklingError
+	)
+
+	def __init__(self, root, index=None, workers=8, mirror=None):
+		self.root = root
+		self.index = index if index is not None else os.path.join(root, 'index')
+		self.workers = workers
+		self.mirror = mirror
+		self.shard_size = self._read_layout()
+		self.directory = self._directory_index()
+		self.load_errors = {}
+		# {job_num: ((mtime, size), summaries)}
+		self._summary_cache = {}
+		# {_LoadToken: [job_num, serialization.encode_job payload without 
+		# notes, version stamp]} as of the last get or save of each loaded Job,
+		# so that loading a job again never changes what an earlier copy of it
+		# is journaled against.
+		self._loaded = weakref.WeakKeyDictionary()
+		self._loaded_lock = threading.Lock()
+		# _NoteLoader objects of the loaded jobs
+		self._note_loaders = weakref.WeakSet()
+		# {job_num: journal entry count}
+		self._journal_lengths = {}
+		# {job_num: threading.Lock}
+		self._job_locks = {}
+		# {job_num: threading.Thread}
+		self._compactions = {}
+		if not os.path.isdir(self.index):
+			os.makedirs(self.index)
+
+	def _read_layout(self):
+		"""Returns the bucket size recorded in `root`, or ``None``."""
+		try:
+			with open(os.path.join(self.root, self.LAYOUT), 'rb') as f:
+				return int(f.read())
+		except IOError as error:
+			if error.errno != errno.ENOENT:
+				raise
+			return None
+
+	def _directory_index(self):
+		"""Returns the index of the job files, per `shard_size`."""
+		if self.shard_size is None:
+			return JobDirectoryIndex(self.root, self.EXT)
+		return ShardedDirectoryIndex(self.root, self.EXT, self.shard_size)
+
+	def job_dir(self, job_num):
+		"""Returns the absolute path to the directory that holds a job's files.
+
+		Parameters
+		----------
+		job_num : str
+
+		"""
+		if self.shard_size is None:
+			return self.root
+		return os.path.join(self.root, shard_name(job_num, self.shard_size))
+
+	def directories(self):
+		"""
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		if self.shard_size is None:
+			return [self.root]
+		return [self.root] + [
+			os.path.join(self.root, name) 
+			for name in sorted(self.directory.shard_names())
+		]
+
+	def _path(self, job_num):
+		"""Returns the absolute path to a job's '.nuke' file."""
+		return os.path.join(self.job_dir(job_num), job_num + self.EXT)
+
+	def _summary_path(self, job_num):
+		"""Returns the absolute path to a job's '.sum' file."""
+		return os.path.join(self.index, job_num + self.SUMMARY_EXT)
+
+	def _journal_path(self, job_num):
+		"""Returns the absolute path to a job's '.journal' file."""
+		return os.path.join(self.job_dir(job_num), job_num + self.JOURNAL_EXT)
+
+	def _notes_path(self, job_num):
+		"""Returns the absolute path to a job's '.notes' file."""
+		return os.path.join(self.job_dir(job_num), job_num + self.NOTES_EXT)
+
+	def start_mirror(self, interval=60.0):
+		"""Keep the local copies of every job file up to date in the 
+		background.
+
+		Parameters
+		----------
+		interval : float, optional
+			Seconds between passes over `root` and `index`.
+
+		"""
+		if self.mirror is None:
+			return
+		exts = (self.EXT, self.SUMMARY_EXT, self.JOURNAL_EXT, self.NOTES_EXT)
+		pattern = r'^\d{6}(%s)$' % '|'.join(re.escape(ext) for ext in exts)
+		self.mirror.start(lambda: self.directories() + [self.index], pattern, 
+			interval)
+
+	def _job_lock(self, job_num):
+		"""Returns the lock that serializes journal writes of a job."""
+		return self._job_locks.setdefault(job_num, threading.Lock())
+
+	def _write_mutex(self, job_num):
+		"""Hold the mutex file that serializes writes to a job across users.
+
+		Raises
+		------
+		IOError
+			If another writer holds the mutex for longer than `MUTEX_TIMEOUT`.
+
+		"""
+		make_dirs(self.job_dir(job_num))
+		return mutex_file(
+			os.path.join(self.job_dir(job_num), job_num + self.MUTEX_EXT),
+			self.MUTEX_TIMEOUT, self.MUTEX_STALE,
+			'Job is being saved by another user'
+		)
+
+	def exists(self, job_num):
+		return job_num in self.directory
+
+	def refresh(self):
+		self.directory.invalidate()
+
+	def job_nums(self):
+		"""
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		return set(self.directory.job_nums())
+
+	def save(self, job_num, job):
+		"""
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		"""
+		return self._save(job_num, job)
+
+	def save_if(self, job_num, job, stamp):
+		"""
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		"""
+		return self._save(job_num, job, stamp)
+
+	def _save(self, job_num, job, stamp=None):
+		"""Write the changes made to a job.
+
+		Parameters
+		----------
+		job_num : str
+
+		job : Job
+
+		stamp : tuple or None, optional
+			If given, the job is only written if its version stamp still 
+			matches.
+
+		Returns
+		-------
+		bool
+			True if the job was written.
+
+		"""
+		payload = serialization.encode_job(job, notes=False)
+		with self._job_lock(job_num), self._write_mutex(job_num):
+			current = self._job_stats(job_num)
+			if stamp is not None and current != stamp:
+				return False
+			state = self._loaded_state(job_num, job)
+			if state is None or not os.path.exists(self._path(job_num)):
+				entries = None
+				self._write_job(job_num, job)
+			else:
+				entries = journal.diff(state[1], payload, job)
+				if entries:
+					self._append_journal(job_num, entries)
+			# False if another user saved the job since it was loaded, in which
+			# case the journal merged both users' changes.
+			in_sync = entries is None or current == state[2]
+			self._set_loaded_state(job, job_num, payload, 
+				self._job_stats(job_num) if in_sync else state[2])
+
+			# Notes are not part of the summary index.
+			if entries is None or any(e[0] != 'note' for e in entries):
+				self._write_summary(job_num, 
+					job if in_sync else self._load(job_num)[0])
+		# Only the holder of the job lock compacts, per the class notes.
+		if stamp is None and \
+				self._journal_lengths.get(job_num, 0) >= self.COMPACT_AT:
+			self._start_compaction(job_num)
+		return True
+
+	def _loaded_state(self, job_num, job):
+		"""Returns the [job_num, payload, stamp] recorded for a ``Job`` object
+		by its last get or save, or ``None``."""
+		token = getattr(job, '_load_token', None)
+		with self._loaded_lock:
+			state = self._loaded.get(token) if token is not None else None
+		if state is None or state[0] != job_num:
+			return None
+		return state
+
+	def _set_loaded_state(self, job, job_num, payload, stamp, reload=False):
+		"""Record the baseline of a ``Job`` object. If `reload`, the object
+		was just loaded and does not share the baseline of any copy."""
+		token = getattr(job, '_load_token', None)
+		if token is None or reload:
+			token = job._load_token = _LoadToken()
+		with self._loaded_lock:
+			self._loaded[token] = [job_num, payload, stamp]
+
+	def _write_job(self, job_num, job):
+		"""Replace the job and notes files of a job and discard its journal."""
+		self._read_loaded_notes(job_num)
+		make_dirs(self.job_dir(job_num))
+		self._replace_file(self._notes_path(job_num), serialization.frame(
+			tuple(
+				(k, serialization.encode_notes(v.notes)) 
+				for k, v in job.projects.items()
+			)
+		))
+		self._replace_file(self._path(job_num), serialization.frame(
+			serialization.encode_job(job, notes=False)
+		))
+		self.directory.add(job_num)
+		self._remove(self._journal_path(job_num))
+		self._journal_lengths[job_num] = 0
+
+	def _read_loaded_notes(self, job_num):
+		"""Read the notes of every loaded copy of a job that has not read them
+		yet, so that they remain readable once the '.notes' file is 
+		replaced."""
+		with self._loaded_lock:
+			loaders = [l for l in self._note_loaders if l.job_num == job_num]
+		for loader in loaders:
+			try:
+				loader.read()
+			except (IOError, EOFError, ValueError):
+				# Already out of date; the copy must be loaded again.
+				continue
+
+	def _replace_file(self, path, data):
+		"""Atomically replace the contents of a file."""
+		# Stage the file under a per-user name, then swap it into place.
+		temp = path + '.' + getpass.getuser()
+		with open(temp, 'wb') as f:
+			f.write(data)
+		replace(temp, path)
+		if self.mirror is not None:
+			self.mirror.write(path, data)
+
+	def _remove(self, path):
+		"""Remove a file, if it exists.
+
+		Returns
+		-------
+		bool
+			True if the file was removed.
+
+		"""
+		if self.mirror is not None:
+			self.mirror.discard(path)
+		try:
+			os.remove(path)
+		except OSError:
+			return False
+		return True
+
+	def _append_journal(self, job_num, entries):
+		"""Append entries to a job's journal in a single write."""
+		with open(self._journal_path(job_num), 'ab') as f:
+			f.write(journal.dumps(entries))
+		os.utime(self._path(job_num), None)
+		if self.mirror is not None:
+			self.mirror.touch(self._path(job_num))
+			self.mirror.discard(self._journal_path(job_num))
+		self._journal_lengths[job_num] = (
+			self._journal_lengths.get(job_num, 0) + len(entries)
+		)
+
+	def _start_compaction(self, job_num):
+		"""Compact a job's journal on a background thread."""
+		thread = self._compactions.get(job_num)
+		if thread is not None and thread.is_alive():
+			return
+		thread = threading.Thread(target=self._compact_quietly, args=(job_num,))
+		thread.daemon = True
+		self._compactions[job_num] = thread
+		thread.start()
+
+	def _compact_quietly(self, job_num):
+		try:
+			self.compact(job_num)
+		except self._READ_ERRORS:
+			# The journal is retained and compacted after the next save.
+			pass
+
+	def compact(self, job_num):
+		"""Fold a job's journal into its job file.
+
+		Returns
+		-------
+		True
+			If a journal was compacted.
+
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		EOFError
+			If the job file is empty or incomplete.
+
+		"""
+		with self._job_lock(job_num), self._write_mutex(job_num):
+			if not os.path.exists(self._journal_path(job_num)):
+				return False
+			before = self._job_stats(job_num)
+			job, count = self._load(job_num)
+			self._write_job(job_num, job)
+			after = self._job_stats(job_num)
+			# Loaded copies that were current remain current.
+			with self._loaded_lock:
+				for state in self._loaded.values():
+					if state[0] == job_num and state[2] == before:
+						state[2] = after
+		return True
+
+	def flush(self, job_num):
+		thread = self._compactions.pop(job_num, None)
+		if thread is not None:
+			thread.join()
+
+	def save_many(self, jobs, progress=None):
+		"""
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		Notes
+		-----
+		Jobs are written concurrently through the thread pool, so `progress`
+		is called from pool threads.
+
+		"""
+		def save(item):
+			self.save(*item)
+			if progress is not None:
+				progress(item[0])
+		parallel_map(save, jobs.items(), self.workers)
+		return True
+
+	def get_many(self, job_nums):
+		self.load_errors = {}
+		jobs = {}
+		for job_num, job, error in parallel_map(self._get_quietly, 
+			list(job_nums), self.workers):
+			if error is None:
+				jobs[job_num] = job
+			else:
+				self.load_errors[job_num] = error
+		return jobs
+
+	def _get_quietly(self, job_num):
+		"""Returns (job_num, job, error) where either `job` or `error` is
+		``None``."""
+		try:
+			return job_num, self.get(job_num), None
+		except self._READ_ERRORS as error:
+			return job_num, None, error
+
+	def _write_summary(self, job_num, job):
+		"""Replace the summary index entry of a job, and its owner index 
+		entries.
+
+		Returns
+		-------
+		rows : dict
+			``ProjectSummary`` objects organized by drawing number.
+
+		"""
+		rows = {
+			dwg_num: ProjectSummary.from_project(project)
+			for dwg_num, project in job.projects.items()
+		}
+		previous = self._indexed_owners(job_num)
+		owners = {s.owner for s in rows.values() if s.owner}
+		# New owners are listed before the summary changes, and former owners
+		# are removed after, so an owner's jobs are never missing.
+		for owner in owners - previous:
+			self._add_owner(owner, job_num)
+		self._replace_file(self._summary_path(job_num), serialization.frame(
+			tuple((k,) + tuple(v) for k, v in rows.items())
+		))
+		for owner in previous - owners:
+			self._remove(self._owner_path(owner, job_num))
+		return rows
+
+	def _owner_path(self, owner, job_num=None):
+		"""Returns the absolute path to an owner's directory of the owner 
+		index, or to the entry of one of its jobs."""
+		path = os.path.join(self.index, self.OWNERS, owner)
+		return path if job_num is None else os.path.join(path, job_num)
+
+	def _add_owner(self, owner, job_num):
+		"""List a job in an owner's directory of the owner index."""
+		path = self._owner_path(owner, job_num)
+		if not os.path.exists(path):
+			make_dirs(os.path.dirname(path))
+			open(path, 'wb').close()
+
+	def _indexed_owners(self, job_num):
+		"""Returns the owners in the current summary index entry of a job."""
+		try:
+			version, rows = serialization.unframe(
+				read_file(self._summary_path(job_num))
+			)
+		except (IOError, EOFError, ValueError):
+			return set()
+		return {r[2] for r in rows if r[2]}
+
+	def build_owner_index(self):
+		"""List every indexed job in the owner index.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		for job_num, summaries, error in parallel_map(self._load_summaries,
+			list(self.job_nums()), self.workers):
+			for owner in {s.owner for s in (summaries or {}).values()}:
+				if owner:
+					self._add_owner(owner, job_num)
+		open(os.path.join(self.index, self.OWNERS, self.OWNERS_BUILT), 
+			'wb').close()
+
+	def owner_summaries(self, owner):
+		"""
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		Notes
+		-----
+		The owner index is built on first use. Jobs that could not be loaded 
+		are reported in `load_errors`.
+
+		"""
+		root = os.path.join(self.index, self.OWNERS)
+		if not os.path.exists(os.path.join(root, self.OWNERS_BUILT)):
+			make_dirs(root)
+			self.build_owner_index()
+		try:
+			job_nums = os.listdir(self._owner_path(owner))
+		except OSError as error:
+			if error.errno != errno.ENOENT:
+				raise
+			job_nums = []
+		self.load_errors = {}
+		summaries = {}
+		for job_num, rows, error in parallel_map(self._load_summaries, 
+			[j for j in job_nums if j in self.directory], self.workers):
+			if error is not None:
+				self.load_errors[job_num] = error
+				continue
+			for dwg_num, summary in rows.items():
+				if summary.owner == owner:
+					summaries[dwg_num] = summary
+		return summaries
+
+	def get(self, job_num):
+		"""
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		EOFError
+			If file is empty or incomplete.
+
+		"""
+		return self.get_versioned(job_num)[0]
+
+	def snapshot(self, job_num):
+		"""Read a job without its lock being held.
+
+		The job and journal files are stat'ed before and after they are read,
+		and the read is retried if a save or compaction changed them in
+		between.
+
+		Parameters
+		----------
+		job_num : str
+
+		Returns
+		-------
+		Job
+
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		EOFError
+			If the file is empty or was read while being written.
+
+		"""
+		return self._load_consistent(job_num)[0]
+
+	def get_versioned(self, job_num):
+		"""
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		EOFError
+			If the file is empty or kept changing while being read.
+
+		"""
+		with self._job_lock(job_num):
+			job, count, stamp = self._load_consistent(job_num)
+			self._journal_lengths[job_num] = count
+			# Later saves of this Job object are journaled against it as 
+			# loaded.
+			self._set_loaded_state(job, job_num, 
+				serialization.encode_job(job, notes=False), stamp, reload=True)
+		return job, stamp
+
+	def _load_consistent(self, job_num):
+		"""Read a job, retrying if it is saved while being read.
+
+		Returns
+		-------
+		job : Job
+
+		count : int
+			Per ``_load``.
+
+		stamp : tuple
+			The version stamp of the job as read.
+
+		"""
+		for attempt in range(self.SNAPSHOT_ATTEMPTS):
+			stamp = self._job_stats(job_num)
+			job, count = self._load(job_num)
+			if self._job_stats(job_num) == stamp:
+				return job, count, stamp
+		raise EOFError('Job changed while being read: %s' % job_num)
+
+	def _job_stats(self, job_num):
+		"""Returns the (mtime, size) of a job's file and journal. The journal
+		stat is ``None`` if there is no journal."""
+		return (
+			self._file_stats(self._path(job_num)), 
+			self._file_stats(self._journal_path(job_num))
+		)
+
+	def _file_stats(self, path):
+		"""Returns the (mtime, size) of a file, or ``None`` if it does not 
+		exist."""
+		try:
+			st = os.stat(path)
+		except OSError:
+			return None
+		return st.st_mtime, st.st_size
+
+	def _load(self, job_num):
+		"""Read a job file and replay its journal.
+
+		Returns
+		-------
+		job : Job
+
+		count : int
+			The number of journal entries replayed.
+
+		"""
+		# The version of the notes is recorded before the job file is read.
+		loader = self._note_loader(job_num)
+		job = serialization.loads(self._read(self._path(job_num)), loader)
+		try:
+			entries = journal.loads(self._read(self._journal_path(job_num)))
+		except IOError as error:
+			if error.errno != errno.ENOENT:
+				raise
+			entries = []
+		for entry in entries:
+			journal.apply(job, entry)
+		return job, len(entries)
+
+	def _note_loader(self, job_num):
+		"""Returns a ``_NoteLoader`` for a job that is about to be read."""
+		loader = _NoteLoader(self, job_num)
+		with self._loaded_lock:
+			self._note_loaders.add(loader)
+		return loader
+
+	def _read(self, path):
+		"""Read a file in a single call, from the mirror where available.
+
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		EOFError
+			If the file changed size while being read.
+
+		"""
+		if self.mirror is not None:
+			return self.mirror.read(path)
+		return read_file(path)
+
+	def delete(self, job_num):
+		self.flush(job_num)
+		for owner in self._indexed_owners(job_num):
+			self._remove(self._owner_path(owner, job_num))
+		for path in (self._summary_path(job_num), self._journal_path(job_num),
+			self._notes_path(job_num)):
+			self._remove(path)
+		try:
+			return self._remove(self._path(job_num))
+		finally:
+			self.directory.discard(job_num)
+
+	def file_stats(self, job_nums=None, summaries=False):
+		"""Get the modification time and size of job or summary files.
+
+		Parameters
+		----------
+		job_nums : iterable or None, optional
+			If ``None``, every active job is checked.
+
+		summaries : bool, optional
+			If True, the '.sum' files are checked instead of the '.nuke' files.
+
+		Returns
+		-------
+		stats : dict
+			(mtime, size) tuples organized by job number. Jobs without a file
+			are excluded.
+
+		Raises
+		------
+		OSError
+			If the system cannot find the path specified.
+
+		"""
+		if job_nums is None and not summaries:
+			# A single directory scan, where available.
+			stats = self.directory.stats()
+			if stats is not None:
+				return stats
+		if job_nums is None:
+			job_nums = self.job_nums()
+		path = self._summary_path if summaries else self._path
+		stats = {}
+		for job_num in job_nums:
+			try:
+				st = os.stat(path(job_num))
+			except OSError:
+				# The job was completed after the directory was listed, or it
+				# has not been indexed yet.
+				continue
+			stats[job_num] = (st.st_mtime, st.st_size)
+		return stats
+
+	def _load_summaries(self, job_num):
+		"""Load the summary index entry of a single job.
+
+		Jobs that have not been indexed yet are loaded in full once, and their
+		index entries are written.
+
+		Returns
+		-------
+		tuple
+			(job_num, summaries, error) where either `summaries` or `error` is
+			``None``.
+
+		"""
+		try:
+			try:
+				data = self._read(self._summary_path(job_num))
+			except IOError:
+				if os.path.exists(self._summary_path(job_num)):
+					raise
+				return job_num, self._write_summary(job_num, 
+					self._load(job_num)[0]), None
+			version, rows = serialization.unframe(data)
+			return job_num, {r[0]: ProjectSummary(*r[1:]) for r in rows}, None
+		except self._READ_ERRORS as error:
+			return job_num, None, error
+
+	def _refresh(self, cache, stats, load):
+		"""Bring a per-job cache up to date with a set of file stats.
+
+		Parameters
+		----------
+		cache : dict
+			{job_num: ((mtime, size), values)}
+
+		stats : dict
+			Current (mtime, size) tuples organized by job number.
+
+		load : callable
+			Returns (job_num, values, error) for a job number.
+
+		Returns
+		-------
+		dict
+			The merged values of every cached job.
+
+		"""
+		for job_num in cache.keys():
+			if job_num not in stats:
+				del cache[job_num]
+		changed = [
+			job_num for job_num in stats
+			if job_num not in cache or cache[job_num][0] != stats[job_num]
+		]
+		self.load_errors = {}
+		for job_num, values, error in parallel_map(load, changed, self.workers):
+			if error is None:
+				cache[job_num] = (stats[job_num], values)
+			else:
+				self.load_errors[job_num] = error
+		merged = {}
+		for stat, values in cache.values():
+			merged.update(values)
+		return merged
+
+	def migrate(self):
+		"""Convert every legacy job file to the current ``serialization`` format.
+
+		Returns
+		-------
+		converted : list
+			The job numbers whose files were converted.
+
+		errors : dict
+			The exception raised for each job that could not be converted,
+			organized by job number.
+
+		Notes
+		-----
+		Jobs should not be open while they are migrated. Each file is converted
+		through a temp file and swapped into place, so readers never see a 
+		partially converted job. Journals are folded into the converted files.
+
+		"""
+		results = parallel_map(self._migrate_job, sorted(self.job_nums()), 
+			self.workers)
+		converted = [job_num for job_num, done, error in results if done]
+		errors = {
+			job_num: error for job_num, done, error in results 
+			if error is not None
+		}
+		return converted, errors
+
+	def _migrate_job(self, job_num):
+		"""Convert a single job file.
+
+		Returns
+		-------
+		tuple
+			(job_num, converted, error)
+
+		"""
+		try:
+			with self._job_lock(job_num), self._write_mutex(job_num):
+				if serialization.is_current(self._read(self._path(job_num))):
+					return job_num, False, None
+				job, count = self._load(job_num)
+				self._write_job(job_num, job)
+		except self._READ_ERRORS as error:
+			return job_num, False, error
+		return job_num, True, None
+
+	def reshard(self, shard_size):
+		"""Move the files of every job into buckets of a new size.
+
+		Parameters
+		----------
+		shard_size : int or None
+			The number of job numbers per bucket. If ``None``, job files are
+			moved directly into `root`.
+
+		Returns
+		-------
+		moved : list
+			The job numbers whose files were moved.
+
+		errors : dict
+			The exception raised for each job whose files could not all be
+			moved, organized by job number.
+
+		Notes
+		-----
+		No user should have a job open while `root` is resharded. Job files are
+		collected from `root` and every bucket, whatever the recorded layout,
+		so an interrupted reshard is completed by running it again.
+
+		"""
+		exts = (self.EXT, self.JOURNAL_EXT, self.NOTES_EXT, self.LOCK_EXT)
+		pattern = re.compile(
+			r'^(\d{6})(%s)$' % '|'.join(re.escape(ext) for ext in exts)
+		)
+		buckets = [
+			os.path.join(self.root, name) for name in os.listdir(self.root)
+			if re.match(r'^\d{6}-\d{6}$', name) 
+			and os.path.isdir(os.path.join(self.root, name))
+		]
+		files = []
+		for directory in [self.root] + buckets:
+			for filename in os.listdir(directory):
+				match = pattern.match(filename)
+				if match:
+					files.append((match.group(1), os.path.join(directory, 
+						filename)))
+
+		self.shard_size = shard_size
+		results = parallel_map(self._move_file, files, self.workers)
+		errors = {
+			job_num: error for job_num, error in results if error is not None
+		}
+		moved = sorted(
+			{job_num for job_num, error in results if error is None} - 
+			set(errors)
+		)
+
+		layout = os.path.join(self.root, self.LAYOUT)
+		if shard_size is None:
+			try:
+				os.remove(layout)
+			except OSError:
+				pass
+		else:
+			self._replace_file(layout, str(shard_size))
+		for directory in buckets:
+			try:
+				# Only empty buckets are removed.
+				os.rmdir(directory)
+			except OSError:
+				pass
+		self.directory = self._directory_index()
+		return moved, errors
+
+	def _move_file(self, item):
+		"""Move a single job file into its directory per `shard_size`.
+
+		Returns
+		-------
+		tuple
+			(job_num, error)
+
+		"""
+		job_num, src = item
+		dst = os.path.join(self.job_dir(job_num), os.path.basename(src))
+		if src == dst:
+			return job_num, None
+		try:
+			make_dirs(os.path.dirname(dst))
+			replace(src, dst)
+		except OSError as error:
+			return job_num, error
+		if self.mirror is not None:
+			self.mirror.discard(src)
+		return job_num, None
+
+	def summaries(self):
+		job_nums = self.job_nums()
+		stats = self.file_stats(job_nums, summaries=True)
+		# Jobs that were never indexed are keyed so that they always reload.
+		for job_num in job_nums:
+			stats.setdefault(job_num, None)
+		return self._refresh(self._summary_cache, stats, self._load_summaries)
+
+	def job_summaries(self, job_num):
+		"""
+		Raises
+		------
+		IOError
+			If the index entry cannot be read.
+
+		EOFError
+			If the index entry is incomplete.
+
+		"""
+		if not os.path.exists(self._path(job_num)):
+			return {}
+		job_num, summaries, error = self._load_summaries(job_num)
+		if error is not None:
+			raise error
+		return summaries
+
+	def signatures(self):
+		"""
+		Returns
+		-------
+		dict
+			Per ``file_stats``.
+
+		"""
+		return self.file_stats()
+
+
+class _NoteLoader(object):
+	"""
+	Gets the notes of a drawing number from a job's '.notes' file.
+
+	The version of the file is recorded when the loader is created, before the
+	job file is read, and the file is read once, on the first call. If the 
+	file was replaced in between, its notes may not match the note counts of 
+	the loaded job, so the call raises ``EOFError`` and the job must be loaded
+	again. ``FileJobStore`` reads the notes of its own loaded jobs before it 
+	replaces the file.
+
+	Parameters
+	----------
+	store : FileJobStore
+
+	job_num : str
+
+	"""
+
+	def __init__(self, store, job_num):
+		self.job_num = job_num
+		self._store = store
+		self._path = store._notes_path(job_num)
+		self._stamp = store._file_stats(self._path)
+		self._notes = None
+		self._lock = threading.Lock()
+
+	def __call__(self, dwg_num):
+		return self.read().get(dwg_num, ())
+
+	def read(self):
+		"""Returns the stored notes of the job organized by drawing number.
+
+		Raises
+		------
+		IOError
+			If no such file or directory.
+
+		EOFError
+			If the file is incomplete or was replaced since the job was 
+			loaded.
+
+		ValueError
+			Per serialization.unframe.
+
+		"""
+		with self._lock:
+			if self._notes is None:
+				data = self._store._read(self._path)
+				if self._store._file_stats(self._path) != self._stamp:
+					raise EOFError('Notes changed since the job was loaded: '
+						'%s' % self.job_num)
+				version, rows = serialization.unframe(data)
+				self._notes = dict(rows)
+			return self._notes
+
+
+class _LoadToken(object):
+	"""
+	Identifies a ``Job`` loaded by ``FileJobStore.get`` and every copy made of
+	it, such as those queued by ``save_queue.SaveQueue``, so that saves of the
+	copies share one journal baseline.
+
+	"""
+
+	def __copy__(self):
+		return self
+
+	def __deepcopy__(self, memo):
+		return self
+
+
+class SQLiteJobStore(JobStore):
+	"""
+	Stores ``Job`` data in indexed tables of an embedded SQLite database.
+
+	Jobs, projects, and notes are kept in separate tables so that project
+	queries across every active job are answered with a single read.
+
+	Parameters
+	----------
+	path : str
+		Absolute path to the database file. The file and tables are created if
+		they do not exist.
+
+	timeout : float, optional
+		Seconds to wait for another connection to release a write lock.
+
+	Notes
+	-----
+	SQLite relies on file locks that network file systems do not reliably 
+	honor, so a database on a network share may be corrupted by concurrent 
+	writers. Keep the database on a local disk, or use it on a share only 
+	while a single session writes to it. ``FileJobStore`` is the multi-user
+	backend.
+
+	"""
+
+	SCHEMA = """
+		CREATE TABLE IF NOT EXISTS jobs (
+			job_num TEXT PRIMARY KEY,
+			workspace TEXT
+		);
+		CREATE TABLE IF NOT EXISTS projects (
+			job_num TEXT NOT NULL REFERENCES jobs (job_num),
+			dwg_num TEXT NOT NULL,
+			alias_num TEXT,
+			owner TEXT,
+			due_date TEXT,
+			status TEXT,
+			PRIMARY KEY (job_num, dwg_num)
+		);
+		CREATE INDEX IF NOT EXISTS projects_owner ON projects (owner);
+		CREATE TABLE IF NOT EXISTS notes (
+			job_num TEXT NOT NULL,
+			dwg_num TEXT NOT NULL,
+			seq INTEGER NOT NULL,
+			stamp TEXT,
+			note TEXT,
+			PRIMARY KEY (job_num, dwg_num, seq)
+		);
+		CREATE TABLE IF NOT EXISTS versions (
+			job_num TEXT PRIMARY KEY,
+			version INTEGER NOT NULL
+		);
+	"""
+
+	def __init__(self, path, timeout=30.0):
+		self.path = path
+		self._timeout = timeout
+		with closing(self._connect()) as conn:
+			conn.executescript(self.SCHEMA)
+
+	def _connect(self):
+		"""Returns a new database connection."""
+		conn = sqlite3.connect(self.path, timeout=self._timeout)
+		# Keep byte strings consistent with serialized Job data.
+		conn.text_factory = str
+		return conn
+
+	def exists(self, job_num):
+		with closing(self._connect()) as conn:
+			row = conn.execute(
+				'SELECT 1 FROM jobs WHERE job_num = ?', (job_num,)
+			).fetchone()
+		return row is not None
+
+	def job_nums(self):
+		with closing(self._connect()) as conn:
+			return {r[0] for r in conn.execute('SELECT job_num FROM jobs')}
+
+	def save(self, job_num, job):
+		return self.save_many({job_num: job})
+
+	def save_many(self, jobs, progress=None):
+		"""
+		Notes
+		-----
+		Every job is written in a single transaction; none are visible to 
+		other connections until the last has been written.
+
+		"""
+		with closing(self._connect()) as conn:
+			with conn:
+				for job_num, job in jobs.items():
+					self._write_job(conn, job_num, job)
+					if progress is not None:
+						progress(job_num)
+		return True
+
+	def _write_job(self, conn, job_num, job):
+		"""Replace the rows of a single job within an open transaction."""
+		project_rows = []
+		note_rows = []
+		for dwg_num, p in job.projects.items():
+			project_rows.append(
+				(job_num, dwg_num, p.alias_num, p.owner, p.due_date, p.status)
+			)
+			for seq, (stamp, note) in enumerate(p.notes.data.items()):
+				note_rows.append((job_num, dwg_num, seq, stamp, note))
+
+		conn.execute(
+			'INSERT OR REPLACE INTO jobs VALUES (?, ?)',
+			(job_num, job.workspace)
+		)
+		conn.execute(
+			'INSERT OR REPLACE INTO versions VALUES (?, COALESCE('
+			'(SELECT version FROM versions WHERE job_num = ?), 0) + 1)',
+			(job_num, job_num)
+		)
+		conn.execute('DELETE FROM projects WHERE job_num = ?', (job_num,))
+		conn.execute('DELETE FROM notes WHERE job_num = ?', (job_num,))
+		conn.executemany(
+			'INSERT INTO projects VALUES (?, ?, ?, ?, ?, ?)', project_rows
+		)
+		conn.executemany(
+			'INSERT INTO notes VALUES (?, ?, ?, ?, ?)', note_rows
+		)
+
+	def get(self, job_num):
+		"""
+		Raises
+		------
+		IOError
+			If `job_num` is not stored.
+
+		"""
+		with closing(self._connect()) as conn:
+			return self._get(conn, job_num)
+
+	def _get(self, conn, job_num):
+		"""Build a single ``Job`` from an open connection."""
+		row = conn.execute(
+			'SELECT workspace FROM jobs WHERE job_num = ?', (job_num,)
+		).fetchone()
+		if row is None:
+			raise IOError('No such job: %s' % job_num)
+		job = Job(job_num, row[0])
+		job.projects = self._query_projects(conn, 'WHERE p.job_num = ?',
+			(job_num,))
+		return job
+
+	def _version(self, conn, job_num):
+		"""Returns the version stamp of a job, or 0 if it has none."""
+		row = conn.execute(
+			'SELECT version FROM versions WHERE job_num = ?', (job_num,)
+		).fetchone()
+		return 0 if row is None else row[0]
+
+	def get_versioned(self, job_num):
+		"""
+		Raises
+		------
+		IOError
+			If `job_num` is not stored.
+
+		"""
+		with closing(self._connect()) as conn:
+			# Read the job and its version within one transaction.
+			conn.execute('BEGIN')
+			try:
+				return self._get(conn, job_num), self._version(conn, job_num)
+			finally:
+				conn.rollback()
+
+	def save_if(self, job_num, job, stamp):
+		with closing(self._connect()) as conn:
+			with conn:
+				# Take the write lock before the version is compared.
+				conn.execute('BEGIN IMMEDIATE')
+				if self._version(conn, job_num) != stamp:
+					return False
+				self._write_job(conn, job_num, job)
+		return True
+
+	def delete(self, job_num):
+		with closing(self._connect()) as conn:
+			with conn:
+				removed = conn.execute(
+					'DELETE FROM jobs WHERE job_num = ?', (job_num,)
+				).rowcount
+				conn.execute('DELETE FROM projects WHERE job_num = ?',
+					(job_num,))
+				conn.execute('DELETE FROM notes WHERE job_num = ?', (job_num,))
+				conn.execute('DELETE FROM versions WHERE job_num = ?', 
+					(job_num,))
+		return removed > 0
+
+	def summaries(self):
+		with closing(self._connect()) as conn:
+			return {
+				r[0]: ProjectSummary(*r[1:]) for r in conn.execute(
+					'SELECT dwg_num, alias_num, owner, due_date, status '
+					'FROM projects'
+				)
+			}
+
+	def job_summaries(self, job_num):
+		with closing(self._connect()) as conn:
+			return {
+				r[0]: ProjectSummary(*r[1:]) for r in conn.execute(
+					'SELECT dwg_num, alias_num, owner, due_date, status '
+					'FROM projects WHERE job_num = ?', (job_num,)
+				)
+			}
+
+	def owner_summaries(self, owner):
+		with closing(self._connect()) as conn:
+			return {
+				r[0]: ProjectSummary(*r[1:]) for r in conn.execute(
+					'SELECT dwg_num, alias_num, owner, due_date, status '
+					'FROM projects WHERE owner = ?', (owner,)
+				)
+			}
+
+	def signatures(self):
+		"""
+		Returns
+		-------
+		dict
+			The note count and project summaries of each job, so that changes
+			to notes, owners, due dates, and statuses are all detected.
+
+		"""
+		with closing(self._connect()) as conn:
+			signatures = {
+				r[0]: [r[1:]] for r in conn.execute(
+					'SELECT j.job_num, j.workspace, COUNT(n.seq) FROM jobs j '
+					'LEFT JOIN notes n ON n.job_num = j.job_num '
+					'GROUP BY j.job_num'
+				)
+			}
+			for r in conn.execute(
+				'SELECT job_num, dwg_num, alias_num, owner, due_date, status '
+				'FROM projects ORDER BY job_num, dwg_num'
+			):
+				signatures[r[0]].append(r[1:])
+		return {k: tuple(v) for k, v in signatures.items()}
+
+	def job_dir(self, job_num):
+		return os.path.dirname(self.path)
+
+	def directories(self):
+		return [os.path.dirname(self.path)]
+
+	def _query_projects(self, conn, where='', params=()):
+		"""Build ``Project`` objects from a single joined query.
+
+		Parameters
+		----------
+		conn : sqlite3.Connection
+
+		where : str, optional
+			SQL condition applied to the 'projects' table alias 'p'.
+
+		params : tuple, optional
+			Values bound to `where`.
+
+		Returns
+		-------
+		projects : dict
+			``Project`` objects organized by drawing number.
+
+		"""
+		projects = {}
+		notes = {}
+		cursor = conn.execute(
+			'SELECT p.dwg_num, p.alias_num, p.owner, p.due_date, p.status, '
+			'n.stamp, n.note FROM projects p LEFT JOIN notes n '
+			'ON n.job_num = p.job_num AND n.dwg_num = p.dwg_num '
+			'%s ORDER BY p.job_num, p.dwg_num, n.seq' % where, params
+		)
+		for dwg_num, alias, owner, due_date, status, stamp, note in cursor:
+			if dwg_num not in projects:
+				projects[dwg_num] = Project(alias, None, owner, due_date, status)
+				notes[dwg_num] = []
+			if stamp is not None:
+				notes[dwg_num].append((stamp, note))
+		for dwg_num in projects.keys():
+			projects[dwg_num].notes = NoteDict.from_items(notes[dwg_num])
+		return projects
+
+
+def copy_jobs(src, dst):
+	"""Copy every ``Job`` from one ``JobStore`` into another.
+
+	Parameters
+	----------
+	src : JobStore
+
+	dst : JobStore
+
+	Returns
+	-------
+	list
+		The job numbers that were copied.
+
+	"""
+	copied = []
+	for job_num in sorted(src.job_nums()):
+		dst.save(job_num, src.get(job_num))
+		copied.append(job_num)
+	return copied
+
+
+if __name__ == '__main__':
+	pass
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import sqlite3
+import threading
+from PyQt4 import QtCore
+from job_io import JobIO
+
+
+__author__ = 'Brandon McCleary'
+
+
+class JobWatcher(QtCore.QObject):
+	"""
+	Reports changes to active jobs so that views can update individual rows
+	instead of reloading all job data.
+
+	Job signatures are compared on a worker thread. A comparison runs shortly
+	after the operating system reports a change to one of the job directories,
+	where supported, and every `interval` seconds otherwise. Each comparison
+	also watches the job directories created since the previous one, such as
+	new buckets of a sharded layout.
+
+	Parameters
+	----------
+	paths : list
+		Absolute paths to the directories that contain the job files when the
+		watcher is created.
+
+	interval : float, optional
+		Seconds between comparisons when no change is reported.
+
+	Attributes
+	----------
+	CHANGED : pyqtSignal
+		Emitted for each job that was created, saved, or completed. The job
+		number is sent with the emission.
+
+	See Also
+	--------
+	job_io.JobIO.job_signatures
+
+	"""
+
+	CHANGED = QtCore.pyqtSignal(object)
+
+	# Sends directories found by the worker thread to the GUI thread, which
+	# owns the QFileSystemWatcher.
+	_FOUND = QtCore.pyqtSignal(object)
+
+	# Seconds to let a burst of change notifications settle.
+	SETTLE = 0.5
+
+	def __init__(self, paths, interval=10.0):
+		super(JobWatcher, self).__init__()
+		self.interval = interval
+		self._signatures = None
+		self._wake = threading.Event()
+		self._paths = set(paths)
+		self._watcher = QtCore.QFileSystemWatcher(paths)
+		self._watcher.directoryChanged.connect(self._on_directory_changed)
+		self._FOUND.connect(self._watch)
+		self._worker = threading.Thread(target=self._run)
+		self._worker.daemon = True
+		self._worker.start()
+
+	def _on_directory_changed(self, path):
+		self._wake.set()
+
+	def _watch(self, paths):
+		"""Watch directories that were created after the watcher."""
+		self._watcher.addPaths(paths)
+
+	def _run(self):
+		"""Worker thread."""
+		while True:
+			self.poll()
+			self._wake.wait(self.interval)
+			if self._wake.is_set():
+				time.sleep(self.SETTLE)
+				self._wake.clear()
+
+	def poll(self):
+		"""Compare job signatures and report the jobs that changed.
+
+		Returns
+		-------
+		changed : list
+			The job numbers that changed since the previous call.
+
+		"""
+		try:
+			signatures = JobIO.job_signatures()
+			paths = JobIO.job_directories()
+		except (OSError, IOError, sqlite3.Error):
+			# Poor network connectivity. Try again on the next pass.
+			return []
+		found = [path for path in paths if path not in self._paths]
+		if found:
+			self._paths.update(found)
+			self._FOUND.emit(found)
+		previous = self._signatures
+		self._signatures = signatures
+		if previous is None:
+			return []
+		changed = [
+			job_num for job_num in set(signatures) | set(previous)
+			if signatures.get(job_num) != previous.get(job_num)
+		]
+		for job_num in sorted(changed):
+			self.CHANGED.emit(job_num)
+		return changed
+
+
+if __name__ == '__main__':
+	pass
@@ -6,7 +6,7 @@ department at Sulzer RES La Porte.
 
 """
 from datetime import datetime, timedelta
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 
 
 __author__ = 'Brandon McCleary'
@@ -25,6 +25,43 @@ class WorkOrderConstants:
 	DATE_FORMAT = '%m/%d/%Y'
 
 
+# {due_date: ordinal}
+_ORDINALS = {}
+
+
+def due_ordinal(due_date):
+	"""Get the proleptic Gregorian ordinal of a due date.
+
+	Each distinct due date is parsed once per session.
+
+	Parameters
+	----------
+	due_date : str
+		Per WorkOrderConstants.DATE_FORMAT.
+
+	Returns
+	-------
+	int
+
+	Raises
+	------
+	ValueError
+		If `due_date` does not match WorkOrderConstants.DATE_FORMAT.
+
+	TypeError
+		If `due_date` is not a ``str``.
+
+	"""
+	try:
+		return _ORDINALS[due_date]
+	except KeyError:
+		ordinal = datetime.strptime(
+			due_date, WorkOrderConstants.DATE_FORMAT
+		).toordinal()
+		_ORDINALS[due_date] = ordinal
+		return ordinal
+
+
 class Job(object):
 	"""
 	Represents a collection of work orders billed to a single customer.
@@ -122,6 +159,35 @@ class Project(object):
 		self.status = status
 		self.notes = NoteDict(work_instructions)
 
+	@property
+	def due_ordinal(self):
+		"""int: Per due_ordinal."""
+		return due_ordinal(self.due_date)
+
+
+class ProjectSummary(namedtuple(
+	'ProjectSummary', ['alias_num', 'owner', 'due_date', 'status'])):
+	"""
+	A read-only digest of the ``Project`` attributes shown in schedule and 
+	project list views.
+
+	``ProjectSummary`` objects are loaded in place of full ``Project`` objects
+	wherever work order notes are not needed.
+
+	"""
+	__slots__ = ()
+
+	@classmethod
+	def from_project(cls, project):
+		"""Returns the ``ProjectSummary`` of a ``Project``."""
+		return cls(project.alias_num, project.owner, project.due_date, 
+			project.status)
+
+	@property
+	def due_ordinal(self):
+		"""int: Per due_ordinal."""
+		return due_ordinal(self.due_date)
+
 
 class NoteDict(object):
 	"""
@@ -137,15 +203,107 @@ class NoteDict(object):
 	-----
 	New instances are initialized with 'Work Instructions' as the first key.
 
+	Notes are only ever added, never edited or removed.
+
 	"""
 	def __init__(self, note):
 		self._data = OrderedDict()
 		self._data['Work Instructions'] = note
 
+	@classmethod
+	def from_items(cls, items):
+		"""Rebuild a ``NoteDict`` from stored (key, value) pairs.
+
+		Parameters
+		----------
+		items : list
+			Signature, note pairs in chronological order.
+
+		"""
+		notes = cls.__new__(cls)
+		# The OrderedDict is built on first access, since most loaded notes
+		# are never displayed.
+		notes._data = None
+		notes._items = items
+		return notes
+
+	@classmethod
+	def from_loader(cls, loader, count):
+		"""Create a ``NoteDict`` whose notes are loaded on first access.
+
+		Parameters
+		----------
+		loader : callable
+			Returns signature, note pairs in chronological order.
+
+		count : int
+			The number of pairs returned by `loader`.
+
+		"""
+		notes = cls.from_items(None)
+		notes._loader = loader
+		notes._count = count
+		# Notes added before the stored notes are loaded.
+		notes._pending = []
+		return notes
+
+	@property
+	def loaded(self):
+		"""bool: False until notes served by a loader are read."""
+		return self._data is not None or self._items is not None
+
 	@property
 	def data(self):
+		if self._data is None:
+			if self._items is None:
+				self._items = self._loader()
+			self._data = OrderedDict(self._items)
+			self._items = None
+			if getattr(self, '_pending', None):
+				self._data.update(self._pending)
+				self._pending = []
 		return self._data
 
+	def __len__(self):
+		if self._data is not None:
+			return len(self._data)
+		if self._items is not None:
+			return len(self._items)
+		return self._count + len(self._pending)
+
+	def tail(self, count):
+		"""Returns the most recent signature, note pairs.
+
+		Notes added since the stored notes were loaded are returned without
+		loading them.
+
+		Parameters
+		----------
+		count : int
+
+		"""
+		if count <= 0:
+			return []
+		if not self.loaded and count <= len(self._pending):
+			return self._pending[-count:]
+		return self.data.items()[-count:]
+
+	def append(self, stamp, note):
+		"""Add a signed note.
+
+		Parameters
+		----------
+		stamp : str
+			Per ``add``, the date, time, and author of `note`.
+
+		note : str
+
+		"""
+		if self.loaded:
+			self.data[stamp] = note
+		else:
+			self._pending.append((stamp, note))
+
 
 	def add(self, note, author):
 		"""Add a new key, value pair to ``NoteDict``.
@@ -158,8 +316,7 @@ class NoteDict(object):
 			Creator of `note`.
 
 		"""
-		stamp = '%s by %s' % (self.timestamp(), author)
-		self._data[stamp] = note
+		self.append('%s by %s' % (self.timestamp(), author), note)
 	
 	def timestamp(self):
 		"""Returns the current date and time as a ``str``.
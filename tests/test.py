@@ -6,3 +6,12 @@ from os.path import join as osj
 
 # Add this to sys.path at the beginning of all test modules
 SEARCH_PATH = osj(dirname(dirname(__file__)), 'nucleus')
+
+
+def make_job(job_num, owner='Brandon'):
+    """Returns a ``Job`` with two projects; the first belongs to `owner`."""
+    from work_orders import Job
+    job = Job(job_num, 'C:\\Vault WorkSpace\\Draft')
+    job.add_project(job_num + '.177-43', 'instructions', owner, '01/01/2020')
+    job.add_project(job_num + '.177-44', 'more', 'Jaye', '01/02/2020')
+    return job
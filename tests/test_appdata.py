@@ -0,0 +1,174 @@
+import os
+import sys
+import getpass
+import logging
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from datetime import date
+from test import SEARCH_PATH, make_job
+sys.path.append(SEARCH_PATH)
+from core import Path
+from storage import FileJobStore
+from job_io import JobIO
+from appdata import UserData
+
+
+def make_users(rows):
+    return pd.DataFrame(rows, 
+        columns=['Username', 'Name', 'Level', 'Email', 'Probe Sub'])
+
+
+class UserDataTestMixin(object):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.users_dir, Path.USERS = Path.USERS, os.path.join(self.root, 'users')
+        os.mkdir(Path.USERS)
+        self.store = JobIO.store
+        JobIO.set_store(FileJobStore(os.path.join(self.root, 'jobs')))
+
+    def tearDown(self):
+        Path.USERS = self.users_dir
+        JobIO.store = self.store
+        logging.getLogger('user').handlers = []
+        shutil.rmtree(self.root)
+
+
+def reference_name(df, username):
+    """The linear scan replaced by UserData.get_users_name."""
+    try:
+        return df['Name'][df['Username'] == username].tolist()[0]
+    except IndexError:
+        return
+
+
+def reference_level(df, username):
+    """The linear scan replaced by UserData.my_level."""
+    try:
+        return df['Level'][df['Username'] == username].tolist()[0]
+    except IndexError:
+        return
+
+
+class TestUserLookups(UserDataTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        super(TestUserLookups, self).setUp()
+        me = getpass.getuser()
+        self.df = make_users([
+            [me, 'Brandon', 'Supervisor', 'brandon@x.com', 'To'],
+            ['jaye', 'Jaye', 'Technician', 'jaye@x.com', 'Cc'],
+            [me, 'Duplicate', 'Technician', 'duplicate@x.com', ''],
+            [None, 'Temp', 'Technician', 'temp@x.com', 'To'],
+            ['kim', 'Kim', 'Admin', 'kim@x.com', 'Cc'],
+        ])
+        self.users = UserData(self.df)
+
+    def test_first_registration_wins(self):
+        self.assertEqual(self.users.my_name, 'Brandon')
+        self.assertEqual(self.users.my_level, 'Supervisor')
+        self.assertEqual(self.users.my_name, 
+            reference_name(self.df, getpass.getuser()))
+        self.assertEqual(self.users.my_level, 
+            reference_level(self.df, getpass.getuser()))
+
+    def test_lookups_match_linear_scans(self):
+        df = self.df
+        self.assertEqual(self.users.usernames, 
+            df[df['Username'].notnull()]['Username'].tolist())
+        for username in ('jaye', 'kim', 'nobody'):
+            self.assertEqual(self.users.get_users_name(username), 
+                reference_name(df, username))
+        techs = df['Name'][df['Level'] == 'Technician'].tolist()
+        techs.append('Brandon')
+        self.assertEqual(self.users.technician_names, techs)
+        self.assertEqual(self.users.supervisor_email_addresses, 
+            df['Email'][df['Level'] == 'Supervisor'].tolist())
+        for field in ('To', 'Cc', '', 'Bcc'):
+            self.assertEqual(self.users.probe_email_addresses(field), 
+                df[df['Probe Sub'] == field]['Email'].tolist())
+
+    def test_lookups_return_copies(self):
+        self.users.technician_names.append('Temp')
+        self.users.usernames.append('temp')
+        self.assertEqual(self.users.technician_names.count('Temp'), 1)
+        self.assertNotIn('temp', self.users.usernames)
+
+
+class TestDueIndexRefresh(UserDataTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        super(TestDueIndexRefresh, self).setUp()
+        for job_num in ('105000', '105001', '105002'):
+            JobIO.store.save(job_num, make_job(job_num))
+        self.users = UserData(make_users([
+            [getpass.getuser(), 'Brandon', 'Supervisor', 'b@x.com', 'To']
+        ]))
+        self.loaded = []
+        self.errors = {}
+        self.job_summaries = JobIO.job_summaries
+        def job_summaries(job_num):
+            self.loaded.append(job_num)
+            if job_num in self.errors:
+                raise self.errors.pop(job_num)
+            return self.job_summaries(job_num)
+        JobIO.job_summaries = staticmethod(job_summaries)
+
+    def tearDown(self):
+        JobIO.job_summaries = staticmethod(self.job_summaries)
+        super(TestDueIndexRefresh, self).tearDown()
+
+    def change(self, job_num):
+        job = make_job(job_num)
+        job.add_project(job_num + '.177-45', 'added', 'Brandon', '01/03/2020')
+        JobIO.store.save(job_num, job)
+
+    def test_reloads_only_changed_jobs(self):
+        self.assertEqual(sorted(self.users.my_jobs_at_a_glance), 
+            ['105000', '105001', '105002'])
+        self.assertEqual(self.loaded, [])
+        self.change('105001')
+        glance = self.users.my_jobs_at_a_glance
+        self.assertEqual(self.loaded, ['105001'])
+        self.assertEqual(glance['105001']['expired'], 3)
+        self.users.my_jobs_at_a_glance
+        self.assertEqual(self.loaded, ['105001'])
+
+    def test_unreadable_job_is_retried(self):
+        self.users.my_jobs_at_a_glance
+        self.change('105001')
+        self.errors['105001'] = OSError('unavailable')
+        self.users.my_jobs_at_a_glance
+        self.assertEqual(self.users.my_jobs_at_a_glance['105001']['expired'],
+            3)
+        self.assertEqual(self.loaded, ['105001', '105001'])
+
+    def test_invalid_due_date_is_skipped(self):
+        job = make_job('105003')
+        job.projects['105003.177-43'].due_date = 'next week'
+        JobIO.store.save('105003', job)
+        self.assertEqual(sorted(self.users.my_jobs_at_a_glance), 
+            ['105000', '105001', '105002'])
+        self.assertEqual(self.users.projects_due(end=date(2020, 1, 2)), 
+            [(date(2020, 1, 1), '105000.177-43'), 
+            (date(2020, 1, 1), '105001.177-43'), 
+            (date(2020, 1, 1), '105002.177-43')])
+
+    def test_invalid_job_is_skipped(self):
+        self.users.my_jobs_at_a_glance
+        self.change('105001')
+        self.errors['105001'] = ValueError('bad data')
+        self.assertEqual(sorted(self.users.my_jobs_at_a_glance), 
+            ['105000', '105002'])
+        # Not reloaded until the job is saved again.
+        self.users.my_jobs_at_a_glance
+        self.assertEqual(self.loaded, ['105001'])
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
@@ -0,0 +1,83 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from test import SEARCH_PATH, make_job
+sys.path.append(SEARCH_PATH)
+from archive import JobArchive
+
+
+class TestJobArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.archive = JobArchive(os.path.join(self.root, 'archive.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_add_and_get(self):
+        self.archive.add('105000', make_job('105000'), 'brandon')
+        self.assertTrue(self.archive.exists('105000'))
+        job = self.archive.get('105000')
+        self.assertEqual(
+            sorted(job.projects.keys()), ['105000.177-43', '105000.177-44']
+        )
+        self.assertEqual(
+            job.projects['105000.177-43'].notes.data.values(), ['instructions']
+        )
+        with self.assertRaises(KeyError):
+            self.archive.get('105001')
+
+    def test_add_waits_for_other_writer(self):
+        open(self.archive.path + JobArchive.MUTEX_EXT, 'wb').close()
+        self.archive.MUTEX_TIMEOUT = 0.1
+        with self.assertRaises(IOError):
+            self.archive.add('105000', make_job('105000'), 'brandon')
+        self.assertFalse(self.archive.exists('105000'))
+
+    def test_reads_do_not_wait_for_writer(self):
+        self.assertFalse(self.archive.exists('105000'))
+        self.assertEqual(self.archive.projects(), [])
+        self.assertFalse(os.path.exists(self.archive.path))
+        self.archive.add('105000', make_job('105000'), 'brandon')
+        open(self.archive.path + JobArchive.MUTEX_EXT, 'wb').close()
+        archive = JobArchive(self.archive.path)
+        archive.MUTEX_TIMEOUT = 0.1
+        self.assertTrue(archive.exists('105000'))
+        self.assertEqual(archive.project_counts(), {'Brandon': 1, 'Jaye': 1})
+
+    def test_project_queries(self):
+        self.archive.add('105000', make_job('105000'), 'brandon',
+            date(2020, 1, 15))
+        self.archive.add('105001', make_job('105001', 'Jaye'), 'brandon',
+            date(2020, 2, 15))
+        self.assertEqual(
+            [p.dwg_num for p in self.archive.projects(owner='Jaye')],
+            ['105000.177-44', '105001.177-43', '105001.177-44']
+        )
+        projects = self.archive.projects(dwg_num='105001.177-43')
+        self.assertEqual(projects[0].completed, '2020-02-15')
+        self.assertEqual(
+            len(self.archive.projects(start=date(2020, 2, 1))), 2
+        )
+        self.assertEqual(
+            self.archive.project_counts(end=date(2020, 1, 31)),
+            {'Brandon': 1, 'Jaye': 1}
+        )
+
+    def test_completed_again_replaces_projects(self):
+        self.archive.add('105000', make_job('105000'), 'brandon')
+        job = make_job('105000')
+        del job.projects['105000.177-44']
+        self.archive.add('105000', job, 'brandon')
+        self.assertEqual(len(self.archive.projects(job_num='105000')), 1)
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
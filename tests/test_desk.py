@@ -0,0 +1,49 @@
+import sys
+import shutil
+import tempfile
+import unittest
+from test import SEARCH_PATH
+sys.path.append(SEARCH_PATH)
+from storage import FileJobStore
+from leases import LeaseManager
+from job_io import JobIO
+from desk import Desk
+
+
+class ClosingDesk(object):
+    """The state of a Desk whose closed JobFolder is awaiting its save."""
+
+    def __init__(self, job_num, close):
+        self._closing = {job_num: object()}
+        self._close = close
+
+    def _continue_close(self, error):
+        return self._close
+
+
+class TestSaveFailed(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store, self.leases = JobIO.store, JobIO.leases
+        JobIO.set_store(FileJobStore(self.root))
+        JobIO.leases = LeaseManager(interval=3600)
+        self.lock = JobIO.lock_job('105000')
+
+    def tearDown(self):
+        JobIO.store, JobIO.leases = self.store, self.leases
+        shutil.rmtree(self.root)
+
+    def test_close_without_saving_releases_lock(self):
+        desk = ClosingDesk('105000', True)
+        Desk._on_save_failed.__func__(desk, '105000', IOError('offline'), 
+            self.lock)
+        self.assertEqual(desk._closing, {})
+        self.assertEqual(JobIO.lock_status(), {})
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
@@ -0,0 +1,105 @@
+import sys
+import unittest
+from datetime import date
+from test import SEARCH_PATH
+sys.path.append(SEARCH_PATH)
+from work_orders import ProjectSummary, due_ordinal
+from due_index import DueDateIndex
+
+
+def summary(due_date, status='In Process', owner='Brandon'):
+    return ProjectSummary('alias', owner, due_date, status)
+
+
+class TestDueDateIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = DueDateIndex()
+        self.index.rebuild({
+            '105000.177-43': summary('01/01/2020'),
+            '105000.177-44': summary('01/03/2020'),
+            '105001.177-43': summary('01/02/2020'),
+            '105001.177-44': summary('01/01/2020', 'Completed'),
+            '105002.177-43': summary('01/01/2020', 'Completed'),
+        })
+        self.today = date(2020, 1, 2).toordinal()
+
+    def test_due_between(self):
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(
+            [k[2] for k in self.index.due_between(end=self.today)],
+            ['105000.177-43']
+        )
+        self.assertEqual(
+            [k[2] for k in self.index.due_between(start=self.today)],
+            ['105001.177-43', '105000.177-44']
+        )
+        self.assertEqual(
+            self.index.next_due(self.today, 1)[0][0], due_ordinal('01/02/2020'))
+
+    def test_glance(self):
+        self.assertEqual(self.index.glance(self.today), {
+            '105000': {'expired': 1, 'today': 0, 'approaching': 1},
+            '105001': {'expired': 0, 'today': 1, 'approaching': 0},
+            '105002': {'expired': 0, 'today': 0, 'approaching': 0},
+        })
+        self.assertEqual(self.index.glance(self.today, ['105001']).keys(),
+            ['105001'])
+
+    def test_glance_of_mixed_dates(self):
+        def due_in(days):
+            return date.fromordinal(self.today + days).strftime('%m/%d/%Y')
+        offsets = [-30, -1, 0, 1, 2, 3, 400]
+        self.index.rebuild(dict(
+            [('105000.177-%02d' % i, summary(due_in(days)))
+                for i, days in enumerate(offsets)] + [
+            ('105001.177-00', summary(due_in(-1), 'Completed')),
+            ('105001.177-01', summary(due_in(0))),
+            ('105001.177-02', summary(due_in(0))),
+            ('105002.177-00', summary(due_in(1), 'Completed')),
+        ]))
+        self.assertEqual(self.index.glance(self.today), {
+            '105000': {'expired': 2, 'today': 1, 'approaching': 2},
+            '105001': {'expired': 0, 'today': 2, 'approaching': 0},
+            '105002': {'expired': 0, 'today': 0, 'approaching': 0},
+        })
+        self.assertEqual(self.index.glance(self.today, ['105000', '105009']),
+            {'105000': {'expired': 2, 'today': 1, 'approaching': 2}})
+        self.assertEqual(DueDateIndex().glance(self.today), {})
+
+    def test_update_and_remove_job(self):
+        self.index.update_job('105001', {
+            '105001.177-43': summary('01/02/2020', 'Completed'),
+            '105001.177-44': summary('01/09/2020'),
+        })
+        self.assertEqual(
+            [k[2] for k in self.index.due_between(start=self.today)],
+            ['105000.177-44', '105001.177-44']
+        )
+        self.index.update_job('105000', {})
+        self.assertNotIn('105000', self.index)
+        self.assertEqual(len(self.index), 1)
+
+    def test_invalid_due_date_skips_job(self):
+        skipped = self.index.rebuild({
+            '105000.177-43': summary('01/01/2020'),
+            '105001.177-43': summary('13/45/2020'),
+            '105001.177-44': summary('01/02/2020'),
+            '105002.177-43': summary(None),
+            '105003.177-43': summary(None, 'Completed'),
+        })
+        self.assertEqual(sorted(skipped), ['105001', '105002'])
+        self.assertIsInstance(skipped['105002'], ValueError)
+        self.assertEqual(self.index.job_nums(), set(['105000', '105003']))
+        with self.assertRaises(ValueError):
+            self.index.update_job('105000', {
+                '105000.177-43': summary('tomorrow')
+            })
+        self.assertEqual(len(self.index), 1)
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
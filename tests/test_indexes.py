@@ -0,0 +1,91 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from test import SEARCH_PATH
+sys.path.append(SEARCH_PATH)
+from indexes import JobDirectoryIndex, ShardedDirectoryIndex, shard_name
+
+
+class TestJobDirectoryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.index = JobDirectoryIndex(self.root, '.nuke', ttl=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def touch(self, name):
+        with open(os.path.join(self.root, name), 'wb'):
+            pass
+
+    def test_job_nums_match_exactly(self):
+        for name in ['105000.nuke', '105000.lock', '105001.nuke.brandon',
+                '1105002.nuke', '105003.nuke']:
+            self.touch(name)
+        self.assertEqual(self.index.job_nums(), {'105000', '105003'})
+        self.assertIn('105003', self.index)
+        self.assertNotIn('05000', self.index)
+
+    def test_scan_is_cached_until_refresh(self):
+        self.touch('105000.nuke')
+        self.assertEqual(self.index.job_nums(), {'105000'})
+        self.touch('105001.nuke')
+        self.assertNotIn('105001', self.index)
+        self.assertIn('105001', self.index.job_nums(refresh=True))
+
+    def test_expired_scan_checks_directory_mtime(self):
+        self.index.ttl = 0
+        self.touch('105000.nuke')
+        self.index.job_nums()
+        self.touch('105001.nuke')
+        # Guarantee a new signature despite coarse filesystem timestamps.
+        os.utime(self.root, (0, 0))
+        self.assertIn('105001', self.index)
+
+    def test_add_and_discard(self):
+        self.index.job_nums()
+        self.index.add('105000')
+        self.assertIn('105000', self.index)
+        self.index.discard('105000')
+        self.assertNotIn('105000', self.index)
+
+
+class TestShardedDirectoryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.index = ShardedDirectoryIndex(self.root, '.nuke', 500, ttl=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def touch(self, job_num):
+        directory = os.path.join(self.root, shard_name(job_num, 500))
+        if not os.path.isdir(directory):
+            os.mkdir(directory)
+        with open(os.path.join(directory, job_num + '.nuke'), 'wb'):
+            pass
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name('124025', 500), '124000-124499')
+        self.assertEqual(shard_name('124500', 500), '124500-124999')
+
+    def test_job_nums_span_buckets(self):
+        self.touch('124025')
+        self.touch('124725')
+        self.assertEqual(self.index.job_nums(), {'124025', '124725'})
+        self.assertEqual(
+            self.index.shard_names(), {'124000-124499', '124500-124999'}
+        )
+        self.assertIn('124725', self.index)
+        self.assertNotIn('125000', self.index)
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
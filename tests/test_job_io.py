@@ -0,0 +1,155 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from test import SEARCH_PATH, make_job
+sys.path.append(SEARCH_PATH)
+from work_orders import Job, WorkOrderConstants
+from storage import FileJobStore, SQLiteJobStore
+from leases import LeaseManager
+from job_io import JobIO
+from errors import JobInUseError, JobNotFoundError
+
+
+def set_owner(job):
+    for project in job.projects.values():
+        project.owner = 'Jaye'
+
+
+def due_in(days):
+    return (date.today() + timedelta(days)).strftime(
+        WorkOrderConstants.DATE_FORMAT)
+
+
+def reference_due_date(job):
+    """The pure Python job_due_date replaced by the ordinal version."""
+    format = WorkOrderConstants.DATE_FORMAT
+    proj_dates = []
+    try:
+        for proj in job.projects.keys():
+            proj_dates.append(datetime.strptime(job.projects[proj].due_date, 
+                format))
+    except (AttributeError, ValueError):
+        return 'not found'
+    else:
+        return datetime.strftime(max(proj_dates), format)
+
+
+class TestDueDates(unittest.TestCase):
+
+    def test_due_date(self):
+        job = Job('105000', None)
+        job.add_project('105000.177-43', 'instructions', 'Brandon', due_in(-3))
+        self.assertEqual(JobIO.job_due_date(job), reference_due_date(job))
+        job.add_project('105000.177-44', 'more', 'Jaye', due_in(40))
+        job.add_project('105000.177-45', 'more', 'Jaye', due_in(0))
+        self.assertEqual(JobIO.job_due_date(job), due_in(40))
+        self.assertEqual(JobIO.job_due_date(job), reference_due_date(job))
+        job.projects['105000.177-45'].due_date = 'next week'
+        self.assertEqual(JobIO.job_due_date(job), reference_due_date(job))
+
+    def test_due_date_of_empty_job(self):
+        # The reference raised ValueError for a job without projects.
+        self.assertEqual(JobIO.job_due_date(Job('105000', None)), 
+            'not found')
+
+
+class TestEditMany(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store, self.leases = JobIO.store, JobIO.leases
+        JobIO.set_store(FileJobStore(self.root))
+        JobIO.leases = LeaseManager(interval=3600)
+        for job_num in ('105000', '105001', '105002'):
+            JobIO.store.save(job_num, make_job(job_num))
+
+    def tearDown(self):
+        JobIO.store, JobIO.leases = self.store, self.leases
+        shutil.rmtree(self.root)
+
+    def owners(self, job_num):
+        projects = FileJobStore(self.root).get(job_num).projects
+        return sorted(p.owner for p in projects.values())
+
+    def test_edits_every_job(self):
+        saved, errors = JobIO.edit_many(['105000', '105001'], set_owner)
+        self.assertEqual(sorted(saved), ['105000', '105001'])
+        self.assertEqual(errors, {})
+        self.assertEqual(self.owners('105001'), ['Jaye', 'Jaye'])
+        # Every lock is released.
+        self.assertEqual(JobIO.lock_status(), {})
+
+    def test_locked_and_missing_jobs_are_reported(self):
+        other = LeaseManager(interval=3600).lease('Jaye', 
+            JobIO.lock_path('105001'))
+        self.assertTrue(other.lock())
+        saved, errors = JobIO.edit_many(['105000', '105001', '105009'], 
+            set_owner)
+        self.assertEqual(saved.keys(), ['105000'])
+        self.assertIsInstance(errors['105001'], JobInUseError)
+        self.assertIsInstance(errors['105009'], JobNotFoundError)
+        self.assertEqual(self.owners('105001'), ['Brandon', 'Jaye'])
+        other.unlock()
+
+    def test_job_open_in_session_is_left_locked(self):
+        folder = JobIO.lock_job('105001')
+        saved, errors = JobIO.edit_many(['105000', '105001'], set_owner)
+        self.assertEqual(saved.keys(), ['105000'])
+        self.assertIsInstance(errors['105001'], JobInUseError)
+        # The folder keeps its lease, and other users remain locked out.
+        self.assertEqual(JobIO.leases.renew_all(), [])
+        self.assertTrue(folder.lock_is_acquired)
+        other = LeaseManager(interval=3600).lease('Jaye', 
+            JobIO.lock_path('105001'))
+        self.assertFalse(other.lock())
+        folder.unlock()
+
+    def test_failed_edit_skips_job(self):
+        def edit(job):
+            if job.job_num == '105001':
+                raise ValueError('bad date')
+            set_owner(job)
+        saved, errors = JobIO.edit_many(['105000', '105001', '105002'], edit)
+        self.assertEqual(sorted(saved), ['105000', '105002'])
+        self.assertIsInstance(errors['105001'], ValueError)
+        self.assertEqual(self.owners('105001'), ['Brandon', 'Jaye'])
+        self.assertEqual(self.owners('105002'), ['Jaye', 'Jaye'])
+        self.assertEqual(JobIO.lock_status(), {})
+
+
+class TestUpdate(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store, self.leases = JobIO.store, JobIO.leases
+        JobIO.set_store(SQLiteJobStore(os.path.join(self.root, 'jobs.db')))
+        JobIO.leases = LeaseManager(interval=3600)
+        JobIO.store.save('105000', make_job('105000'))
+
+    def tearDown(self):
+        JobIO.store, JobIO.leases = self.store, self.leases
+        shutil.rmtree(self.root)
+
+    def test_locked_job_is_refused_without_merging_saves(self):
+        other = LeaseManager(interval=3600).lease('Jaye', 
+            JobIO.lock_path('105000'))
+        self.assertTrue(other.lock())
+        with self.assertRaises(JobInUseError):
+            JobIO.update('105000', set_owner)
+        self.assertEqual(
+            JobIO.store.get('105000').projects['105000.177-43'].owner, 
+            'Brandon')
+        other.unlock()
+        JobIO.update('105000', set_owner)
+        self.assertEqual(
+            JobIO.store.get('105000').projects['105000.177-43'].owner, 'Jaye')
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
@@ -0,0 +1,71 @@
+import sys
+import unittest
+from test import SEARCH_PATH, make_job
+sys.path.append(SEARCH_PATH)
+import journal
+import serialization
+
+
+def stored(job):
+    """Returns a copy of `job` whose notes are loaded on first access."""
+    notes = {
+        k: serialization.encode_notes(v.notes) for k, v in job.projects.items()
+    }
+    return serialization.decode_job(
+        serialization.encode_job(job, notes=False), notes.get
+    )
+
+
+def replay(entries):
+    job = stored(make_job('105000'))
+    for entry in entries:
+        journal.apply(job, entry)
+    return serialization.encode_job(job)
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.job = stored(make_job('105000'))
+        self.old = serialization.encode_job(self.job, notes=False)
+
+    def diff(self):
+        return journal.diff(
+            self.old, serialization.encode_job(self.job, notes=False), self.job
+        )
+
+    def test_diff_records_only_changes(self):
+        self.job.projects['105000.177-43'].owner = 'Jaye'
+        self.job.projects['105000.177-43'].notes.add('note', 'Brandon')
+        entries = self.diff()
+        self.assertFalse(self.job.projects['105000.177-43'].notes.loaded)
+        self.assertEqual([e[0] for e in entries], ['set', 'note'])
+        self.assertEqual(entries[0], ('set', '105000.177-43', 'owner', 'Jaye'))
+        self.assertEqual(replay(entries), serialization.encode_job(self.job))
+
+    def test_diff_detects_drawing_num_change(self):
+        project = self.job.projects.pop('105000.177-44')
+        project.status = 'In Process'
+        self.job.projects['SA-1234'] = project
+        entries = self.diff()
+        self.assertEqual(entries[0], ('rename', '105000.177-44', 'SA-1234'))
+        self.assertEqual(replay(entries), serialization.encode_job(self.job))
+
+    def test_diff_writes_new_projects_in_full(self):
+        self.job.add_project('105000.177-45', 'new', 'Brandon', '01/03/2020')
+        entries = self.diff()
+        self.assertEqual([e[0] for e in entries], ['put'])
+        self.assertEqual(replay(entries), serialization.encode_job(self.job))
+
+    def test_loads_ignores_torn_record(self):
+        entries = [('delete', '105000.177-43'), ('workspace', 'D:\\')]
+        data = journal.dumps(entries)
+        self.assertEqual(journal.loads(data), entries)
+        self.assertEqual(journal.loads(data[:-3]), entries[:1])
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
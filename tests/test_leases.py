@@ -0,0 +1,184 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from test import SEARCH_PATH
+sys.path.append(SEARCH_PATH)
+import lock_metrics
+import fileio
+from leases import LeaseManager
+from lock_metrics import LockMetrics
+
+
+class TestLeaseManager(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, '105000.lock')
+        open(self.path, 'wb').close()
+        self.metrics = os.path.join(self.root, 'metrics')
+        self.manager = LeaseManager(ttl=60, interval=3600,
+            metrics=LockMetrics(self.metrics, 'Brandon'))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def expire(self, path):
+        past = time.time() - 120
+        os.utime(path, (past, past))
+
+    def test_lock_and_unlock(self):
+        lock = self.manager.lease('Brandon', self.path)
+        self.assertTrue(lock.lock())
+        self.assertTrue(lock.lock_is_acquired)
+        other = self.manager.lease('Jaye', self.path)
+        self.assertFalse(other.lock())
+        self.assertEqual(other.owner, 'Brandon')
+        lock.unlock()
+        self.assertFalse(lock.lock_is_acquired)
+        self.assertEqual(os.path.getsize(self.path), 0)
+        self.assertTrue(other.lock())
+
+    def test_expired_lease_is_taken_over(self):
+        lock = self.manager.lease('Brandon', self.path)
+        lock.lock()
+        self.expire(self.path)
+        other = LeaseManager(ttl=60, interval=3600).lease('Jaye', self.path)
+        self.assertTrue(other.lock())
+        # The first holder learns of the loss on its next renewal.
+        self.assertEqual(self.manager.renew_all(), [lock])
+        self.assertFalse(lock.lock_is_acquired)
+        lock.unlock()
+        self.assertEqual(self.manager.status([self.root])['105000'].holder,
+            'Jaye')
+
+    def test_renewal_keeps_lease(self):
+        lock = self.manager.lease('Brandon', self.path)
+        lock.lock()
+        self.expire(self.path)
+        self.assertEqual(self.manager.renew_all(), [])
+        self.assertFalse(self.manager.lease('Jaye', self.path).lock())
+
+    def test_second_lease_of_process_is_refused(self):
+        lock = self.manager.lease('Brandon', self.path)
+        self.assertTrue(lock.lock())
+        again = self.manager.lease('Brandon', self.path)
+        self.assertFalse(again.lock())
+        self.assertEqual(again.owner, 'Brandon')
+        # Releasing the refused lease leaves the first one held.
+        again.unlock()
+        self.assertEqual(self.manager.renew_all(), [])
+        self.assertTrue(lock.lock_is_acquired)
+        self.assertFalse(LeaseManager(ttl=60).lease('Jaye', self.path).lock())
+        lock.unlock()
+        self.assertTrue(again.lock())
+        again.unlock()
+
+    def test_lease_left_by_crash_is_acquired_again(self):
+        LeaseManager(ttl=60, interval=3600).lease('Brandon', self.path).lock()
+        lock = self.manager.lease('Brandon', self.path)
+        self.assertTrue(lock.lock())
+        lock.unlock()
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+    def test_check(self):
+        self.assertIsNone(self.manager.check(self.path))
+        self.assertIsNone(
+            self.manager.check(os.path.join(self.root, '105009.lock')))
+        lock = self.manager.lease('Brandon', self.path)
+        lock.lock()
+        status = self.manager.check(self.path)
+        self.assertEqual(status.holder, 'Brandon')
+        self.assertFalse(status.stale)
+        self.expire(self.path)
+        self.assertTrue(self.manager.check(self.path).stale)
+        lock.unlock()
+        self.assertIsNone(self.manager.check(self.path))
+
+    def test_status_and_reap(self):
+        other = os.path.join(self.root, '105001.lock')
+        open(other, 'wb').close()
+        self.manager.lease('Brandon', self.path).lock()
+        self.manager.lease('Jaye', other).lock()
+        self.expire(other)
+        status = self.manager.status([self.root])
+        self.assertEqual(sorted(status), ['105000', '105001'])
+        self.assertEqual(status['105000'].holder, 'Brandon')
+        self.assertFalse(status['105000'].stale)
+        self.assertTrue(status['105001'].stale)
+        self.assertEqual(self.manager.reap([self.root]), ['105001'])
+        self.assertEqual(sorted(self.manager.status([self.root])), ['105000'])
+
+    def test_remove_releases_lease(self):
+        lock = self.manager.lease('Brandon', self.path)
+        lock.lock()
+        lock.remove()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(self.manager.renew_all(), [])
+        lock.unlock()
+        kinds = [e[1] for e in lock_metrics.read_events(
+            os.path.join(self.metrics, 'Brandon.locks'))]
+        self.assertEqual(kinds, [lock_metrics.ACQUIRED, 
+            lock_metrics.RELEASED])
+
+    def test_metrics(self):
+        lock = self.manager.lease('Brandon', self.path)
+        lock.lock()
+        self.manager.lease('Jaye', self.path).lock()
+        lock.unlock()
+        kinds = [e[1] for e in lock_metrics.read_events(
+            os.path.join(self.metrics, 'Brandon.locks'))]
+        self.assertEqual(kinds, [lock_metrics.ACQUIRED,
+            lock_metrics.CONTENDED, lock_metrics.RELEASED])
+        jobs, users = lock_metrics.summarize(self.metrics)
+        self.assertEqual(jobs['105000'].acquired, 1)
+        self.assertEqual(jobs['105000'].contended, 1)
+        self.assertEqual(users.keys(), ['Brandon'])
+        self.assertEqual(lock_metrics.report(self.metrics)[1].split()[:3],
+            ['105000', '1', '1'])
+
+
+class TestMutexFile(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, '105000.acquiring')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_server_time_leaves_no_probe(self):
+        self.assertAlmostEqual(fileio.server_time(self.root), time.time(), 
+            delta=5)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_stale_mutex_is_taken_over(self):
+        open(self.path, 'wb').close()
+        past = time.time() - 120
+        os.utime(self.path, (past, past))
+        with fileio.mutex_file(self.path, 0.1, 60):
+            self.assertEqual(os.listdir(self.root), ['105000.acquiring'])
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_held_mutex_times_out(self):
+        open(self.path, 'wb').close()
+        with self.assertRaises(IOError):
+            with fileio.mutex_file(self.path, 0.1, 60):
+                pass
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_take_over_restores_new_mutex(self):
+        # Another waiter cleared the stale mutex first and a new holder 
+        # created this one.
+        open(self.path, 'wb').close()
+        fileio._take_over(self.path, time.time() - 120)
+        self.assertEqual(os.listdir(self.root), ['105000.acquiring'])
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
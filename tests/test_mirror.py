@@ -0,0 +1,68 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from test import SEARCH_PATH
+sys.path.append(SEARCH_PATH)
+from mirror import LocalMirror
+
+
+class TestLocalMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.local = tempfile.mkdtemp()
+        self.mirror = LocalMirror(self.root, self.local)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        shutil.rmtree(self.local)
+
+    def write(self, name, data, mtime=None):
+        path = os.path.join(self.root, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_read_serves_current_copy(self):
+        path = self.write('105000.nuke', 'job', mtime=1000)
+        self.assertEqual(self.mirror.read(path), 'job')
+        with open(os.path.join(self.local, '105000.nuke'), 'rb') as f:
+            self.assertEqual(f.read(), 'job')
+        # Same stat, so the local copy is served.
+        self.write('105000.nuke', 'JOB', mtime=1000)
+        self.assertEqual(self.mirror.read(path), 'job')
+        os.utime(path, (2000, 2000))
+        self.assertEqual(self.mirror.read(path), 'JOB')
+
+    def test_corrupt_copy_is_refetched(self):
+        path = self.write('105000.nuke', 'job', mtime=1000)
+        self.mirror.read(path)
+        with open(os.path.join(self.local, '105000.nuke'), 'wb') as f:
+            f.write('bad')
+        self.assertEqual(self.mirror.read(path), 'job')
+
+    def test_missing_file_raises_ioerror(self):
+        with self.assertRaises(IOError):
+            self.mirror.read(os.path.join(self.root, '105000.nuke'))
+
+    def test_sync_and_manifest(self):
+        self.write('105000.nuke', 'job')
+        self.write('105000.lock', '')
+        self.assertEqual(
+            self.mirror.sync(self.root, r'^\d{6}\.nuke$'), ['105000.nuke']
+        )
+        self.assertEqual(self.mirror.sync(self.root, r'^\d{6}\.nuke$'), [])
+        self.mirror.save()
+        restored = LocalMirror(self.root, self.local)
+        self.assertEqual(restored.sync(self.root, r'^\d{6}\.nuke$'), [])
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
@@ -0,0 +1,81 @@
+import sys
+import unittest
+from PyQt4 import QtCore
+from test import SEARCH_PATH
+sys.path.append(SEARCH_PATH)
+from job_io import JobIO
+from save_queue import SaveQueue
+from work_orders import Job
+
+
+class FakeStore(object):
+    """Raises the queued error of a job on its next save."""
+
+    def __init__(self):
+        self.errors = {}
+        self.saved = []
+
+    def save(self, job_num, job):
+        if job_num in self.errors:
+            raise self.errors.pop(job_num)
+        self.saved.append(job_num)
+        return True
+
+    def flush(self, job_num):
+        pass
+
+
+class FakeLock(object):
+
+    def __init__(self):
+        self.unlocked = False
+
+    def unlock(self):
+        self.unlocked = True
+
+
+class TestSaveQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.store = JobIO.store
+        JobIO.store = FakeStore()
+        self.queue = SaveQueue()
+        self.failed = []
+        self.saved = []
+        self.queue.FAILED.connect(
+            lambda *args: self.failed.append(args), QtCore.Qt.DirectConnection
+        )
+        self.queue.SAVED.connect(self.saved.append, QtCore.Qt.DirectConnection)
+
+    def tearDown(self):
+        JobIO.store = self.store
+
+    def test_save_releases_lock(self):
+        lock = FakeLock()
+        self.queue.put('105000', Job('105000', None), lock)
+        self.queue.wait()
+        self.assertTrue(lock.unlocked)
+        self.assertEqual(self.saved, ['105000'])
+
+    def test_worker_survives_unexpected_error(self):
+        JobIO.store.errors['105000'] = ValueError('bad payload')
+        lock = FakeLock()
+        self.queue.put('105000', Job('105000', None), lock)
+        self.queue.wait()
+        job_num, error, held = self.failed[0]
+        self.assertEqual(job_num, '105000')
+        self.assertIsInstance(error, ValueError)
+        self.assertIs(held, lock)
+        self.assertFalse(lock.unlocked)
+        # Later jobs are still saved.
+        self.queue.put('105001', Job('105001', None))
+        self.queue.wait()
+        self.assertEqual(self.saved, ['105001'])
+        self.assertFalse(self.queue.is_pending('105001'))
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
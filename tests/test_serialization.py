@@ -0,0 +1,73 @@
+import sys
+import struct
+import unittest
+import cPickle as pickle
+from test import SEARCH_PATH
+sys.path.append(SEARCH_PATH)
+from work_orders import Job
+import serialization
+
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.job = Job('105000', 'C:\\Vault WorkSpace\\Draft')
+        self.job.add_project('105000.177-43', 'instructions', 'Brandon',
+            '01/01/2020')
+        self.job.projects['105000.177-43'].notes.add('new note', 'Brandon')
+        self.job.add_project('105000.177-44', u'unicode', 'Jaye',
+            '01/02/2020', 'On Hold')
+
+    def assertJobEqual(self, job):
+        self.assertEqual(job.job_num, '105000')
+        self.assertEqual(job.workspace, 'C:\\Vault WorkSpace\\Draft')
+        self.assertEqual(
+            sorted(job.projects.keys()), ['105000.177-43', '105000.177-44']
+        )
+        project = job.projects['105000.177-43']
+        self.assertEqual(project.alias_num, '105000.177-43')
+        self.assertEqual(project.owner, 'Brandon')
+        self.assertEqual(project.due_date, '01/01/2020')
+        self.assertEqual(project.status, 'Unassigned')
+        self.assertEqual(
+            project.notes.data.items(),
+            self.job.projects['105000.177-43'].notes.data.items()
+        )
+        self.assertEqual(job.projects['105000.177-44'].status, 'On Hold')
+
+    def test_round_trip(self):
+        data = serialization.dumps(self.job)
+        self.assertTrue(serialization.is_current(data))
+        self.assertJobEqual(serialization.loads(data))
+
+    def test_loads_legacy_pickle(self):
+        data = pickle.dumps(self.job)
+        self.assertFalse(serialization.is_current(data))
+        self.assertJobEqual(serialization.loads(data))
+
+    def test_smaller_than_legacy_pickle(self):
+        self.assertLess(
+            len(serialization.dumps(self.job)), len(pickle.dumps(self.job))
+        )
+
+    def test_loads_rejects_truncated_data(self):
+        data = serialization.dumps(self.job)
+        with self.assertRaises(EOFError):
+            serialization.loads(data[:-1])
+        with self.assertRaises(EOFError):
+            serialization.loads(pickle.dumps(self.job)[:-1])
+        with self.assertRaises(EOFError):
+            serialization.loads(data[:3])
+
+    def test_loads_rejects_newer_version(self):
+        data = serialization.dumps(self.job)
+        newer = struct.pack('<H', serialization.VERSION + 1)
+        with self.assertRaises(ValueError):
+            serialization.loads(data[:4] + newer + data[6:])
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass
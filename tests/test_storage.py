@@ -0,0 +1,477 @@
+import os
+import sys
+import copy
+import shutil
+import cPickle as pickle
+import tempfile
+import unittest
+import test
+from test import SEARCH_PATH
+sys.path.append(SEARCH_PATH)
+import serialization
+from storage import FileJobStore, SQLiteJobStore, copy_jobs
+from mirror import LocalMirror
+
+
+def make_job(job_num):
+    """Returns a ``test.make_job`` job whose second project is in process
+    and has a note, so both survive a round trip."""
+    job = test.make_job(job_num)
+    project = job.projects[job_num + '.177-44']
+    project.status = 'In Process'
+    project.notes.add('new note', 'Brandon')
+    return job
+
+
+class StoreTestMixin(object):
+
+    def test_save_and_get(self):
+        self.store.save('105000', make_job('105000'))
+        job = self.store.get('105000')
+        self.assertEqual(job.workspace, 'C:\\Vault WorkSpace\\Draft')
+        self.assertEqual(
+            sorted(job.projects.keys()), ['105000.177-43', '105000.177-44']
+        )
+        project = job.projects['105000.177-44']
+        self.assertEqual(project.owner, 'Jaye')
+        self.assertEqual(project.status, 'In Process')
+        self.assertEqual(len(project.notes.data), 2)
+        self.assertEqual(project.notes.data.values()[-1], 'new note')
+
+    def test_exists_and_job_nums(self):
+        self.assertFalse(self.store.exists('105000'))
+        self.store.save('105000', make_job('105000'))
+        self.store.save('105001', make_job('105001'))
+        self.assertTrue(self.store.exists('105000'))
+        self.assertEqual(self.store.job_nums(), {'105000', '105001'})
+
+    def test_summaries_from_all_jobs(self):
+        self.store.save('105000', make_job('105000'))
+        self.store.save('105001', make_job('105001'))
+        summaries = self.store.summaries()
+        self.assertEqual(len(summaries), 4)
+        self.assertEqual(summaries['105001.177-43'].owner, 'Brandon')
+        project = self.store.get('105001').projects['105001.177-43']
+        self.assertEqual(project.notes.data['Work Instructions'], 
+            'instructions')
+
+    def test_save_replaces_projects(self):
+        job = make_job('105000')
+        self.store.save('105000', job)
+        del job.projects['105000.177-43']
+        self.store.save('105000', job)
+        self.assertEqual(self.store.summaries().keys(), ['105000.177-44'])
+
+    def test_delete(self):
+        self.store.save('105000', make_job('105000'))
+        self.assertTrue(self.store.delete('105000'))
+        self.assertFalse(self.store.exists('105000'))
+        self.assertFalse(self.store.delete('105000'))
+        self.assertEqual(self.store.summaries(), {})
+
+    def test_save_many_and_get_many(self):
+        jobs = {'1050%02d' % i: make_job('1050%02d' % i) for i in range(10)}
+        self.store.save_many(jobs)
+        self.assertEqual(self.store.job_nums(), set(jobs))
+        loaded = self.store.get_many(['105003', '105004', '109999'])
+        self.assertEqual(sorted(loaded), ['105003', '105004'])
+        self.assertEqual(loaded['105004'].projects['105004.177-44'].owner,
+            'Jaye')
+        self.assertEqual(self.store.load_errors.keys(), ['109999'])
+
+    def test_save_many_reports_progress(self):
+        jobs = {'1050%02d' % i: make_job('1050%02d' % i) for i in range(10)}
+        written = []
+        self.store.save_many(jobs, written.append)
+        self.assertEqual(sorted(written), sorted(jobs))
+
+    def test_summaries(self):
+        self.store.save('105000', make_job('105000'))
+        summary = self.store.summaries()['105000.177-44']
+        self.assertEqual(summary.alias_num, '105000.177-44')
+        self.assertEqual(summary.owner, 'Jaye')
+        self.assertEqual(summary.due_date, '01/02/2020')
+        self.assertEqual(summary.status, 'In Process')
+
+    def test_job_summaries(self):
+        self.store.save('105000', make_job('105000'))
+        self.store.save('105001', make_job('105001'))
+        self.assertEqual(
+            sorted(self.store.job_summaries('105001').keys()),
+            ['105001.177-43', '105001.177-44']
+        )
+        self.assertEqual(self.store.job_summaries('109999'), {})
+
+    def test_owner_summaries(self):
+        self.store.save('105000', make_job('105000'))
+        self.store.save('105001', make_job('105001'))
+        job = self.store.get('105001')
+        job.projects['105001.177-44'].owner = 'Brandon'
+        self.store.save('105001', job)
+        self.store.flush('105001')
+        self.assertEqual(sorted(self.store.owner_summaries('Brandon')), [
+            '105000.177-43', '105001.177-43', '105001.177-44'
+        ])
+        self.assertEqual(sorted(self.store.owner_summaries('Jaye')),
+            ['105000.177-44'])
+        self.store.delete('105000')
+        self.assertEqual(self.store.owner_summaries('Jaye'), {})
+        self.assertEqual(self.store.owner_summaries('Nobody'), {})
+
+    def test_save_if_detects_conflict(self):
+        self.store.save('105000', make_job('105000'))
+        job, stamp = self.store.get_versioned('105000')
+        job.projects['105000.177-43'].owner = 'Jaye'
+        self.assertTrue(self.store.save_if('105000', job, stamp))
+        job.projects['105000.177-43'].status = 'In Process'
+        self.assertFalse(self.store.save_if('105000', job, stamp))
+        project = self.store.get('105000').projects['105000.177-43']
+        self.assertEqual(project.owner, 'Jaye')
+        self.assertEqual(project.status, 'Unassigned')
+
+    def test_signatures_change_on_save(self):
+        self.store.save('105000', make_job('105000'))
+        self.store.save('105001', make_job('105001'))
+        before = self.store.signatures()
+        job = self.store.get('105001')
+        job.projects['105001.177-43'].owner = 'Jaye'
+        self.store.save('105001', job)
+        self.store.flush('105001')
+        after = self.store.signatures()
+        self.assertEqual(before['105000'], after['105000'])
+        self.assertNotEqual(before['105001'], after['105001'])
+
+
+class TestFileJobStore(StoreTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = FileJobStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_snapshot_rejects_partial_file(self):
+        self.store.save('105000', make_job('105000'))
+        with open(self.store._path('105000'), 'rb+') as f:
+            f.truncate(os.path.getsize(self.store._path('105000')) // 2)
+        with self.assertRaises(EOFError):
+            self.store.get('105000')
+        self.assertEqual(self.store.get_many(['105000']), {})
+        self.assertEqual(self.store.load_errors.keys(), ['105000'])
+
+    def test_snapshot_replays_journal_without_baseline(self):
+        self.store.save('105000', make_job('105000'))
+        job = self.store.get('105000')
+        job.projects['105000.177-43'].status = 'In Process'
+        self.store.save('105000', job)
+        self.store._loaded.clear()
+        snapshot = self.store.snapshot('105000')
+        self.assertEqual(snapshot.projects['105000.177-43'].status, 
+            'In Process')
+        self.assertEqual(len(self.store._loaded), 0)
+
+    def test_locked_save_merges_versioned_edit(self):
+        self.store.save('105000', make_job('105000'))
+        job = self.store.get('105000')
+        other = FileJobStore(self.root)
+        edited, stamp = other.get_versioned('105000')
+        edited.projects['105000.177-44'].notes.add('from supervisor', 'Jaye')
+        edited.projects['105000.177-44'].due_date = '02/02/2020'
+        self.assertTrue(other.save_if('105000', edited, stamp))
+        job.projects['105000.177-43'].owner = 'Jaye'
+        self.store.save('105000', job)
+        merged = FileJobStore(self.root).get('105000')
+        self.assertEqual(merged.projects['105000.177-43'].owner, 'Jaye')
+        self.assertEqual(
+            merged.projects['105000.177-44'].notes.data.values()[-1],
+            'from supervisor'
+        )
+        # The summary index reflects both saves.
+        summary = FileJobStore(self.root).summaries()
+        self.assertEqual(summary['105000.177-43'].owner, 'Jaye')
+        self.assertEqual(summary['105000.177-44'].due_date, '02/02/2020')
+
+    def test_reload_keeps_baseline_of_held_job(self):
+        self.store.save('105000', make_job('105000'))
+        # A job folder holds the job while a batch edit of the same process
+        # loads, changes, and saves its own copy.
+        held = self.store.get('105000')
+        edited, stamp = self.store.get_versioned('105000')
+        edited.projects['105000.177-44'].due_date = '02/02/2020'
+        self.assertTrue(self.store.save_if('105000', edited, stamp))
+        held.projects['105000.177-43'].owner = 'Jaye'
+        self.store.save('105000', held)
+        saved = FileJobStore(self.root).get('105000')
+        self.assertEqual(saved.projects['105000.177-43'].owner, 'Jaye')
+        self.assertEqual(saved.projects['105000.177-44'].due_date, 
+            '02/02/2020')
+
+    def test_reload_after_remote_edit_keeps_baseline_of_held_job(self):
+        self.store.save('105000', make_job('105000'))
+        held = self.store.get('105000')
+        other = FileJobStore(self.root)
+        edited, stamp = other.get_versioned('105000')
+        edited.projects['105000.177-44'].due_date = '02/02/2020'
+        self.assertTrue(other.save_if('105000', edited, stamp))
+        # Loading the job again must not move the baseline of the held copy
+        # past the remote edit.
+        self.store.get('105000')
+        held.projects['105000.177-43'].owner = 'Jaye'
+        self.store.save('105000', held)
+        saved = FileJobStore(self.root).get('105000')
+        self.assertEqual(saved.projects['105000.177-43'].owner, 'Jaye')
+        self.assertEqual(saved.projects['105000.177-44'].due_date, 
+            '02/02/2020')
+
+    def test_copies_share_baseline(self):
+        self.store.save('105000', make_job('105000'))
+        held = self.store.get('105000')
+        other = FileJobStore(self.root)
+        edited, stamp = other.get_versioned('105000')
+        edited.projects['105000.177-44'].due_date = '02/02/2020'
+        self.assertTrue(other.save_if('105000', edited, stamp))
+        # Copies queued for saving are journaled against the held job.
+        held.projects['105000.177-43'].owner = 'Jaye'
+        self.store.save('105000', copy.deepcopy(held))
+        held.projects['105000.177-43'].status = 'In Process'
+        self.store.save('105000', copy.deepcopy(held))
+        saved = FileJobStore(self.root).get('105000')
+        self.assertEqual(saved.projects['105000.177-43'].owner, 'Jaye')
+        self.assertEqual(saved.projects['105000.177-43'].status, 
+            'In Process')
+        self.assertEqual(saved.projects['105000.177-44'].due_date, 
+            '02/02/2020')
+
+    def test_replaced_notes_are_not_mixed_into_loaded_job(self):
+        self.store.save('105000', make_job('105000'))
+        held = self.store.get('105000')
+        rewritten = make_job('105000')
+        rewritten.projects['105000.177-44'].notes.add('later', 'Jaye')
+        FileJobStore(self.root).save('105000', rewritten)
+        with self.assertRaises(EOFError):
+            held.projects['105000.177-44'].notes.data
+
+    def test_own_rewrite_keeps_loaded_notes_readable(self):
+        self.store.save('105000', make_job('105000'))
+        held = self.store.get('105000')
+        rewritten = make_job('105000')
+        rewritten.projects['105000.177-44'].notes.add('later', 'Jaye')
+        self.store.save('105000', rewritten)
+        self.assertEqual(
+            held.projects['105000.177-44'].notes.data.values(),
+            make_job('105000').projects['105000.177-44'].notes.data.values()
+        )
+
+    def test_write_mutex_times_out(self):
+        self.store.save('105000', make_job('105000'))
+        with open(os.path.join(self.root, '105000.writing'), 'wb'):
+            pass
+        self.store.MUTEX_TIMEOUT = 0.1
+        with self.assertRaises(IOError):
+            self.store.save('105000', make_job('105000'))
+        self.store.MUTEX_STALE = 0
+        self.assertTrue(self.store.save('105000', make_job('105000')))
+
+    def test_summaries_reuses_unchanged_jobs(self):
+        self.store.save('105000', make_job('105000'))
+        self.store.save('105001', make_job('105001'))
+        first = self.store.summaries()
+        job = make_job('105001')
+        job.projects['105001.177-43'].owner = 'Jaye'
+        self.store.save('105001', job)
+        # Guarantee a new signature despite coarse filesystem timestamps.
+        os.utime(self.store._summary_path('105001'), (0, 0))
+        second = self.store.summaries()
+        self.assertIs(first['105000.177-43'], second['105000.177-43'])
+        self.assertEqual(second['105001.177-43'].owner, 'Jaye')
+
+    def test_get_many_loads_in_parallel(self):
+        self.store.workers = 4
+        job_nums = ['1050%02d' % i for i in range(20)]
+        for job_num in job_nums:
+            self.store.save(job_num, make_job(job_num))
+        self.assertEqual(len(self.store.get_many(job_nums)), 20)
+        self.assertEqual(self.store.load_errors, {})
+
+    def test_summaries_index_unindexed_jobs(self):
+        with open(self.store._path('105000'), 'wb') as f:
+            pickle.dump(make_job('105000'), f)
+        self.assertEqual(len(self.store.summaries()), 2)
+        self.assertTrue(os.path.exists(self.store._summary_path('105000')))
+
+    def test_migrate_converts_legacy_files(self):
+        with open(self.store._path('105000'), 'wb') as f:
+            pickle.dump(make_job('105000'), f)
+        self.store.save('105001', make_job('105001'))
+        self.assertEqual(self.store.migrate(), (['105000'], {}))
+        with open(self.store._path('105000'), 'rb') as f:
+            self.assertTrue(serialization.is_current(f.read()))
+        self.assertEqual(self.store.get('105000').projects.keys(),
+            make_job('105000').projects.keys())
+
+    def test_summaries_evicts_deleted_jobs(self):
+        self.store.save('105000', make_job('105000'))
+        self.store.save('105001', make_job('105001'))
+        self.store.summaries()
+        self.store.delete('105000')
+        self.assertEqual(
+            sorted(self.store.summaries().keys()),
+            ['105001.177-43', '105001.177-44']
+        )
+
+
+    def test_save_appends_changes_to_journal(self):
+        self.store.save('105000', make_job('105000'))
+        with open(self.store._path('105000'), 'rb') as f:
+            data = f.read()
+        job = self.store.get('105000')
+        job.projects['105000.177-43'].owner = 'Jaye'
+        job.projects['105000.177-43'].notes.add('note', 'Brandon')
+        self.store.save('105000', job)
+        with open(self.store._path('105000'), 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertTrue(os.path.exists(self.store._journal_path('105000')))
+        project = FileJobStore(self.root).get('105000').projects[
+            '105000.177-43']
+        self.assertEqual(project.owner, 'Jaye')
+        self.assertEqual(project.notes.data.values()[-1], 'note')
+        self.assertEqual(self.store.summaries()['105000.177-43'].owner, 'Jaye')
+
+    def test_projects_load_notes_on_demand(self):
+        job = make_job('105000')
+        job.projects['105000.177-44'].notes.add('x' * 10000, 'Jaye')
+        self.store.save('105000', job)
+        self.assertLess(os.path.getsize(self.store._path('105000')), 1000)
+        notes = self.store.get('105000').projects['105000.177-44'].notes
+        self.assertFalse(notes.loaded)
+        self.assertEqual(len(notes), 3)
+        self.assertEqual(notes.data.values()[-1], 'x' * 10000)
+
+    def test_journal_is_compacted(self):
+        self.store.COMPACT_AT = 3
+        self.store.save('105000', make_job('105000'))
+        job = self.store.get('105000')
+        for i in range(3):
+            job.projects['105000.177-43'].notes.add(str(i), 'user%d' % i)
+            self.store.save('105000', job)
+        self.store.flush('105000')
+        self.assertFalse(os.path.exists(self.store._journal_path('105000')))
+        notes = self.store.get('105000').projects['105000.177-43'].notes
+        self.assertEqual(notes.data.values()[-3:], ['0', '1', '2'])
+
+    def test_save_if_leaves_journal_to_lock_holder(self):
+        self.store.COMPACT_AT = 2
+        self.store.save('105000', make_job('105000'))
+        for i in range(2):
+            job, stamp = self.store.get_versioned('105000')
+            job.projects['105000.177-43'].notes.add(str(i), 'Jaye')
+            self.assertTrue(self.store.save_if('105000', job, stamp))
+            self.store.flush('105000')
+        self.assertTrue(os.path.exists(self.store._journal_path('105000')))
+        job = self.store.get('105000')
+        job.projects['105000.177-44'].owner = 'Brandon'
+        self.store.save('105000', job)
+        self.store.flush('105000')
+        self.assertFalse(os.path.exists(self.store._journal_path('105000')))
+
+    def test_owner_index_is_built_on_first_use(self):
+        self.store.save('105000', make_job('105000'))
+        shutil.rmtree(os.path.join(self.store.index, self.store.OWNERS))
+        self.assertEqual(sorted(self.store.owner_summaries('Jaye')),
+            ['105000.177-44'])
+        self.assertEqual(
+            os.listdir(self.store._owner_path('Brandon')), ['105000'])
+
+
+class TestMirroredFileJobStore(StoreTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.local = tempfile.mkdtemp()
+        self.store = FileJobStore(self.root, 
+            mirror=LocalMirror(self.root, self.local))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        shutil.rmtree(self.local)
+
+    def test_reads_follow_journaled_saves(self):
+        self.store.save('105000', make_job('105000'))
+        job = self.store.get('105000')
+        job.projects['105000.177-43'].owner = 'Jaye'
+        self.store.save('105000', job)
+        self.assertEqual(
+            self.store.snapshot('105000').projects['105000.177-43'].owner,
+            'Jaye'
+        )
+
+
+class TestShardedFileJobStore(StoreTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.root, FileJobStore.LAYOUT), 'wb') as f:
+            f.write('500')
+        self.store = FileJobStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_job_files_are_bucketed(self):
+        self.store.save('105000', make_job('105000'))
+        self.assertTrue(os.path.exists(
+            os.path.join(self.root, '105000-105499', '105000.nuke')
+        ))
+        self.assertEqual(self.store.directories(), 
+            [self.root, os.path.join(self.root, '105000-105499')])
+
+    def test_reshard(self):
+        self.store.save('105000', make_job('105000'))
+        self.store.save('105600', make_job('105600'))
+        self.assertEqual(self.store.reshard(None), (['105000', '105600'], {}))
+        self.assertEqual(os.listdir(self.root).count('105000-105499'), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.root, '105600.nuke')))
+        self.assertEqual(FileJobStore(self.root).job_nums(), 
+            {'105000', '105600'})
+        self.store.reshard(1000)
+        store = FileJobStore(self.root)
+        self.assertEqual(store.shard_size, 1000)
+        self.assertEqual(
+            sorted(store.get('105600').projects.keys()),
+            ['105600.177-43', '105600.177-44']
+        )
+
+
+class TestSQLiteJobStore(StoreTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = SQLiteJobStore(os.path.join(self.root, 'jobs.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_copy_jobs_from_file_store(self):
+        temp = tempfile.mkdtemp()
+        try:
+            src = FileJobStore(temp)
+            src.save('105000', make_job('105000'))
+            self.assertEqual(copy_jobs(src, self.store), ['105000'])
+            self.assertEqual(self.store.get('105000').projects[
+                '105000.177-44'].owner, 'Jaye')
+        finally:
+            shutil.rmtree(temp)
+
+    def test_reshard_keeps_jobs_in_database(self):
+        self.store.save('105000', make_job('105000'))
+        self.assertEqual(self.store.reshard(500), ([], {}))
+        self.assertEqual(self.store.migrate(), ([], {}))
+        self.assertEqual(self.store.job_nums(), {'105000'})
+
+
+if __name__ == '__main__':
+    try:
+        unittest.main(verbosity=2)
+    except SystemExit:
+        pass